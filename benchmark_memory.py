@@ -0,0 +1,83 @@
+# benchmark_memory.py - měření paměti potravin
+"""
+MĚŘENÍ PAMĚŤOVÉ NÁROČNOSTI FoodItem
+
+Porovná počet bajtů na jednu potravinu pro původní FoodItem (dataclass
+s __dict__ a vlastními množinami set v každé instanci) a současný
+FoodItem (__slots__, internované frozenset). Paměť se měří pomocí
+tracemalloc při vytvoření katalogu o zadaném počtu položek.
+
+Použití:
+    python benchmark_memory.py [--count 1000000]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Set
+
+from planner_jidelnicku_final import FoodItem, MEAL_TIMES
+
+# Kombinace štítků, jaké se vyskytují v jidla_cz.csv
+_MEAL_CHOICES = (
+    ("breakfast",), ("lunch", "dinner"), ("breakfast", "snack"),
+    ("lunch",), ("dinner",), ("snack",), MEAL_TIMES,
+)
+_TAG_CHOICES = ((), ("meat",), ("vegan",), ("vegetarian",), ("meat", "fish"))
+
+@dataclass(frozen=True, eq=True)
+class LegacyFoodItem:
+    """Původní podoba FoodItem (před zavedením __slots__ a frozenset)."""
+    name: str
+    calories: int
+    protein: float
+    fat: float
+    carbs: float
+    meal_times: Set[str] = field(default_factory=lambda: {"breakfast", "lunch", "dinner", "snack"})
+    tags: Set[str] = field(default_factory=set)
+
+def _rows(count: int, seed: int = 42):
+    """Deterministicky generované řádky katalogu."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield (f"Potravina {i}", rng.randint(20, 900), rng.uniform(0, 60),
+               rng.uniform(0, 50), rng.uniform(0, 90),
+               rng.choice(_MEAL_CHOICES), rng.choice(_TAG_CHOICES))
+
+def measure(factory, count: int, seed: int = 42) -> float:
+    """Vrátí průměrný počet bajtů na potravinu vytvořenou funkcí factory."""
+    # Řádky (jména, čísla) sdílí obě varianty, měří se jen potraviny a štítky
+    rows = list(_rows(count, seed))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [factory(*row) for row in rows]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items, rows
+    gc.collect()
+    return (after - before) / count
+
+def legacy_factory(name, calories, protein, fat, carbs, meal_times, tags):
+    # Původní load_foods vytvářel pro každý řádek nové množiny
+    return LegacyFoodItem(name, calories, protein, fat, carbs, set(meal_times), set(tags))
+
+def current_factory(name, calories, protein, fat, carbs, meal_times, tags):
+    return FoodItem(name, calories, protein, fat, carbs, set(meal_times), set(tags))
+
+def main():
+    parser = argparse.ArgumentParser(description="Paměť na potravinu před a po úpravě FoodItem")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Počet potravin v katalogu")
+    args = parser.parse_args()
+
+    print(f"📏 Katalog o {args.count:,} potravinách")
+    legacy = measure(legacy_factory, args.count)
+    print(f"• Původní FoodItem:  {legacy:8.1f} B/položku ({legacy * args.count / 2**20:8.1f} MiB)")
+    current = measure(current_factory, args.count)
+    print(f"• Současný FoodItem: {current:8.1f} B/položku ({current * args.count / 2**20:8.1f} MiB)")
+    print(f"✅ Úspora: {100 * (1 - current / legacy):.1f} %")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# benchmark_planner.py - výkonnostní benchmark plánovače
+"""
+VÝKONNOSTNÍ BENCHMARK PLÁNOVAČE JÍDELNÍČKU
+
+Generuje syntetické katalogy potravin (se zadaným seedem, tedy
+reprodukovatelně) s realistickým rozložením makroživin a kombinacemi
+meal_times/tags podle jidla_cz.csv. Pro každou velikost katalogu změří
+load_foods, filter_items (i rozsahové dotazy na živiny),
+knapsack_optimize, distribute_to_slots a find_optimal_plan a výsledky
+uloží jako JSON.
+
+Použití:
+    python benchmark_planner.py [--sizes 100 10000 1000000] [--repeat 3]
+                                [--output benchmark_results.json]
+                                [--compare predchozi.json --tolerance 0.25]
+
+S --compare se výsledky porovnají s dřívějším během; pokud je některé
+měření pomalejší o víc než tolerance, skript skončí s kódem 1.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from planner_jidelnicku_final import (
+    FoodItem, MealOptimizer, by_meal_time, filter_items, find_optimal_plan, load_foods,
+    max_nutrient
+)
+
+# Archetypy potravin: (název, meal_times, tags, (průměr, odchylka) pro
+# bílkoviny, tuky a sacharidy v gramech na porci, relativní četnost)
+_ARCHETYPES = (
+    ("Maso", ("lunch", "dinner"), ("meat", "high_protein"), (45, 12), (12, 6), (2, 2), 0.12),
+    ("Ryba", ("lunch", "dinner"), ("fish", "omega3"), (35, 8), (10, 5), (1, 1), 0.06),
+    ("Luštěnina", ("lunch", "dinner"), ("vegan", "legume", "high_protein"), (18, 5), (3, 2), (45, 10), 0.07),
+    ("Příloha", ("lunch", "dinner", "snack"), ("vegan", "complex_carb"), (7, 3), (2, 1), (65, 15), 0.12),
+    ("Zelenina", ("lunch", "dinner", "snack"), ("vegan", "vegetable", "low_cal"), (3, 1.5), (0.5, 0.4), (10, 4), 0.15),
+    ("Mléčný výrobek", ("breakfast", "snack"), ("vegetarian", "dairy"), (15, 6), (8, 5), (10, 5), 0.12),
+    ("Pečivo", ("breakfast", "snack"), ("vegetarian",), (9, 3), (4, 3), (50, 10), 0.10),
+    ("Ovoce", ("breakfast", "snack"), ("vegan", "fruit"), (1, 0.5), (0.4, 0.3), (25, 8), 0.12),
+    ("Ořechy", ("snack",), ("vegan", "nuts", "high_fat"), (7, 2), (18, 5), (6, 3), 0.06),
+    ("Vejce", ("breakfast", "lunch", "dinner"), ("vegetarian", "high_protein"), (13, 3), (10, 3), (1, 0.5), 0.08),
+)
+
+DEFAULT_SIZES = (100, 10_000, 1_000_000)
+# Kratší měření (v sekundách) se při hledání regresí ignorují – jsou to šum
+NOISE_FLOOR = 0.001
+CSV_FIELDS = ("name", "calories", "protein", "fat", "carbs", "meal_times", "tags")
+
+def generate_foods(count: int, seed: int = 42) -> List[FoodItem]:
+    """
+    Vygeneruje katalog potravin.
+
+    Makroživiny se losují z normálního rozdělení archetypu (oříznutého
+    na nezáporné hodnoty) a kalorie se dopočítají ze vzorce
+    4·bílkoviny + 9·tuky + 4·sacharidy s ±5% šumem.
+    """
+    rng = random.Random(seed)
+    archetypes = [archetype[:6] for archetype in _ARCHETYPES]
+    shares = [archetype[6] for archetype in _ARCHETYPES]
+    foods = []
+    for i, (name, meal_times, tags, protein, fat, carbs) in enumerate(
+            rng.choices(archetypes, weights=shares, k=count)):
+        p = max(0.0, rng.gauss(*protein))
+        f = max(0.0, rng.gauss(*fat))
+        c = max(0.0, rng.gauss(*carbs))
+        calories = int(round((4 * p + 9 * f + 4 * c) * rng.uniform(0.95, 1.05)))
+        foods.append(FoodItem(f"{name} {i}", calories, round(p, 1), round(f, 1), round(c, 1),
+                              set(meal_times), set(tags)))
+    return foods
+
+def write_csv(foods: List[FoodItem], path: str):
+    """Uloží potraviny do CSV ve formátu jidla_cz.csv."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_FIELDS)
+        for food in foods:
+            writer.writerow((food.name, food.calories, food.protein, food.fat, food.carbs,
+                             "|".join(sorted(food.meal_times)), "|".join(sorted(food.tags))))
+
+def measure(function: Callable, repeat: int) -> Dict[str, float]:
+    """Spustí funkci repeat krát a vrátí časy v sekundách (bez výpisů funkce)."""
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times), "max": max(times)}
+
+def benchmark_size(count: int, repeat: int, seed: int, workdir: str) -> Dict[str, Dict[str, float]]:
+    """Změří všechny operace pro katalog o count potravinách."""
+    foods = generate_foods(count, seed)
+    path = os.path.join(workdir, f"jidla_{count}.csv")
+    write_csv(foods, path)
+
+    targets = {"calories": 2000, "protein": 120, "fat": 70, "carbs": 220}
+    limits = {"calories": (1200, None)}
+    weights = {"calories": 1.0, "protein": 1.5, "fat": 0.8, "carbs": 0.8}
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    with contextlib.redirect_stdout(io.StringIO()):
+        catalog = load_foods(path, as_catalog=True)
+    lunch = filter_items(catalog, by_meal_time("lunch"))
+    selected = MealOptimizer.knapsack_optimize(catalog, targets, limits, weights, max_items=10)
+
+    return {
+        "load_foods": measure(lambda: load_foods(path), repeat),
+        "load_foods_catalog": measure(lambda: load_foods(path, as_catalog=True), repeat),
+        "filter_items": measure(lambda: filter_items(catalog, by_meal_time("lunch")), repeat),
+        # Rozsahový index: úzký rozsah (řazený výřez) a široký (maska)
+        "filter_range_narrow": measure(
+            lambda: filter_items(catalog, max_nutrient("calories", 60)), repeat),
+        "filter_range_broad": measure(
+            lambda: filter_items(catalog, max_nutrient("calories", 600)), repeat),
+        "knapsack_optimize": measure(
+            lambda: MealOptimizer.knapsack_optimize(lunch, targets, limits, weights, max_items=3), repeat),
+        "distribute_to_slots": measure(
+            lambda: MealOptimizer.distribute_to_slots(selected, slot_caps), repeat),
+        "find_optimal_plan": measure(
+            lambda: find_optimal_plan(catalog, targets, limits, weights, slot_caps), repeat),
+    }
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Vrátí seznam měření pomalejších než baseline o víc než tolerance."""
+    regressions = []
+    for size, operations in results["sizes"].items():
+        for operation, timing in operations.items():
+            previous = baseline.get("sizes", {}).get(size, {}).get(operation)
+            if not previous or previous["median"] < NOISE_FLOOR:
+                continue
+            if timing["median"] > previous["median"] * (1 + tolerance):
+                regressions.append(
+                    f"{operation} @ {size}: {previous['median'] * 1000:.2f} ms -> {timing['median'] * 1000:.2f} ms"
+                )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark plánovače jídelníčku")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Velikosti katalogu")
+    parser.add_argument("--repeat", type=int, default=3, help="Počet opakování každého měření")
+    parser.add_argument("--seed", type=int, default=42, help="Seed generátoru katalogu")
+    parser.add_argument("--output", default="benchmark_results.json", help="Výstupní JSON")
+    parser.add_argument("--compare", help="JSON předchozího běhu pro kontrolu regresí")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Povolené zpomalení (0.25 = 25 %%)")
+    args = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in args.sizes:
+            print(f"⏱️  Katalog o {count:,} potravinách...")
+            results["sizes"][str(count)] = timings = benchmark_size(count, args.repeat, args.seed, workdir)
+            for operation, timing in timings.items():
+                print(f"   • {operation:<20} {timing['median'] * 1000:10.2f} ms")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"✅ Výsledky uloženy do {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("❌ Regrese výkonu:")
+            for line in regressions:
+                print(f"   • {line}")
+            sys.exit(1)
+        print("✅ Žádné regrese výkonu")
+
+if __name__ == "__main__":
+    main()
@@ -14,28 +14,97 @@ Architektura:
 - Algoritmus: Knapsack-like optimalizace
 - FP: Funkcionální filtrování potravin
 - Datové zdroje: CSV soubory
+- Výkon: sloupcový katalog FoodCatalog nad poli NumPy
+
+Požadavky: Python 3.10+ (FoodItem používá dataclass se __slots__), NumPy
 """
 
+import copy
 import csv
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import weakref
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Callable, Iterable, Dict, Optional, Tuple, Set
-from collections import defaultdict
+from typing import List, Callable, Iterable, Dict, FrozenSet, Optional, Tuple, Union
+from collections import defaultdict, deque, OrderedDict
+from collections.abc import Sequence
+
+import numpy as np
+
+if sys.version_info < (3, 10):
+    raise RuntimeError("Plánovač jídelníčku vyžaduje Python 3.10 nebo novější")
+
+# Pořadí živin a časů jídel používané ve sloupcových strukturách
+NUTRIENTS: Tuple[str, ...] = ("calories", "protein", "fat", "carbs")
+MEAL_TIMES: Tuple[str, ...] = ("breakfast", "lunch", "dinner", "snack")
+
+# Podíl denního cíle připadající na jednotlivé sloty
+SLOT_SHARES: Dict[str, float] = {
+    "breakfast": 0.25,  # 25% denního cíle
+    "lunch": 0.35,      # 35% denního cíle
+    "dinner": 0.30,     # 30% denního cíle
+    "snack": 0.10       # 10% denního cíle
+}
+
+_ALL_MEAL_TIMES = frozenset(MEAL_TIMES)
 
 # ---------- DATA CLASSES ----------
-@dataclass(frozen=True, eq=True)
+# Sdílené (internované) množiny štítků; různých kombinací je v praxi málo.
+# Tabulka je omezená (frozenset nepodporuje slabé odkazy): po naplnění
+# se nové kombinace už neinternují, jen se nesdílejí
+_LABEL_SETS: Dict[FrozenSet[str], FrozenSet[str]] = {}
+_LABEL_SETS_MAX = 4096
+
+def _intern_labels(labels: Iterable[str]) -> FrozenSet[str]:
+    """Vrátí sdílenou neměnnou množinu se stejnými štítky."""
+    labels = labels if isinstance(labels, frozenset) else frozenset(labels)
+    shared = _LABEL_SETS.get(labels)
+    if shared is not None:
+        return shared
+    if len(_LABEL_SETS) < _LABEL_SETS_MAX:
+        return _LABEL_SETS.setdefault(labels, labels)
+    return labels
+
+@dataclass(frozen=True, eq=True, slots=True)
 class FoodItem:
-    """Třída reprezentující potravinu s nutričními hodnotami."""
+    """
+    Třída reprezentující potravinu s nutričními hodnotami.
+    
+    Instance jsou neměnné a hashovatelné (lze je použít jako klíče
+    slovníků), nemají __dict__ a meal_times/tags jsou sdílené frozenset.
+    """
     name: str
     calories: int
     protein: float
     fat: float
     carbs: float
-    meal_times: Set[str] = field(default_factory=lambda: {"breakfast", "lunch", "dinner", "snack"})
-    tags: Set[str] = field(default_factory=set)
+    meal_times: FrozenSet[str] = _ALL_MEAL_TIMES
+    tags: FrozenSet[str] = frozenset()
+    
+    def __post_init__(self):
+        # Přijímá libovolnou kolekci (např. set) a uloží internovaný frozenset
+        object.__setattr__(self, "meal_times", _intern_labels(self.meal_times))
+        object.__setattr__(self, "tags", _intern_labels(self.tags))
 
     def __repr__(self) -> str:
         return f"{self.name} ({self.calories} kcal)"
 
+    def __reduce__(self):
+        # Unpickling (např. v procesech ParallelPlanRunner) jde přes
+        # __init__, takže se množiny štítků znovu internují
+        return (FoodItem, (self.name, self.calories, self.protein, self.fat, self.carbs,
+                           self.meal_times, self.tags))
+
     def get_nutrient_value(self, nutrient: str) -> float:
         """Vrátí hodnotu živiny podle názvu (kalorie, protein, tuky, sacharidy)."""
         nutrient_map = {
@@ -47,27 +116,130 @@ class FoodItem:
         return nutrient_map.get(nutrient, 0.0)
 
 # ---------- MEAL PLAN ----------
+def _sum_totals(items: Iterable[FoodItem]) -> Dict[str, float]:
+    """Součty živin v pořadí položek (stejné jako postupné sčítání)."""
+    totals = {"calories": 0, "protein": 0, "fat": 0, "carbs": 0}
+    for item in items:
+        totals["calories"] += item.calories
+        totals["protein"] += item.protein
+        totals["fat"] += item.fat
+        totals["carbs"] += item.carbs
+    return totals
+
+class PlanItems(Sequence):
+    """
+    Líný pohled na všechny potraviny jídelníčku (snídaně, oběd, večeře,
+    svačiny) bez kopírování seznamů.
+    """
+    __slots__ = ("_parts",)
+    
+    def __init__(self, *parts: List[FoodItem]):
+        self._parts = parts
+    
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+    
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._parts)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        for part in self._parts:
+            if 0 <= index < len(part):
+                return part[index]
+            index -= len(part)
+        raise IndexError("index mimo rozsah jídelníčku")
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PlanItems, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+class _SlotList(list):
+    """
+    Seznam položek slotu, který při každé změně zahodí uložené součty
+    jídelníčku, jemuž patří.
+    """
+    __slots__ = ("_owner",)
+    
+    def __init__(self, items: Iterable[FoodItem] = (), owner: "MealPlan" = None):
+        super().__init__(items)
+        self._owner = owner
+    
+    def _changed(self):
+        if self._owner is not None:
+            object.__setattr__(self._owner, "_totals_cache", None)
+    
+    def __reduce_ex__(self, protocol):
+        return (list, (list(self),))
+
+def _slot_mutator(name: str):
+    method = getattr(list, name)
+    
+    def mutate(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._changed()
+        return result
+    mutate.__name__ = name
+    return mutate
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+              "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(_SlotList, _name, _slot_mutator(_name))
+del _name
+
+_PLAN_SLOTS = ("breakfast", "lunch", "dinner", "snacks")
+
 @dataclass
 class MealPlan:
-    """Třída reprezentující celodenní jídelníček."""
+    """
+    Třída reprezentující celodenní jídelníček.
+    
+    Součty živin se počítají jednou a ukládají. Sloty jsou vlastní kopie
+    předaných seznamů; každá jejich změna (append, přiřazení prvku, nový
+    seznam ...) uložené součty zneplatní.
+    """
     breakfast: List[FoodItem]
     lunch: List[FoodItem]
     dinner: List[FoodItem]
     snacks: List[FoodItem]
+    _totals_cache: Optional[Dict[str, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name, value):
+        if name in _PLAN_SLOTS:
+            value = _SlotList(value, self)
+            object.__setattr__(self, "_totals_cache", None)
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        # Obnovení přes __init__, aby sloty po unpicklingu opět hlídaly změny
+        return (MealPlan, tuple(list(getattr(self, name)) for name in _PLAN_SLOTS))
 
     def all_items(self) -> List[FoodItem]:
         """Vrátí všechny potraviny v jídelníčku."""
-        return self.breakfast + self.lunch + self.dinner + self.snacks
+        return [*self.breakfast, *self.lunch, *self.dinner, *self.snacks]
+
+    def item_view(self) -> PlanItems:
+        """Vrátí všechny potraviny jako líný pohled bez kopírování seznamů."""
+        return PlanItems(self.breakfast, self.lunch, self.dinner, self.snacks)
+
+    def _set_totals(self, totals: Dict[str, float]):
+        """Uloží předem spočítané součty (např. z MealPlanBuilderu)."""
+        self._totals_cache = dict(totals)
 
     def totals(self) -> Dict[str, float]:
-        """Vypočítá celkové nutriční hodnoty jídelníčku."""
-        items = self.all_items()
-        return {
-            "calories": sum(i.calories for i in items),
-            "protein": sum(i.protein for i in items),
-            "fat": sum(i.fat for i in items),
-            "carbs": sum(i.carbs for i in items),
-        }
+        """Vrátí celkové nutriční hodnoty jídelníčku."""
+        if self._totals_cache is None:
+            self._totals_cache = _sum_totals(self.item_view())
+        return dict(self._totals_cache)
 
     def __repr__(self) -> str:
         """Textová reprezentace jídelníčku."""
@@ -90,6 +262,47 @@ class MealPlan:
             "="*50
         )
 
+# ---------- VALIDATION ----------
+@dataclass(frozen=True)
+class ConstraintViolation:
+    """
+    Porušené omezení jídelníčku.
+    
+    constraint je název omezení: živina ("calories", ...), "slot:<slot>"
+    pro počet položek ve slotu nebo "meal_times:<slot>" pro potravinu
+    nevhodnou do slotu; kind je "min", "max" nebo "meal_time".
+    """
+    constraint: str
+    kind: str
+    actual: object = None
+    bound: object = None
+    message: str = ""
+    
+    def __str__(self) -> str:
+        return self.message
+
+class InfeasiblePlanError(ValueError):
+    """Požadavek nelze splnit (žádný jídelníček nevyhovuje omezením)."""
+
+class PlanValidationError(InfeasiblePlanError):
+    """Jídelníček porušuje omezení; popis je v atributu violation."""
+    
+    def __init__(self, violation: ConstraintViolation, message: Optional[str] = None):
+        super().__init__(message or violation.message)
+        self.violation = violation
+
+def _meal_time_violation(slot: str, item: "FoodItem") -> ConstraintViolation:
+    return ConstraintViolation(
+        f"meal_times:{slot}", "meal_time", item.name, slot,
+        f"Potravina '{item.name}' není vhodná pro {slot}"
+    )
+
+def _violation_error(violation: ConstraintViolation) -> PlanValidationError:
+    """Výjimka, kterou pro dané porušení vyhazuje MealPlanBuilder."""
+    if violation.kind == "meal_time":
+        return PlanValidationError(violation)
+    return PlanValidationError(violation, f"Chyba při vytváření jídelníčku: {violation}")
+
 # ---------- BUILDER PATTERN ----------
 class MealPlanBuilder:
     """
@@ -103,6 +316,11 @@ class MealPlanBuilder:
         self._lunch: List[FoodItem] = []
         self._dinner: List[FoodItem] = []
         self._snacks: List[FoodItem] = []
+        # Průběžné součty živin v pořadí přidávání; přesně odpovídají
+        # MealPlan.totals(), jen pokud se přidávalo v pořadí slotů
+        self._totals = _sum_totals(())
+        self._last_slot = 0
+        self._in_slot_order = True
         
         # Výchozí limity pro sloty (min, max)
         self._slot_caps = {
@@ -121,9 +339,11 @@ class MealPlanBuilder:
         """Přidá potravinu do daného slotu s validací."""
         # Validace: potravina musí být vhodná pro daný čas jídla
         if slot not in item.meal_times:
-            raise ValueError(f"Potravina '{item.name}' není vhodná pro {slot}")
-        
-        # Přidání do správného slotu
+            raise PlanValidationError(_meal_time_violation(slot, item))
+        return self._append(slot, item)
+
+    def _append(self, slot: str, item: FoodItem):
+        """Přidá potravinu do slotu bez kontroly času jídla."""
         if slot == "breakfast":
             self._breakfast.append(item)
         elif slot == "lunch":
@@ -132,7 +352,17 @@ class MealPlanBuilder:
             self._dinner.append(item)
         elif slot == "snack":
             self._snacks.append(item)
-            
+        else:
+            return self
+        
+        rank = MEAL_TIMES.index(slot)
+        if rank < self._last_slot:
+            self._in_slot_order = False
+        self._last_slot = max(self._last_slot, rank)
+        self._totals["calories"] += item.calories
+        self._totals["protein"] += item.protein
+        self._totals["fat"] += item.fat
+        self._totals["carbs"] += item.carbs
         return self
 
     def add_breakfast(self, item: FoodItem):
@@ -151,6 +381,81 @@ class MealPlanBuilder:
         """Přidá potravinu jako svačinu."""
         return self.add_to_slot("snack", item)
 
+    def validate(self,
+                 limits: Dict[str, Tuple[Optional[float], Optional[float]]] = None
+                 ) -> List[ConstraintViolation]:
+        """
+        Vrátí všechna porušená omezení (počty položek ve slotech, limity
+        živin) bez vyhazování výjimek a bez kopírování seznamů.
+        
+        Args:
+            limits: Minimální/maximální limity
+            
+        Returns:
+            List[ConstraintViolation]: Porušení v pořadí kontrol build();
+            prázdný seznam znamená platný jídelníček
+        """
+        violations = []
+        
+        # Validace počtu položek ve slotech
+        for slot, (min_cap, max_cap) in self._slot_caps.items():
+            count = len(self._get_slot_items(slot))
+            if count < min_cap:
+                violations.append(ConstraintViolation(
+                    f"slot:{slot}", "min", count, min_cap,
+                    f"Slot '{slot}': příliš málo položek ({count} < {min_cap})"
+                ))
+            if count > max_cap:
+                violations.append(ConstraintViolation(
+                    f"slot:{slot}", "max", count, max_cap,
+                    f"Slot '{slot}': příliš mnoho položek ({count} > {max_cap})"
+                ))
+        
+        # Validace limitů (součty ve stejném pořadí jako MealPlan.totals)
+        if limits:
+            totals = self._totals if self._in_slot_order else _sum_totals(
+                itertools.chain(self._breakfast, self._lunch, self._dinner, self._snacks)
+            )
+            for metric, (min_val, max_val) in limits.items():
+                val = totals.get(metric, 0.0)
+                if min_val is not None and val < min_val:
+                    violations.append(ConstraintViolation(
+                        metric, "min", val, min_val,
+                        f"{metric}: {val} < minimální hodnota {min_val}"
+                    ))
+                if max_val is not None and val > max_val:
+                    violations.append(ConstraintViolation(
+                        metric, "max", val, max_val,
+                        f"{metric}: {val} > maximální hodnota {max_val}"
+                    ))
+        
+        return violations
+
+    def try_build(self,
+                  targets: Dict[str, Optional[float]] = None,
+                  limits: Dict[str, Tuple[Optional[float], Optional[float]]] = None
+                  ) -> Tuple[Optional[MealPlan], List[ConstraintViolation]]:
+        """
+        Varianta build() bez výjimek pro prohledávání mnoha kandidátů.
+        
+        Returns:
+            Tuple: (jídelníček, []) nebo (None, seznam porušení)
+        """
+        violations = self.validate(limits)
+        if violations:
+            return None, violations
+        
+        # Vytvoření jídelníčku
+        plan = MealPlan(
+            breakfast=list(self._breakfast),
+            lunch=list(self._lunch),
+            dinner=list(self._dinner),
+            snacks=list(self._snacks)
+        )
+        if self._in_slot_order:
+            plan._set_totals(self._totals)
+        return plan, violations
+
     def build(self, 
               targets: Dict[str, Optional[float]] = None,
               limits: Dict[str, Tuple[Optional[float], Optional[float]]] = None) -> MealPlan:
@@ -165,42 +470,16 @@ class MealPlanBuilder:
             MealPlan: Validovaný jídelníček
             
         Raises:
-            ValueError: Pokud jídelníček nesplňuje omezení
+            PlanValidationError: Pokud jídelníček nesplňuje omezení
+                (podtřída ValueError, atribut violation s prvním porušením)
         """
         try:
-            # Validace počtu položek ve slotech
-            for slot, (min_cap, max_cap) in self._slot_caps.items():
-                items = self._get_slot_items(slot)
-                if len(items) < min_cap:
-                    raise ValueError(f"Slot '{slot}': příliš málo položek ({len(items)} < {min_cap})")
-                if len(items) > max_cap:
-                    raise ValueError(f"Slot '{slot}': příliš mnoho položek ({len(items)} > {max_cap})")
-            
-            # Vytvoření jídelníčku
-            plan = MealPlan(
-                breakfast=list(self._breakfast),
-                lunch=list(self._lunch),
-                dinner=list(self._dinner),
-                snacks=list(self._snacks)
-            )
-            
-            # Validace proti cílům a limitům
-            if targets or limits:
-                totals = plan.totals()
-                
-                # Validace limitů
-                if limits:
-                    for metric, (min_val, max_val) in limits.items():
-                        val = totals.get(metric, 0.0)
-                        if min_val is not None and val < min_val:
-                            raise ValueError(f"{metric}: {val} < minimální hodnota {min_val}")
-                        if max_val is not None and val > max_val:
-                            raise ValueError(f"{metric}: {val} > maximální hodnota {max_val}")
-            
-            return plan
-            
+            plan, violations = self.try_build(targets, limits)
         except Exception as e:
             raise ValueError(f"Chyba při vytváření jídelníčku: {e}")
+        if violations:
+            raise _violation_error(violations[0])
+        return plan
 
     def _get_slot_items(self, slot: str) -> List[FoodItem]:
         """Pomocná metoda pro získání položek ze slotu."""
@@ -214,123 +493,963 @@ class MealPlanBuilder:
             return self._snacks
         return []
 
+# ---------- COLUMNAR CATALOG ----------
+def _encode_labels(label_sets: List[Iterable[str]], vocab: Dict[str, int]) -> np.ndarray:
+    """
+    Zakóduje množiny štítků (časy jídel, tagy) do bitových masek.
+
+    Každý štítek dostane ve slovníku vocab pořadové číslo bitu. Výsledkem
+    je matice uint64 o rozměru (počet položek, počet 64bitových slov).
+    """
+    masks = []
+    for labels in label_sets:
+        mask = 0
+        for label in labels:
+            if label not in vocab:
+                vocab[label] = len(vocab)
+            mask |= 1 << vocab[label]
+        masks.append(mask)
+
+    words = max(1, (len(vocab) + 63) // 64)
+    encoded = np.zeros((len(masks), words), dtype=np.uint64)
+    for word in range(words):
+        shift = 64 * word
+        encoded[:, word] = [(mask >> shift) & 0xFFFFFFFFFFFFFFFF for mask in masks]
+    return encoded
+
+def _label_mask(bits: np.ndarray, vocab: Dict[str, int], label: str) -> np.ndarray:
+    """Vrátí booleovskou masku položek, které mají daný štítek."""
+    if label not in vocab:
+        return np.zeros(len(bits), dtype=bool)
+    word, bit = divmod(vocab[label], 64)
+    return (bits[:, word] & np.uint64(1 << bit)) != 0
+
+_CATALOG_VERSIONS = itertools.count(1)
+
+class _StringTable:
+    """
+    Tabulka řetězců nad jedním UTF-8 bufferem.
+    
+    Řetězec i leží v blob[starts[i]:ends[i]]; buffer může být i mapovaný
+    soubor (mmap), řetězce se dekódují až při přístupu.
+    """
+    
+    def __init__(self, blob: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        self.blob = blob
+        self.starts = starts
+        self.ends = ends
+    
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "_StringTable":
+        """Vytvoří tabulku ze seznamu řetězců."""
+        encoded = [text.encode('utf-8') for text in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets[:-1], offsets[1:])
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, index: int) -> str:
+        return self.blob[int(self.starts[index]):int(self.ends[index])].tobytes().decode('utf-8')
+    
+    def take(self, indices: np.ndarray) -> "_StringTable":
+        """Vrátí tabulku s řetězci na zadaných indexech (sdílí buffer)."""
+        return _StringTable(self.blob, self.starts[indices], self.ends[indices])
+
+class FoodCatalog:
+    """
+    Sloupcový katalog potravin pro rychlou optimalizaci.
+
+    Nutriční hodnoty jsou uloženy v souvislých polích NumPy (jeden řádek
+    matice na živinu v pořadí NUTRIENTS), časy jídel a tagy jako bitové
+    masky. Katalog se chová jako sekvence FoodItem, takže ho lze předat
+    všude, kde se dosud používal List[FoodItem].
+
+    Katalog otevřený z binární cache nemá seznam FoodItem; položky se
+    vytvářejí ze sloupců až při přístupu (names = tabulka názvů). Takový
+    katalog drží mapovaný soubor, který uvolní close() nebo blok with.
+    """
+
+    def __init__(self,
+                 items: Optional[List[FoodItem]],
+                 matrix: np.ndarray,
+                 meal_bits: np.ndarray,
+                 tag_bits: np.ndarray,
+                 meal_vocab: Dict[str, int],
+                 tag_vocab: Dict[str, int],
+                 names: Optional[_StringTable] = None,
+                 label_cache: Optional[Dict[Tuple[int, bytes], frozenset]] = None):
+        if items is None and names is None:
+            raise ValueError("Katalog potřebuje seznam potravin nebo tabulku názvů")
+        self._items = items
+        self._names = names
+        self._label_cache = {} if label_cache is None else label_cache
+        self.matrix = matrix
+        self.meal_bits = meal_bits
+        self.tag_bits = tag_bits
+        self.meal_vocab = meal_vocab
+        self.tag_vocab = tag_vocab
+        self.index: Optional["FoodIndex"] = None
+        # Verze katalogu pro klíče cache (každý katalog má vlastní)
+        self.version = next(_CATALOG_VERSIONS)
+        # Mapovaný soubor binární cache (nastaví open_catalog_binary)
+        self._buffer: Optional[mmap.mmap] = None
+
+    @classmethod
+    def from_items(cls, foods: Iterable[FoodItem]) -> "FoodCatalog":
+        """Vytvoří katalog ze seznamu potravin."""
+        items = list(foods)
+        matrix = np.array(
+            [[item.get_nutrient_value(nutrient) for item in items] for nutrient in NUTRIENTS],
+            dtype=np.float64
+        ).reshape(len(NUTRIENTS), len(items))
+
+        meal_vocab = {meal_time: bit for bit, meal_time in enumerate(MEAL_TIMES)}
+        tag_vocab: Dict[str, int] = {}
+        meal_bits = _encode_labels([item.meal_times for item in items], meal_vocab)
+        tag_bits = _encode_labels([item.tags for item in items], tag_vocab)
+        return cls(items, matrix, meal_bits, tag_bits, meal_vocab, tag_vocab)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[1]
+
+    def __iter__(self):
+        if self._items is not None:
+            return iter(self._items)
+        return (self._materialize(i) for i in range(len(self)))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self))[key])
+        if self._items is not None:
+            return self._items[key]
+        return self._materialize(range(len(self))[key])
+
+    def __repr__(self) -> str:
+        return f"FoodCatalog({len(self)} potravin)"
+
+    def name(self, index: int) -> str:
+        """Vrátí název potraviny bez vytváření FoodItem."""
+        if self._items is not None:
+            return self._items[index].name
+        return self._names[index]
+
+    def nutrient(self, nutrient: str) -> np.ndarray:
+        """Vrátí sloupec hodnot živiny (nuly pro neznámou živinu)."""
+        if nutrient in NUTRIENTS:
+            return self.matrix[NUTRIENTS.index(nutrient)]
+        return np.zeros(len(self), dtype=np.float64)
+
+    def meal_time_mask(self, meal_time: str) -> np.ndarray:
+        """Vrátí masku potravin vhodných pro daný čas jídla."""
+        return _label_mask(self.meal_bits, self.meal_vocab, meal_time)
+
+    def tag_mask(self, tag: str) -> np.ndarray:
+        """Vrátí masku potravin s daným tagem."""
+        return _label_mask(self.tag_bits, self.tag_vocab, tag)
+
+    def close(self):
+        """
+        Uvolní mapovaný soubor katalogu z binární cache (jinak nic nedělá).
+        
+        Zavřený katalog se už nesmí používat. Podkatalogy z take() sdílejí
+        tabulku názvů; dokud existují, mapování se uvolní až s nimi.
+        """
+        buffer, self._buffer = self._buffer, None
+        if buffer is None:
+            return
+        self.matrix = self.meal_bits = self.tag_bits = None
+        self._names = None
+        self.index = None
+        try:
+            buffer.close()
+        except BufferError:
+            pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __getstate__(self):
+        # Mapovaný soubor nejde serializovat; sloupce (pohledy do něj) se
+        # do pickle zkopírují, takže katalog funguje i v procesech "spawn"
+        state = self.__dict__.copy()
+        state["_buffer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Verze jsou unikátní jen v rámci procesu
+        self.version = next(_CATALOG_VERSIONS)
+
+    def build_index(self) -> "FoodIndex":
+        """Vytvoří (jednou) invertovaný index časů jídel a tagů."""
+        if self.index is None:
+            self.index = FoodIndex(self)
+        return self.index
+
+    def take(self, indices: np.ndarray) -> "FoodCatalog":
+        """Vrátí podkatalog s položkami na zadaných indexech."""
+        indices = np.asarray(indices, dtype=np.intp)
+        return FoodCatalog(
+            None if self._items is None else [self._items[i] for i in indices],
+            np.ascontiguousarray(self.matrix[:, indices]),
+            self.meal_bits[indices],
+            self.tag_bits[indices],
+            self.meal_vocab,
+            self.tag_vocab,
+            None if self._names is None else self._names.take(indices),
+            self._label_cache
+        )
+
+    def _materialize(self, index: int) -> FoodItem:
+        """Vytvoří FoodItem ze sloupců katalogu."""
+        calories, protein, fat, carbs = self.matrix[:, index].tolist()
+        return FoodItem(
+            self._names[index], int(calories), protein, fat, carbs,
+            self._decode_labels(self.meal_bits[index], self.meal_vocab),
+            self._decode_labels(self.tag_bits[index], self.tag_vocab)
+        )
+
+    def _decode_labels(self, bits: np.ndarray, vocab: Dict[str, int]) -> frozenset:
+        """Převede bitovou masku zpět na (sdílenou) množinu štítků."""
+        key = (id(vocab), bits.tobytes())
+        labels = self._label_cache.get(key)
+        if labels is None:
+            labels = _intern_labels(
+                label for label, bit in vocab.items()
+                if int(bits[bit // 64]) >> (bit % 64) & 1
+            )
+            self._label_cache[key] = labels
+        return labels
+
+# Od jakého podílu katalogu vrací rozsahový dotaz indexy přes masku
+# (O(n)) místo řazení výřezu (O(k log k)); podle benchmark_planner.py
+# je řazení pomalejší zhruba od 20–30 % katalogu
+_RANGE_MASK_SHARE = 0.25
+
+class FoodIndex:
+    """
+    Invertovaný index katalogu: čas jídla / tag -> seřazené pole indexů.
+    
+    Vytváří se jednou (FoodCatalog.build_index, load_foods s katalogem)
+    a filter_items pak skládané predikáty podle času jídla a tagů řeší
+    průnikem seřazených polí místo průchodu celým katalogem.
+    
+    Pro každou živinu drží také rozsahový index (potraviny seřazené podle
+    hodnoty), takže predikáty max_nutrient/min_nutrient se řeší binárním
+    vyhledáváním. Rozsahový index živiny vzniká při prvním dotazu.
+    """
+    
+    def __init__(self, catalog: "FoodCatalog"):
+        self.size = len(catalog)
+        self.meal_times = {label: np.flatnonzero(catalog.meal_time_mask(label)) for label in catalog.meal_vocab}
+        self.tags = {label: np.flatnonzero(catalog.tag_mask(label)) for label in catalog.tag_vocab}
+        self._without_tags: Dict[str, np.ndarray] = {}
+        self._matrix = catalog.matrix
+        self._ranges: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+    
+    def nutrient_range_ids(self, nutrient: str,
+                           low: Optional[float] = None,
+                           high: Optional[float] = None) -> np.ndarray:
+        """
+        Indexy potravin s low ≤ hodnota živiny ≤ high (seřazené).
+        
+        Úzký rozsah se vezme z rozsahového indexu a seřadí; široký
+        (nad _RANGE_MASK_SHARE katalogu) se spočítá maskou přes sloupec.
+        Neznámá živina má hodnotu 0.0 (stejně jako get_nutrient_value).
+        """
+        if nutrient not in NUTRIENTS:
+            inside = (low is None or 0.0 >= low) and (high is None or 0.0 <= high)
+            return np.arange(self.size) if inside else np.zeros(0, dtype=np.intp)
+        order, start, end = self._range(nutrient, low, high)
+        if end - start <= _RANGE_MASK_SHARE * self.size:
+            return np.sort(order[start:end])
+        
+        column = self._matrix[NUTRIENTS.index(nutrient)]
+        mask = ~np.isnan(column)
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= column <= high
+        return np.flatnonzero(mask)
+    
+    def nutrient_range_count(self, nutrient: str,
+                             low: Optional[float] = None,
+                             high: Optional[float] = None) -> int:
+        """Počet potravin v rozsahu (jen binární vyhledávání)."""
+        if nutrient not in NUTRIENTS:
+            return len(self.nutrient_range_ids(nutrient, low, high))
+        _, start, end = self._range(nutrient, low, high)
+        return max(0, end - start)
+    
+    def _range(self, nutrient: str, low: Optional[float],
+               high: Optional[float]) -> Tuple[np.ndarray, int, int]:
+        """Seřazené pořadí živiny a hranice rozsahu v něm."""
+        row = NUTRIENTS.index(nutrient)
+        if row not in self._ranges:
+            order = np.argsort(self._matrix[row], kind="stable")
+            values = self._matrix[row][order]
+            # NaN jsou na konci a nesplňují žádné porovnání
+            valid = len(values) - int(np.isnan(values).sum())
+            self._ranges[row] = (order[:valid], values[:valid])
+        order, values = self._ranges[row]
+        
+        start = 0 if low is None else int(np.searchsorted(values, low, side="left"))
+        end = len(values) if high is None else int(np.searchsorted(values, high, side="right"))
+        return order, start, end
+    
+    def meal_time_ids(self, meal_time: str) -> np.ndarray:
+        """Indexy potravin vhodných pro daný čas jídla."""
+        return self.meal_times.get(meal_time, np.zeros(0, dtype=np.intp))
+    
+    def tag_ids(self, tag: str) -> np.ndarray:
+        """Indexy potravin s daným tagem."""
+        return self.tags.get(tag, np.zeros(0, dtype=np.intp))
+    
+    def without_tag_ids(self, tag: str) -> np.ndarray:
+        """Indexy potravin bez daného tagu (doplněk se ukládá)."""
+        ids = self._without_tags.get(tag)
+        if ids is None:
+            ids = np.setdiff1d(np.arange(self.size), self.tag_ids(tag), assume_unique=True)
+            self._without_tags[tag] = ids
+        return ids
+
+def intersect_ids(id_arrays: List[np.ndarray]) -> np.ndarray:
+    """Průnik seřazených polí indexů (od nejkratšího, s předčasným koncem)."""
+    arrays = sorted(id_arrays, key=len)
+    result = arrays[0]
+    for ids in arrays[1:]:
+        if not len(result):
+            break
+        result = np.intersect1d(result, ids, assume_unique=True)
+    return result
+
+def _as_catalog(foods: Union["FoodCatalog", Iterable[FoodItem]]) -> FoodCatalog:
+    """Převede seznam potravin na katalog (katalog vrátí beze změny)."""
+    if isinstance(foods, FoodCatalog):
+        return foods
+    return FoodCatalog.from_items(foods)
+
 # ---------- FUNCTIONAL PROGRAMMING FILTERS ----------
 Predicate = Callable[[FoodItem], bool]
 
-def filter_items(items: Iterable[FoodItem], *predicates: Predicate) -> List[FoodItem]:
+# Pokud je kandidátů výrazně méně než výsledků dalšího indexového kroku,
+# ověří se kandidáti maskou místo průniku s (velkým) polem z indexu
+_MASK_SWITCH_RATIO = 8
+
+class FoodPredicate(ABC):
+    """
+    Základ inspektovatelných predikátů vracených továrnami by_meal_time,
+    by_tag, not_tag, max_nutrient a min_nutrient.
+    
+    Predikát je stále volatelný nad FoodItem, navíc ho ale lze vyhodnotit
+    vektorově nad katalogem (mask), případně přes index (index_ids),
+    a odhadnout jeho selektivitu pro plánovač dotazů.
+    """
+    
+    # Odhad podílu vyhovujících potravin, pokud katalog nemá index
+    default_selectivity = 0.5
+    
+    @abstractmethod
+    def __call__(self, item: FoodItem) -> bool:
+        """Vyhodnotí predikát pro jednu potravinu."""
+    
+    @abstractmethod
+    def mask(self, catalog: FoodCatalog, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Maska vyhovujících potravin (jen pro indexy ids, jsou-li zadány)."""
+    
+    def index_ids(self, index: FoodIndex) -> Optional[np.ndarray]:
+        """Seřazené indexy vyhovujících potravin, nebo None bez podpory indexu."""
+        return None
+    
+    def selectivity(self, catalog: FoodCatalog) -> float:
+        """Odhad podílu potravin, které predikát splní."""
+        return self.default_selectivity
+
+class MealTimePredicate(FoodPredicate):
+    """Potravina je vhodná pro daný čas jídla."""
+    
+    def __init__(self, meal_time: str):
+        self.meal_time = meal_time
+    
+    def __call__(self, item: FoodItem) -> bool:
+        return self.meal_time in item.meal_times
+    
+    def __repr__(self) -> str:
+        return f"by_meal_time({self.meal_time!r})"
+    
+    def mask(self, catalog: FoodCatalog, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        bits = catalog.meal_bits if ids is None else catalog.meal_bits[ids]
+        return _label_mask(bits, catalog.meal_vocab, self.meal_time)
+    
+    def index_ids(self, index: FoodIndex) -> np.ndarray:
+        return index.meal_time_ids(self.meal_time)
+    
+    def selectivity(self, catalog: FoodCatalog) -> float:
+        if catalog.index is None or not len(catalog):
+            return self.default_selectivity
+        return len(catalog.index.meal_time_ids(self.meal_time)) / len(catalog)
+
+class TagPredicate(FoodPredicate):
+    """Potravina má (nebo s negate=True nemá) daný tag."""
+    
+    default_selectivity = 0.3
+    
+    def __init__(self, tag: str, negate: bool = False):
+        self.tag = tag
+        self.negate = negate
+    
+    def __call__(self, item: FoodItem) -> bool:
+        return (self.tag in item.tags) != self.negate
+    
+    def __repr__(self) -> str:
+        return f"{'not_tag' if self.negate else 'by_tag'}({self.tag!r})"
+    
+    def mask(self, catalog: FoodCatalog, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        bits = catalog.tag_bits if ids is None else catalog.tag_bits[ids]
+        mask = _label_mask(bits, catalog.tag_vocab, self.tag)
+        return ~mask if self.negate else mask
+    
+    def index_ids(self, index: FoodIndex) -> np.ndarray:
+        return index.without_tag_ids(self.tag) if self.negate else index.tag_ids(self.tag)
+    
+    def selectivity(self, catalog: FoodCatalog) -> float:
+        if catalog.index is None or not len(catalog):
+            return 1 - self.default_selectivity if self.negate else self.default_selectivity
+        share = len(catalog.index.tag_ids(self.tag)) / len(catalog)
+        return 1 - share if self.negate else share
+
+class NutrientPredicate(FoodPredicate):
+    """Hodnota živiny leží v mezích low ≤ hodnota ≤ high."""
+    
+    def __init__(self, nutrient: str, low: Optional[float] = None, high: Optional[float] = None):
+        self.nutrient = nutrient
+        self.low = low
+        self.high = high
+    
+    def __call__(self, item: FoodItem) -> bool:
+        value = item.get_nutrient_value(self.nutrient)
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+    
+    def __repr__(self) -> str:
+        if self.low is None:
+            return f"max_nutrient({self.nutrient!r}, {self.high})"
+        if self.high is None:
+            return f"min_nutrient({self.nutrient!r}, {self.low})"
+        return f"nutrient_between({self.nutrient!r}, {self.low}, {self.high})"
+    
+    def mask(self, catalog: FoodCatalog, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        values = catalog.nutrient(self.nutrient)
+        if ids is not None:
+            values = values[ids]
+        mask = np.ones(len(values), dtype=bool)
+        if self.low is not None:
+            mask &= values >= self.low
+        if self.high is not None:
+            mask &= values <= self.high
+        return mask
+    
+    def index_ids(self, index: FoodIndex) -> np.ndarray:
+        return index.nutrient_range_ids(self.nutrient, self.low, self.high)
+    
+    def selectivity(self, catalog: FoodCatalog) -> float:
+        if catalog.index is None or not len(catalog):
+            return self.default_selectivity
+        return catalog.index.nutrient_range_count(self.nutrient, self.low, self.high) / len(catalog)
+
+class CompositePredicate(FoodPredicate):
+    """Konjunkce predikátů (výsledek compose_predicates)."""
+    
+    def __init__(self, parts: Iterable[Predicate]):
+        # Vnořené kompozice se zploští, aby je plánovač viděl celé
+        self.parts: List[Predicate] = []
+        for part in parts:
+            if isinstance(part, CompositePredicate):
+                self.parts.extend(part.parts)
+            else:
+                self.parts.append(part)
+    
+    def __call__(self, item: FoodItem) -> bool:
+        return all(predicate(item) for predicate in self.parts)
+    
+    def __repr__(self) -> str:
+        return f"compose_predicates({', '.join(map(repr, self.parts))})"
+    
+    def mask(self, catalog: FoodCatalog, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        size = len(catalog) if ids is None else len(ids)
+        positions = np.arange(size) if ids is None else ids
+        keep = np.ones(size, dtype=bool)
+        for predicate in self.parts:
+            if isinstance(predicate, FoodPredicate):
+                keep &= predicate.mask(catalog, ids)
+            else:
+                keep &= np.fromiter((predicate(catalog[i]) for i in positions), dtype=bool, count=size)
+        return keep
+    
+    def index_ids(self, index: FoodIndex) -> Optional[np.ndarray]:
+        if not self.parts or not all(isinstance(p, FoodPredicate) for p in self.parts):
+            return None
+        id_arrays = [predicate.index_ids(index) for predicate in self.parts]
+        if any(ids is None for ids in id_arrays):
+            return None
+        return intersect_ids(id_arrays)
+    
+    def selectivity(self, catalog: FoodCatalog) -> float:
+        result = 1.0
+        for predicate in self.parts:
+            if isinstance(predicate, FoodPredicate):
+                result *= predicate.selectivity(catalog)
+        return result
+
+def plan_predicates(catalog: Optional[FoodCatalog],
+                    predicates: Iterable[Predicate]) -> List[Tuple[str, Predicate]]:
+    """
+    Plánovač dotazu: seřadí predikáty pro co nejlevnější vyhodnocení.
+    
+    Kompozice se zploští. Libovolné uživatelské funkce ("scan") zůstávají
+    na svém místě a v původním pořadí: vidí tak stejné potraviny jako při
+    vyhodnocení v pořadí volajícího (mohou mít vedlejší efekty). Vestavěné
+    predikáty mezi nimi se řadí od nejselektivnějšího, řešitelné indexem
+    ("index") před vektorovými nad maskou ("mask").
+    
+    Returns:
+        List[Tuple[str, Predicate]]: Kroky plánu (způsob, predikát)
+    """
+    flat: List[Predicate] = []
+    for predicate in predicates:
+        if isinstance(predicate, CompositePredicate):
+            flat.extend(predicate.parts)
+        else:
+            flat.append(predicate)
+    
+    indexed = catalog is not None and catalog.index is not None
+    plan: List[Tuple[str, Predicate]] = []
+    segment = []
+    
+    def flush():
+        segment.sort(key=lambda step: step[:2])
+        plan.extend((method, predicate) for *_, method, predicate in segment)
+        segment.clear()
+    
+    for position, predicate in enumerate(flat):
+        if not isinstance(predicate, FoodPredicate):
+            flush()
+            plan.append(("scan", predicate))
+            continue
+        method = "index" if indexed else "mask"
+        estimate = predicate.selectivity(catalog) if catalog is not None else predicate.default_selectivity
+        segment.append((estimate, position, method, predicate))
+    flush()
+    return plan
+
+def filter_items(items: Union[FoodCatalog, Iterable[FoodItem]], *predicates: Predicate):
     """
     Funkcionální filtrování potravin pomocí predikátů.
     Vrací seznam potravin splňující všechny predikáty.
+
+    Predikáty se vyhodnocují v pořadí podle plánovače (plan_predicates)
+    a vyhodnocování končí, jakmile nezbývá žádný kandidát. Pro FoodCatalog
+    vrací podkatalog: predikáty řešitelné indexem se vyhodnotí průnikem
+    indexů, ostatní vestavěné predikáty vektorově jen nad zbývajícími
+    kandidáty a uživatelské funkce položku po položce.
     """
+    if isinstance(items, FoodCatalog):
+        ids: Optional[np.ndarray] = None
+        for method, predicate in plan_predicates(items, predicates):
+            if ids is not None and not len(ids):
+                break
+            if method == "index" and ids is not None and \
+                    len(ids) * _MASK_SWITCH_RATIO < predicate.selectivity(items) * len(items):
+                # Zbývá málo kandidátů: levnější je ověřit je přímo
+                method = "mask"
+            if method == "index":
+                found = predicate.index_ids(items.index)
+                if found is not None:
+                    ids = found if ids is None else intersect_ids([ids, found])
+                    continue
+                method = "mask"
+            if method == "mask":
+                ids = np.flatnonzero(predicate.mask(items)) if ids is None else ids[predicate.mask(items, ids)]
+            else:
+                candidates = range(len(items)) if ids is None else ids
+                ids = np.array([i for i in candidates if predicate(items[i])], dtype=np.intp)
+        return items.take(np.arange(len(items)) if ids is None else ids)
+
+    ordered = [predicate for _, predicate in plan_predicates(None, predicates)]
     def ok(item: FoodItem) -> bool:
-        return all(predicate(item) for predicate in predicates)
+        return all(predicate(item) for predicate in ordered)
     return list(filter(ok, items))
 
 def compose_predicates(*predicates: Predicate) -> Predicate:
     """Vytvoří nový predikát jako kompozici zadaných predikátů."""
-    def composed(item: FoodItem) -> bool:
-        return all(predicate(item) for predicate in predicates)
-    return composed
+    return CompositePredicate(predicates)
 
 # Základní predikáty
 def by_meal_time(meal_time: str) -> Predicate:
     """Vrací predikát pro filtrování podle času jídla."""
-    return lambda item: meal_time in item.meal_times
+    return MealTimePredicate(meal_time)
 
 def by_tag(tag: str) -> Predicate:
     """Vrací predikát pro filtrování podle tagu."""
-    return lambda item: tag in item.tags
+    return TagPredicate(tag)
 
 def not_tag(tag: str) -> Predicate:
     """Vrací predikát pro vyloučení podle tagu."""
-    return lambda item: tag not in item.tags
+    return TagPredicate(tag, negate=True)
 
 def max_nutrient(nutrient: str, value: float) -> Predicate:
     """Vrací predikát pro maximální hodnotu živiny."""
-    return lambda item: item.get_nutrient_value(nutrient) <= value
+    return NutrientPredicate(nutrient, high=value)
 
 def min_nutrient(nutrient: str, value: float) -> Predicate:
     """Vrací predikát pro minimální hodnotu živiny."""
-    return lambda item: item.get_nutrient_value(nutrient) >= value
+    return NutrientPredicate(nutrient, low=value)
 
 # ---------- DATA LOADING ----------
-def load_foods(csv_file: str) -> List[FoodItem]:
+_REQUIRED_FIELDS = ('name', 'calories', 'protein', 'fat', 'carbs')
+
+def iter_foods(csv_file: str) -> Iterable[FoodItem]:
     """
-    Načte potraviny z CSV souboru.
+    Postupně (streamovaně) načítá potraviny z CSV souboru.
+    
+    Pozice sloupců se zjistí jednou z hlavičky, řádky se čtou bez
+    vytváření slovníků a opakující se množiny meal_times/tags se sdílejí
+    (internují) jako frozenset. Nevalidní řádky se přeskočí s varováním.
     
     Args:
         csv_file: Cesta k CSV souboru
         
-    Returns:
-        List[FoodItem]: Seznam potravin
+    Yields:
+        FoodItem: Potraviny v pořadí souboru
         
     Raises:
         FileNotFoundError: Pokud soubor neexistuje
-        ValueError: Pokud data nejsou validní
+        ValueError: Pokud hlavička neobsahuje povinný sloupec
     """
-    foods: List[FoodItem] = []
-    
-    try:
-        with open(csv_file, newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            for row_num, row in enumerate(reader, 1):
-                try:
-                    # Validace povinných polí
-                    required_fields = ['name', 'calories', 'protein', 'fat', 'carbs']
-                    for field in required_fields:
-                        if field not in row:
-                            raise ValueError(f"Chybí pole '{field}' v řádku {row_num}")
-                    
-                    # Parsování hodnot
-                    name = row['name'].strip()
-                    calories = int(float(row['calories']))
-                    protein = float(row['protein'])
-                    fat = float(row['fat'])
-                    carbs = float(row['carbs'])
-                    
-                    # Parsování meal_times
-                    meal_times = {"breakfast", "lunch", "dinner", "snack"}
-                    if 'meal_times' in row and row['meal_times'].strip():
-                        meal_times = set(part.strip() for part in row['meal_times'].split('|'))
-                    
-                    # Parsování tags
-                    tags = set()
-                    if 'tags' in row and row['tags'].strip():
-                        tags = set(part.strip() for part in row['tags'].split('|'))
-                    
-                    # Vytvoření FoodItem
-                    food = FoodItem(name, calories, protein, fat, carbs, meal_times, tags)
-                    foods.append(food)
-                    
-                except (ValueError, KeyError) as e:
-                    print(f"Varování: Řádek {row_num} přeskočen - {e}")
-                    continue
-                    
-    except FileNotFoundError:
-        print(f"Chyba: Soubor '{csv_file}' nebyl nalezen.")
-        return []
-    except Exception as e:
-        print(f"Chyba při čtení CSV: {e}")
-        return []
-    
-    print(f"✅ Načteno {len(foods)} potravin z '{csv_file}'")
-    return foods
+    with open(csv_file, newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        
+        # Validace povinných polí (jednou pro celý soubor)
+        for field_name in _REQUIRED_FIELDS:
+            if field_name not in header:
+                raise ValueError(f"Chybí pole '{field_name}' v hlavičce")
+        name_col, cal_col, protein_col, fat_col, carbs_col = (
+            header.index(field_name) for field_name in _REQUIRED_FIELDS
+        )
+        meal_col = header.index('meal_times') if 'meal_times' in header else None
+        tags_col = header.index('tags') if 'tags' in header else None
+        
+        # Sdílené množiny pro opakující se hodnoty
+        interned: Dict[str, frozenset] = {"": frozenset()}
+        
+        def labels(raw: str) -> frozenset:
+            value = interned.get(raw)
+            if value is None:
+                value = frozenset(part.strip() for part in raw.split('|')) if raw.strip() else frozenset()
+                interned[raw] = value
+            return value
+        
+        row_num = 0
+        for row in reader:
+            if not row:
+                continue
+            row_num += 1
+            try:
+                # Parsování hodnot
+                name = row[name_col].strip()
+                calories = int(float(row[cal_col]))
+                protein = float(row[protein_col])
+                fat = float(row[fat_col])
+                carbs = float(row[carbs_col])
+                
+                # Parsování meal_times a tags
+                meal_times = labels(row[meal_col]) if meal_col is not None and meal_col < len(row) else frozenset()
+                tags = labels(row[tags_col]) if tags_col is not None and tags_col < len(row) else frozenset()
+                
+                yield FoodItem(name, calories, protein, fat, carbs,
+                               meal_times or _ALL_MEAL_TIMES, tags)
+                
+            except (ValueError, IndexError) as e:
+                print(f"Varování: Řádek {row_num} přeskočen - {e}")
+                continue
 
-# ---------- KNAPSACK ALGORITHM ----------
-class MealOptimizer:
-    """
-    Třída pro optimalizaci výběru potravin pomocí knapsack-like algoritmu.
-    Algoritmus se snaží maximalizovat splnění nutričních cílů při dodržení omezení.
+def iter_food_chunks(csv_file: str, chunk_size: int = 10000) -> Iterable[FoodCatalog]:
     """
+    Načítá CSV soubor po blocích jako sloupcové katalogy.
     
-    @staticmethod
-    def knapsack_optimize(
-        foods: List[FoodItem],
-        targets: Dict[str, float],
-        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    Umožňuje zpracovat i velmi velký soubor bez držení všech potravin
+    v paměti. Každý blok má vlastní slovník tagů (bitové masky bloků
+    nejsou navzájem zarovnané).
+    
+    Args:
+        csv_file: Cesta k CSV souboru
+        chunk_size: Počet potravin v jednom bloku
+        
+    Yields:
+        FoodCatalog: Blok nejvýše chunk_size potravin
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size musí být alespoň 1")
+    chunk: List[FoodItem] = []
+    for food in iter_foods(csv_file):
+        chunk.append(food)
+        if len(chunk) >= chunk_size:
+            yield FoodCatalog.from_items(chunk)
+            chunk = []
+    if chunk:
+        yield FoodCatalog.from_items(chunk)
+
+# ---------- BINARY CATALOG CACHE ----------
+# Formát souboru (little endian, sekce zarovnané na 8 bajtů):
+#   hlavička: magic, počet potravin, počet slov masek meal/tag,
+#             mtime_ns, velikost a SHA-256 zdrojového CSV
+#   matice živin (float64, živiny × potraviny)
+#   bitové masky meal_times a tags (uint64)
+#   tabulky řetězců: názvy potravin, slovník časů jídel, slovník tagů
+#   (počet, offsety uint64, UTF-8 blob)
+_CATALOG_MAGIC = b"FCATv001"
+_CATALOG_HEADER = struct.Struct("<8sQIIqQ32s")
+CATALOG_CACHE_SUFFIX = ".fcat"
+
+def _padding(size: int) -> bytes:
+    """Výplň do násobku 8 bajtů."""
+    return b"\0" * (-size % 8)
+
+def _file_digest(path: str) -> bytes:
+    """SHA-256 obsahu souboru."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+def _write_string_table(file, strings: List[str]):
+    """Zapíše tabulku řetězců (počet, offsety, blob)."""
+    table = _StringTable.from_strings(strings)
+    offsets = np.append(table.starts, table.ends[-1:] if len(table) else np.zeros(1, dtype=np.uint64))
+    file.write(struct.pack("<Q", len(strings)))
+    file.write(offsets.astype("<u8").tobytes())
+    blob = table.blob.tobytes()
+    file.write(blob + _padding(len(blob)))
+
+def _read_string_table(buffer, offset: int) -> Tuple[_StringTable, int]:
+    """Přečte tabulku řetězců z bufferu; vrací (tabulka, nový offset)."""
+    (count,) = struct.unpack_from("<Q", buffer, offset)
+    offset += 8
+    offsets = np.frombuffer(buffer, dtype="<u8", count=count + 1, offset=offset)
+    offset += 8 * (count + 1)
+    size = int(offsets[-1])
+    blob = np.frombuffer(buffer, dtype=np.uint8, count=size, offset=offset)
+    return _StringTable(blob, offsets[:-1], offsets[1:]), offset + size + len(_padding(size))
+
+def save_catalog_binary(catalog: FoodCatalog, path: str, source_csv: Optional[str] = None):
+    """
+    Uloží katalog do binárního formátu pro rychlé otevření přes mmap.
+    
+    Pokud je zadán source_csv, uloží se jeho mtime, velikost a hash,
+    aby bylo možné poznat zastaralou cache. Zápis je atomický.
+    """
+    mtime_ns, size, digest = 0, 0, b"\0" * 32
+    if source_csv is not None:
+        info = os.stat(source_csv)
+        mtime_ns, size, digest = info.st_mtime_ns, info.st_size, _file_digest(source_csv)
+    
+    def vocab_labels(vocab: Dict[str, int]) -> List[str]:
+        return sorted(vocab, key=vocab.get)
+    
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(_CATALOG_HEADER.pack(
+            _CATALOG_MAGIC, len(catalog), catalog.meal_bits.shape[1], catalog.tag_bits.shape[1],
+            mtime_ns, size, digest
+        ))
+        file.write(np.ascontiguousarray(catalog.matrix, dtype="<f8").tobytes())
+        file.write(np.ascontiguousarray(catalog.meal_bits, dtype="<u8").tobytes())
+        file.write(np.ascontiguousarray(catalog.tag_bits, dtype="<u8").tobytes())
+        _write_string_table(file, [catalog.name(i) for i in range(len(catalog))])
+        _write_string_table(file, vocab_labels(catalog.meal_vocab))
+        _write_string_table(file, vocab_labels(catalog.tag_vocab))
+    os.replace(temp_path, path)
+
+def open_catalog_binary(path: str) -> FoodCatalog:
+    """
+    Otevře binární katalog přes mmap.
+    
+    Sloupce jsou jen pohledy do mapovaného souboru (bez kopírování),
+    položky FoodItem se vytvářejí až při přístupu. Mapování uvolní
+    FoodCatalog.close() (nebo blok with); na Windows je to nutné, než
+    se cache přepíše.
+    
+    Raises:
+        ValueError: Pokud soubor není platný binární katalog (špatná
+            hlavička, zkrácený nebo poškozený soubor); mapování se zavře
+    """
+    with open(path, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"Soubor '{path}' je prázdný") from None
+    
+    matrix = meal_bits = tag_bits = names = meal_labels = tag_labels = None
+    error = None
+    try:
+        magic, count, meal_words, tag_words, _, _, _ = _CATALOG_HEADER.unpack_from(buffer, 0)
+        if magic != _CATALOG_MAGIC:
+            raise ValueError(f"Soubor '{path}' není binární katalog potravin")
+        offset = _CATALOG_HEADER.size
+        
+        matrix = np.frombuffer(buffer, dtype="<f8", count=len(NUTRIENTS) * count, offset=offset)
+        offset += matrix.nbytes
+        meal_bits = np.frombuffer(buffer, dtype="<u8", count=meal_words * count, offset=offset)
+        offset += meal_bits.nbytes
+        tag_bits = np.frombuffer(buffer, dtype="<u8", count=tag_words * count, offset=offset)
+        offset += tag_bits.nbytes
+        names, offset = _read_string_table(buffer, offset)
+        meal_labels, offset = _read_string_table(buffer, offset)
+        tag_labels, offset = _read_string_table(buffer, offset)
+        if offset != len(buffer) or len(names) != count:
+            raise ValueError(f"Soubor '{path}' má neplatnou délku")
+    except (ValueError, struct.error) as e:
+        error = str(e)
+    if error is not None:
+        # Pohledy do bufferu se zahodí, aby šlo mapování hned zavřít
+        matrix = meal_bits = tag_bits = names = meal_labels = tag_labels = None
+        try:
+            buffer.close()
+        except BufferError:
+            pass
+        raise ValueError(f"Poškozený binární katalog '{path}': {error}")
+    
+    catalog = FoodCatalog(
+        None,
+        matrix.reshape(len(NUTRIENTS), count),
+        meal_bits.reshape(count, meal_words),
+        tag_bits.reshape(count, tag_words),
+        {meal_labels[i]: i for i in range(len(meal_labels))},
+        {tag_labels[i]: i for i in range(len(tag_labels))},
+        names
+    )
+    catalog._buffer = buffer
+    return catalog
+
+def load_catalog_cached(csv_file: str, cache_file: Optional[str] = None) -> FoodCatalog:
+    """
+    Načte katalog z binární cache, kterou podle potřeby přestaví z CSV.
+    
+    Cache je platná, pokud souhlasí mtime a velikost CSV. Při změně
+    mtime se porovná hash obsahu; pokud se obsah nezměnil, jen se
+    aktualizuje hlavička, jinak se cache znovu vytvoří. Znovu se vytvoří
+    i cache, kterou nejde otevřít (zkrácený nebo poškozený soubor).
+    
+    Raises:
+        FileNotFoundError: Pokud CSV soubor neexistuje
+    """
+    cache_file = cache_file or csv_file + CATALOG_CACHE_SUFFIX
+    info = os.stat(csv_file)
+    
+    try:
+        with open(cache_file, "rb") as file:
+            header = file.read(_CATALOG_HEADER.size)
+        magic, count, meal_words, tag_words, mtime_ns, size, digest = _CATALOG_HEADER.unpack(header)
+    except (OSError, struct.error):
+        magic = None
+    
+    if magic == _CATALOG_MAGIC and size == info.st_size:
+        fresh = mtime_ns == info.st_mtime_ns
+        if not fresh and digest == _file_digest(csv_file):
+            # Stejný obsah, jen nový mtime: stačí přepsat hlavičku
+            with open(cache_file, "r+b") as file:
+                file.write(_CATALOG_HEADER.pack(
+                    magic, count, meal_words, tag_words, info.st_mtime_ns, size, digest
+                ))
+            fresh = True
+        if fresh:
+            try:
+                return open_catalog_binary(cache_file)
+            except ValueError:
+                pass  # Zkrácená nebo poškozená cache se přestaví
+    
+    catalog = FoodCatalog.from_items(iter_foods(csv_file))
+    save_catalog_binary(catalog, cache_file, source_csv=csv_file)
+    return open_catalog_binary(cache_file)
+
+def load_foods(csv_file: str, as_catalog: bool = False,
+               use_cache: bool = False) -> Union[List[FoodItem], FoodCatalog]:
+    """
+    Načte potraviny z CSV souboru.
+    
+    Args:
+        csv_file: Cesta k CSV souboru
+        as_catalog: Vrátit sloupcový FoodCatalog místo seznamu
+        use_cache: Otevřít katalog z binární cache (csv_file + ".fcat")
+            přes mmap; cache se vytvoří vedle CSV a automaticky přestaví
+            při změně CSV. Vrací vždy FoodCatalog, který je vhodné po
+            použití zavřít (close() nebo blok with).
+        
+    Returns:
+        List[FoodItem]: Seznam potravin (nebo FoodCatalog)
+    """
+    if use_cache:
+        try:
+            catalog = load_catalog_cached(csv_file)
+        except FileNotFoundError:
+            print(f"Chyba: Soubor '{csv_file}' nebyl nalezen.")
+            return FoodCatalog.from_items([])
+        except Exception as e:
+            print(f"Chyba při čtení cache katalogu: {e}")
+            return load_foods(csv_file, as_catalog=True)
+        print(f"✅ Načteno {len(catalog)} potravin z '{csv_file}' (cache)")
+        catalog.build_index()
+        return catalog
+    
+    try:
+        foods = list(iter_foods(csv_file))
+    except FileNotFoundError:
+        print(f"Chyba: Soubor '{csv_file}' nebyl nalezen.")
+        foods = []
+    except Exception as e:
+        print(f"Chyba při čtení CSV: {e}")
+        foods = []
+    else:
+        print(f"✅ Načteno {len(foods)} potravin z '{csv_file}'")
+    
+    if not as_catalog:
+        return foods
+    catalog = FoodCatalog.from_items(foods)
+    catalog.build_index()
+    return catalog
+
+# ---------- KNAPSACK ALGORITHM ----------
+# Top-k výběr kandidátů: hlava = max(32, 4 × max_items) nejlepších potravin,
+# použije se jen pokud je katalog alespoň 8× větší než hlava
+_TOPK_MIN_CANDIDATES = 32
+_TOPK_MULTIPLIER = 4
+_TOPK_RATIO = 8
+# Po kolika kandidátech převádí greedy_fill_indices sloupce matice na floaty
+_FILL_CHUNK = 512
+
+class MealOptimizer:
+    """
+    Třída pro optimalizaci výběru potravin pomocí knapsack-like algoritmu.
+    Algoritmus se snaží maximalizovat splnění nutričních cílů při dodržení omezení.
+    """
+    
+    @staticmethod
+    def knapsack_optimize(
+        foods: Union[FoodCatalog, List[FoodItem]],
+        targets: Dict[str, float],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
         weights: Dict[str, float],
-        max_items: int = 10
+        max_items: int = 10,
+        method: str = "greedy",
+        min_items: int = 0,
+        deadline: Optional[float] = None
     ) -> List[FoodItem]:
         """
         Knapsack-like algoritmus pro výběr potravin.
@@ -340,78 +1459,370 @@ class MealOptimizer:
         2. Seřadí potraviny podle skóre (sestupně)
         3. Vybere potraviny dokud nejsou překročeny limity
         
+        Metoda "dp" místo kroků 2-3 řeší skutečný 0/1 batoh dynamickým
+        programováním nad celočíselnými kaloriemi (viz knapsack_dp; optimální
+        vůči kaloriím, ostatní limity se jen dodatečně filtrují).
+        
         Args:
-            foods: Seznam dostupných potravin
+            foods: Seznam dostupných potravin nebo FoodCatalog
             targets: Cílové nutriční hodnoty
             limits: Omezení (min, max)
             weights: Váhy důležitosti živin
             max_items: Maximální počet vybraných potravin
+            method: "greedy" (výchozí) nebo "dp"
+            min_items: Minimální počet vybraných potravin (jen pro "dp")
+            deadline: Termín (time.perf_counter()) pro "dp", viz knapsack_dp
             
         Returns:
             List[FoodItem]: Optimalizovaný výběr potravin
         """
-        if not targets or not foods:
+        if not targets or not len(foods):
             return []
         
-        nutrients = ["calories", "protein", "fat", "carbs"]
+        catalog = _as_catalog(foods)
+        scores = MealOptimizer.score_items(catalog, targets, weights)
         
-        # Výpočet skóre pro každou potravinu
-        item_scores = []
-        for food in foods:
-            score = 0.0
+        if method == "dp":
+            return MealOptimizer.knapsack_dp(catalog, scores, targets, limits, max_items, min_items,
+                                             deadline)
+        if method != "greedy":
+            raise ValueError(f"Neznámá metoda optimalizace: {method}")
+        return MealOptimizer.greedy_fill(catalog, scores, limits, max_items)
+    
+    @staticmethod
+    def greedy_fill(
+        catalog: FoodCatalog,
+        scores: np.ndarray,
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        max_items: int
+    ) -> List[FoodItem]:
+        """Vybírá potraviny v pořadí podle skóre, dokud nejsou překročeny limity."""
+        return [catalog[index] for index in
+                MealOptimizer.greedy_fill_indices(catalog, scores, limits, max_items)]
+    
+    @staticmethod
+    def greedy_fill_indices(
+        catalog: FoodCatalog,
+        scores: np.ndarray,
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        max_items: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> List[int]:
+        """
+        Jádro greedy_fill: vrací indexy vybraných potravin katalogu.
+        
+        Args:
+            allowed: Volitelná bool maska potravin, které lze vybrat
+        """
+        # Výběr potravin s kontrolou maximálních limitů; sčítají se jen
+        # živiny s horním limitem (jiné součty výběr neovlivní)
+        max_limits = [
+            (NUTRIENTS.index(nutrient), max_val)
+            for nutrient, (_, max_val) in limits.items()
+            if nutrient in NUTRIENTS and max_val is not None
+        ]
+        rows = [row for row, _ in max_limits]
+        caps = [max_val for _, max_val in max_limits]
+        limited = range(len(caps))
+        # Předalokované vektory součtů: kandidát se sečte do trial a při
+        # přijetí se vektory prohodí, při odmítnutí se trial zahodí
+        totals = [0.0] * len(caps)
+        trial = [0.0] * len(caps)
+        selected = []
+        
+        # Seřazení podle skóre (nejlepší první, stabilně jako list.sort)
+        for block, last in MealOptimizer.ranked_blocks(scores, max_items):
+            if not caps:
+                for index in block.tolist():
+                    if len(selected) >= max_items:
+                        return selected
+                    if allowed is None or allowed[index]:
+                        selected.append(index)
+                continue
             
-            for nutrient in nutrients:
-                if nutrient in targets and targets[nutrient] > 0:
-                    nutrient_val = food.get_nutrient_value(nutrient)
-                    target_val = targets[nutrient]
-                    weight = weights.get(nutrient, 1.0)
-                    
-                    # Skóre = jak blízko jsme cíli (1 = perfektní, 0 = daleko)
-                    ratio = nutrient_val / max(target_val, 1)
+            columns = catalog.matrix[np.ix_(rows, block)]
+            # Minima zbývajících kandidátů (platí jen pro poslední blok,
+            # za dřívějšími bloky ještě následují další potraviny)
+            suffix = np.minimum.accumulate(columns[:, ::-1], axis=1)[:, ::-1] if last else None
+            
+            for start in range(0, len(block), _FILL_CHUNK):
+                stop = start + _FILL_CHUNK
+                indices = block[start:stop].tolist()
+                values = columns[:, start:stop].tolist()
+                cheapest = None if suffix is None else suffix[:, start:stop].tolist()
+                
+                for i, index in enumerate(indices):
+                    if len(selected) >= max_items:
+                        return selected
+                    # Žádná zbývající potravina se nevejde pod některý limit
+                    if cheapest is not None and any(
+                            totals[j] + cheapest[j][i] > caps[j] for j in limited):
+                        return selected
+                    if allowed is not None and not allowed[index]:
+                        continue
                     
-                    if ratio > 1.5:  # Příliš vysoká hodnota
-                        contribution = -weight * (ratio - 1)
+                    # Simulace přidání potraviny
+                    for j in limited:
+                        trial[j] = totals[j] + values[j][i]
+                        if trial[j] > caps[j]:
+                            break
                     else:
-                        # Penalizace odchylky od cíle
-                        contribution = weight * (1 - abs(1 - ratio))
-                    
-                    score += contribution
+                        selected.append(index)
+                        totals, trial = trial, totals
+        
+        return selected
+    
+    @staticmethod
+    def knapsack_dp(
+        catalog: FoodCatalog,
+        scores: np.ndarray,
+        targets: Dict[str, float],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        max_items: int = 10,
+        min_items: int = 0,
+        deadline: Optional[float] = None
+    ) -> List[FoodItem]:
+        """
+        0/1 batoh dynamickým programováním nad celočíselnými kaloriemi.
+        
+        Tabulka best[k][c] drží nejvyšší součet skóre pro přesně k potravin
+        s přesně c kaloriemi. Pro každou potravinu se tabulka aktualizuje
+        „na místě“ od největšího k (rolling tabulka, každá potravina
+        nejvýše jednou), vždy vektorově přes celou kapacitu. Zpětné
+        ukazatele jsou spojové seznamy v polích uzlů (potravina, předchozí
+        uzel); nedosažitelné uzly se průběžně uklízejí, takže paměť je
+        O(kapacita × max_items) a neroste s velikostí katalogu.
+        
+        Optimální je DP jen vůči kaloriím: pro každé (k, c) drží jediný
+        nejlepší výběr. Ostatní limity (bílkoviny, tuky, sacharidy) se
+        kontrolují až dodatečně – stavy v okně limits["calories"] se
+        procházejí od nejlepšího skóre a vrátí se první, který je splňuje.
+        Pokud nejlepší výběr stavu ostatní limity porušuje, horší výběr se
+        stejným (k, c), který by je splňoval, se už nenajde; s dalšími
+        limity tedy výsledek nemusí být optimální (ani nalezen).
+        
+        Args:
+            catalog: Katalog potravin
+            scores: Skóre potravin (MealOptimizer.score_items)
+            targets: Cílové nutriční hodnoty
+            limits: Omezení (min, max); horní mez kalorií = kapacita batohu
+            max_items: Maximální počet vybraných potravin
+            min_items: Minimální počet vybraných potravin
+            deadline: Termín (time.perf_counter()); kontroluje se po každé
+                potravině a po jeho překročení se vyhodí _DeadlineExceeded
             
-            # Normalizace skóre
-            score = score / len(nutrients)
-            item_scores.append((score, food))
+        Returns:
+            List[FoodItem]: Nejlepší výběr nebo prázdný seznam
+        """
+        min_cal, max_cal = limits.get("calories", (None, None))
+        if max_cal is None:
+            # Bez horního limitu se kapacita odvodí z cíle kalorií
+            if not targets.get("calories"):
+                raise ValueError("Metoda 'dp' vyžaduje horní limit nebo cíl kalorií")
+            max_cal = targets["calories"] * 1.5
+        capacity = int(np.floor(max_cal))
+        if capacity < 0:
+            return []
         
-        # Seřazení podle skóre (nejlepší první)
-        item_scores.sort(reverse=True, key=lambda x: x[0])
+        calories = np.rint(catalog.nutrient("calories")).astype(np.int64)
+        best = np.full((max_items + 1, capacity + 1), -np.inf)
+        best[0, 0] = 0.0
+        # paths[k, c] = poslední uzel výběru stavu (-1 = prázdný výběr)
+        paths = np.full((max_items + 1, capacity + 1), -1, dtype=np.int64)
+        node_item = np.empty(max(paths.size, 1024), dtype=np.int64)
+        node_prev = np.empty_like(node_item)
+        nodes = 0
         
-        # Výběr potravin s kontrolou limitů
-        selected = []
-        current_totals = {nutrient: 0.0 for nutrient in nutrients}
+        processed = 0
+        for index in np.flatnonzero((calories >= 0) & (calories <= capacity)):
+            if deadline is not None and time.perf_counter() > deadline:
+                raise _DeadlineExceeded
+            cal = int(calories[index])
+            value = scores[index]
+            processed += 1
+            for k in range(min(max_items, processed), 0, -1):
+                candidate = best[k - 1, :capacity + 1 - cal] + value
+                current = best[k, cal:]
+                improved = np.flatnonzero(candidate > current)
+                if not len(improved):
+                    continue
+                current[improved] = candidate[improved]
+                
+                if nodes + len(improved) > len(node_item):
+                    nodes = MealOptimizer._compact_paths(paths, node_item, node_prev, nodes)
+                    if nodes + len(improved) > len(node_item) // 2:
+                        grown = 2 * len(node_item) + len(improved)
+                        node_item = np.resize(node_item, grown)
+                        node_prev = np.resize(node_prev, grown)
+                ids = np.arange(nodes, nodes + len(improved))
+                node_item[ids] = index
+                node_prev[ids] = paths[k - 1, improved]
+                paths[k, cal + improved] = ids
+                nodes += len(improved)
         
-        for score, food in item_scores:
-            if len(selected) >= max_items:
+        # Kandidátní stavy v okně kalorií, od nejlepšího skóre
+        lower = 0 if min_cal is None else max(0, int(np.ceil(min_cal)))
+        window = best[min_items:, lower:]
+        order = np.argsort(-window, axis=None, kind="stable")
+        other_limits = [
+            (NUTRIENTS.index(n), lo, hi) for n, (lo, hi) in limits.items()
+            if n in NUTRIENTS and n != "calories"
+        ]
+        
+        for flat in order:
+            k, c = np.unravel_index(flat, window.shape)
+            if not np.isfinite(window[k, c]):
                 break
+            chosen = []
+            node = paths[min_items + k, lower + c]
+            while node >= 0:
+                chosen.append(int(node_item[node]))
+                node = node_prev[node]
+            chosen.reverse()
             
-            # Simulace přidání potraviny
-            temp_totals = current_totals.copy()
-            for nutrient in nutrients:
-                temp_totals[nutrient] += food.get_nutrient_value(nutrient)
-            
-            # Kontrola limitů
-            within_limits = True
-            for nutrient, (min_val, max_val) in limits.items():
-                val = temp_totals[nutrient]
-                if min_val is not None and val < min_val:
-                    continue  # Můžeme přidat, jsme pod minimem
-                if max_val is not None and val > max_val:
-                    within_limits = False
-                    break
+            totals = catalog.matrix[:, chosen].sum(axis=1)
+            if all((lo is None or totals[row] >= lo) and (hi is None or totals[row] <= hi)
+                   for row, lo, hi in other_limits):
+                return [catalog[i] for i in chosen]
+        
+        return []
+    
+    @staticmethod
+    def _compact_paths(paths: np.ndarray, node_item: np.ndarray, node_prev: np.ndarray,
+                       nodes: int) -> int:
+        """
+        Odstraní uzly, na které už neukazuje žádný stav tabulky paths.
+        
+        Přečísluje uzly na místě (zachová jejich pořadí) a vrátí jejich
+        nový počet.
+        """
+        live = np.zeros(nodes, dtype=bool)
+        frontier = paths[paths >= 0]
+        while len(frontier):
+            frontier = frontier[~live[frontier]]
+            live[frontier] = True
+            frontier = node_prev[frontier]
+            frontier = frontier[frontier >= 0]
+        
+        renumber = np.cumsum(live) - 1
+        kept = np.flatnonzero(live)
+        prev = node_prev[kept]
+        node_item[:len(kept)] = node_item[kept]
+        node_prev[:len(kept)] = np.where(prev >= 0, renumber[np.maximum(prev, 0)], -1)
+        valid = paths >= 0
+        paths[valid] = renumber[paths[valid]]
+        return len(kept)
+    
+    @staticmethod
+    def score_items(
+        catalog: FoodCatalog,
+        targets: Dict[str, float],
+        weights: Dict[str, float]
+    ) -> np.ndarray:
+        """
+        Vektorově spočítá skóre všech potravin katalogu vůči cílům.
+        
+        Skóre = jak blízko jsme cíli (1 = perfektní, 0 = daleko),
+        příliš vysoké hodnoty (nad 150 % cíle) jsou penalizovány.
+        """
+        target_rows, weight_rows = MealOptimizer.target_rows([targets], [weights])
+        return MealOptimizer.score_matrix(catalog.matrix, target_rows, weight_rows)[0]
+    
+    @staticmethod
+    def target_rows(
+        targets_list: List[Dict[str, Optional[float]]],
+        weights_list: List[Dict[str, float]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Převede slovníky cílů a vah na matice (počet cílů × živiny).
+        
+        Chybějící cíl je reprezentován jako NaN, chybějící váha jako 1.0.
+        """
+        target_rows = np.array(
+            [[np.nan if t.get(n) is None else t[n] for n in NUTRIENTS] for t in targets_list],
+            dtype=np.float64
+        ).reshape(len(targets_list), len(NUTRIENTS))
+        weight_rows = np.array(
+            [[w.get(n, 1.0) for n in NUTRIENTS] for w in weights_list],
+            dtype=np.float64
+        ).reshape(len(weights_list), len(NUTRIENTS))
+        return target_rows, weight_rows
+    
+    @staticmethod
+    def score_matrix(
+        matrix: np.ndarray,
+        target_rows: np.ndarray,
+        weight_rows: np.ndarray
+    ) -> np.ndarray:
+        """
+        Dávkové skórování: skóre všech potravin vůči více cílům najednou.
+        
+        Args:
+            matrix: Matice živin katalogu (živiny × potraviny)
+            target_rows: Cíle (počet cílů × živiny), NaN/0 = bez cíle
+            weight_rows: Váhy (počet cílů × živiny)
             
-            if within_limits:
-                selected.append(food)
-                current_totals = temp_totals
+        Returns:
+            np.ndarray: Matice skóre (počet cílů × potraviny)
+        """
+        active = target_rows > 0
+        safe_targets = np.where(active, np.maximum(target_rows, 1), 1.0)
+        ratio = matrix[np.newaxis, :, :] / safe_targets[:, :, np.newaxis]
+        weight = weight_rows[:, :, np.newaxis]
+        contribution = np.where(
+            ratio > 1.5,
+            -weight * (ratio - 1),              # Příliš vysoká hodnota
+            weight * (1 - np.abs(1 - ratio))    # Penalizace odchylky od cíle
+        )
+        contribution[~active] = 0.0
         
-        return selected
+        # Sčítání po živinách ve stejném pořadí jako původní smyčka,
+        # aby se skóre (a tedy i pořadí potravin) shodovalo bit po bitu
+        scores = np.zeros((len(target_rows), matrix.shape[1]), dtype=np.float64)
+        for row in range(len(NUTRIENTS)):
+            scores += contribution[:, row, :]
+        
+        # Normalizace skóre
+        return scores / len(NUTRIENTS)
+    
+    @staticmethod
+    def ranked_indices(scores: np.ndarray, max_items: int):
+        """
+        Generuje indexy potravin od nejlepšího skóre (stabilně při shodě).
+        
+        Pokud je max_items výrazně menší než katalog, seřadí se nejdřív jen
+        nejlepší kandidáti vybraní pomocí argpartition; zbytek se řadí až
+        ve chvíli, kdy je výběr skutečně potřebuje. Výsledné pořadí je
+        vždy stejné jako při úplném stabilním seřazení.
+        """
+        for block, _ in MealOptimizer.ranked_blocks(scores, max_items):
+            yield from block
+    
+    @staticmethod
+    def ranked_blocks(scores: np.ndarray, max_items: int):
+        """
+        Stejné pořadí jako ranked_indices, po seřazených blocích.
+        
+        Generuje dvojice (pole indexů, je_poslední_blok): buď celý
+        seřazený katalog, nebo hlavu nejlepších kandidátů a líně
+        seřazený zbytek.
+        """
+        head_size = max(_TOPK_MIN_CANDIDATES, _TOPK_MULTIPLIER * max_items)
+        if head_size * _TOPK_RATIO >= len(scores):
+            yield np.argsort(-scores, kind="stable"), True
+            return
+        
+        # Práh = skóre head_size-tého nejlepšího kandidáta; všechny shody
+        # s prahem patří do hlavy, aby nerozhodovalo pořadí argpartition
+        top = np.argpartition(-scores, head_size - 1)[:head_size]
+        threshold = scores[top].min()
+        in_head = scores >= threshold
+        head = np.flatnonzero(in_head)
+        yield head[np.argsort(-scores[head], kind="stable")], len(head) == len(scores)
+        
+        tail = np.flatnonzero(~in_head)
+        if len(tail):
+            yield tail[np.argsort(-scores[tail], kind="stable")], True
     
     @staticmethod
     def distribute_to_slots(
@@ -460,105 +1871,2135 @@ class MealOptimizer:
         
         return distribution
 
-# ---------- MAIN OPTIMIZATION FUNCTION ----------
-def find_optimal_plan(
-    foods: List[FoodItem],
+# ---------- EXACT SOLVER (BRANCH AND BOUND) ----------
+def _swap_distance(a: frozenset, b: frozenset) -> int:
+    """Počet vyměněných potravin mezi dvěma výběry (přidání/odebrání = 1)."""
+    return max(len(a - b), len(b - a))
+
+_LP_EPS = 1e-9
+_LP_MAX_ITER = 5000
+
+class _DeadlineExceeded(Exception):
+    """Vnitřní signál: výpočet překročil termín (time.perf_counter())."""
+
+class _LPIterationLimit(Exception):
+    """Vnitřní signál: simplex nedoběhl v _LP_MAX_ITER iteracích."""
+
+def _solve_lp(c: np.ndarray, A: np.ndarray, b: np.ndarray,
+              deadline: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+    """
+    Řeší lineární program min c·x za podmínek A·x ≤ b, x ≥ 0.
+    
+    Dvoufázová tabulková simplexová metoda s Blandovým pravidlem
+    (bez cyklení). Vrací (x, hodnota) nebo None, pokud je úloha
+    nepřípustná nebo neomezená. Nevejde-li se výpočet do limitu iterací,
+    vyhodí _LPIterationLimit (výsledek není známý, nejde o nepřípustnost).
+    Je-li zadán deadline, kontroluje se před každým pivotem a po jeho
+    překročení vyhodí _DeadlineExceeded.
+    """
+    m, n = A.shape
+    if m == 0:
+        return (np.zeros(n), 0.0) if np.all(c >= 0) else None
+    
+    # Řádky se zápornou pravou stranou se otočí a dostanou umělou proměnnou
+    sign = np.where(b < 0, -1.0, 1.0)
+    artificial_rows = np.flatnonzero(b < 0)
+    n_art = len(artificial_rows)
+    width = n + m + n_art
+    
+    tableau = np.zeros((m, width + 1))
+    tableau[:, :n] = A * sign[:, np.newaxis]
+    tableau[np.arange(m), n + np.arange(m)] = sign
+    tableau[artificial_rows, n + m + np.arange(n_art)] = 1.0
+    tableau[:, -1] = b * sign
+    basis = n + np.arange(m)
+    basis[artificial_rows] = n + m + np.arange(n_art)
+    
+    def pivot(row: int, col: int):
+        pivot_row = tableau[row] / tableau[row, col]
+        tableau[:] -= np.outer(tableau[:, col], pivot_row)
+        tableau[row] = pivot_row
+        basis[row] = col
+    
+    def run(cost: np.ndarray, allowed: np.ndarray) -> bool:
+        for _ in range(_LP_MAX_ITER):
+            if deadline is not None and time.perf_counter() > deadline:
+                raise _DeadlineExceeded
+            reduced = cost - cost[basis] @ tableau[:, :width]
+            entering = np.flatnonzero((reduced < -_LP_EPS) & allowed)
+            if not len(entering):
+                return True
+            col = entering[0]
+            column = tableau[:, col]
+            positive = np.flatnonzero(column > _LP_EPS)
+            if not len(positive):
+                return False
+            ratios = tableau[positive, -1] / column[positive]
+            ties = positive[ratios <= ratios.min() + _LP_EPS]
+            pivot(ties[np.argmin(basis[ties])], col)
+        raise _LPIterationLimit
+    
+    # Fáze 1: nalezení přípustné báze
+    if n_art:
+        phase_one = np.zeros(width)
+        phase_one[n + m:] = 1.0
+        if not run(phase_one, np.ones(width, dtype=bool)):
+            return None
+        if phase_one[basis] @ tableau[:, -1] > 1e-7:
+            return None
+        # Vytlačení umělých proměnných z báze
+        for row in np.flatnonzero(basis >= n + m):
+            candidates = np.flatnonzero(np.abs(tableau[row, :n + m]) > _LP_EPS)
+            if len(candidates):
+                pivot(row, candidates[0])
+    
+    # Fáze 2: optimalizace původní účelové funkce
+    cost = np.zeros(width)
+    cost[:n] = c
+    allowed = np.zeros(width, dtype=bool)
+    allowed[:n + m] = True
+    if not run(cost, allowed):
+        return None
+    
+    solution = np.zeros(width)
+    solution[basis] = tableau[:, -1]
+    x = solution[:n]
+    return x, float(c @ x)
+
+class PlanObjective:
+    """
+    Účelová funkce celodenního jídelníčku.
+    
+    Hodnota = součet vážených relativních odchylek denních součtů od cílů
+    (menší je lepší, 0 = přesné trefení všech cílů). Limity se kontrolují
+    stejně jako v MealPlanBuilder.build.
+    """
+    
+    def __init__(self,
+                 targets: Dict[str, Optional[float]],
+                 limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+                 weights: Dict[str, float]):
+        self.target = np.zeros(len(NUTRIENTS))
+        self.coef = np.zeros(len(NUTRIENTS))
+        self.lower = np.full(len(NUTRIENTS), -np.inf)
+        self.upper = np.full(len(NUTRIENTS), np.inf)
+        
+        for row, nutrient in enumerate(NUTRIENTS):
+            target = (targets or {}).get(nutrient)
+            if target is not None and target > 0:
+                self.target[row] = target
+                self.coef[row] = weights.get(nutrient, 1.0) / target
+            min_val, max_val = (limits or {}).get(nutrient, (None, None))
+            if min_val is not None:
+                self.lower[row] = min_val
+            if max_val is not None:
+                self.upper[row] = max_val
+    
+    def deviation(self, totals: np.ndarray) -> np.ndarray:
+        """Vážená odchylka pro vektor (nebo matici) denních součtů."""
+        return (np.abs(totals - self.target) * self.coef).sum(axis=-1)
+    
+    def within_limits(self, totals: np.ndarray) -> np.ndarray:
+        """Zda denní součty splňují všechny limity."""
+        return np.all((totals >= self.lower) & (totals <= self.upper), axis=-1)
+
+def _distribution_totals(distribution: Dict[str, List[FoodItem]]) -> np.ndarray:
+    """Denní součty živin rozdělení potravin do slotů."""
+    totals = np.zeros(len(NUTRIENTS))
+    for items in distribution.values():
+        for item in items:
+            totals += [item.get_nutrient_value(nutrient) for nutrient in NUTRIENTS]
+    return totals
+
+def _fits_slot_caps(distribution: Dict[str, List[FoodItem]],
+                    slot_caps: Dict[str, Tuple[int, int]]) -> bool:
+    """Zda počty položek ve slotech odpovídají slot_caps."""
+    return all(min_cap <= len(distribution.get(slot, [])) <= max_cap
+               for slot, (min_cap, max_cap) in slot_caps.items())
+
+def _plan_distribution(plan: MealPlan) -> Dict[str, List[FoodItem]]:
+    """Rozdělení potravin jídelníčku podle slotů."""
+    return {
+        "breakfast": list(plan.breakfast),
+        "lunch": list(plan.lunch),
+        "dinner": list(plan.dinner),
+        "snack": list(plan.snacks),
+    }
+
+def _slot_mask(catalog: FoodCatalog, slot: str) -> np.ndarray:
+    """Potraviny vhodné do slotu (meal_times a „maso ne na snídani“)."""
+    mask = catalog.meal_time_mask(slot)
+    if slot == "breakfast":
+        mask &= ~catalog.tag_mask("meat")
+    return mask
+
+def _slot_candidates(
+    catalog: FoodCatalog,
     targets: Dict[str, Optional[float]],
-    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
     weights: Dict[str, float],
-    slot_caps: Dict[str, Tuple[int, int]]
-) -> Optional[MealPlan]:
+    slot_caps: Dict[str, Tuple[int, int]],
+    per_slot: int
+) -> Dict[str, np.ndarray]:
     """
-    Hlavní funkce pro nalezení optimálního jídelníčku.
+    Vybere pro každý slot nejlépe hodnocené kandidáty (indexy do katalogu).
     
-    Postup:
-    1. Filtrace potravin podle slotů
-    2. Optimalizace pro každý slot zvlášť
-    3. Rozdělení výsledků do slotů
-    4. Sestavení jídelníčku pomocí Builder patternu
-    
-    Args:
-        foods: Všechny dostupné potraviny
-        targets: Cílové nutriční hodnoty
-        limits: Omezení
-        weights: Váhy důležitosti
-        slot_caps: Kapacity slotů
+    Respektuje meal_times a kulturní pravidlo „maso ne na snídani“
+    z distribute_to_slots.
+    """
+    daily_targets = {k: v for k, v in targets.items() if v is not None}
+    candidates = {}
+    for slot in MEAL_TIMES:
+        if slot not in slot_caps:
+            continue
+        indices = np.flatnonzero(_slot_mask(catalog, slot))
         
-    Returns:
-        MealPlan: Optimální jídelníček nebo None
+        if daily_targets and len(indices) > per_slot:
+            share = SLOT_SHARES.get(slot, 1.0)
+            slot_targets = {k: v * share for k, v in daily_targets.items()}
+            scores = MealOptimizer.score_items(catalog.take(indices), slot_targets, weights)
+            ranked = MealOptimizer.ranked_indices(scores, per_slot)
+            indices = indices[[next(ranked) for _ in range(per_slot)]]
+        candidates[slot] = indices[:per_slot]
+    return candidates
+
+class BranchAndBoundSolver:
     """
-    try:
-        # Filtrace potravin podle slotů
-        slot_foods = {}
-        for slot in slot_caps.keys():
-            slot_foods[slot] = filter_items(foods, by_meal_time(slot))
+    Exaktní řešič celodenního jídelníčku metodou větví a mezí.
+    
+    Optimalizuje všechny sloty najednou jako celočíselný program:
+    proměnná x[potravina, slot] ∈ {0, 1}, počty ve slotech v mezích
+    slot_caps, každá potravina nejvýše jednou za den, denní součty v mezích
+    limits. Minimalizuje se PlanObjective; dolní meze dává LP relaxace.
+    
+    Aby byla latence předvídatelná, pracuje se jen s per_slot nejlépe
+    hodnocenými kandidáty na slot a prohledávání je omezeno počtem uzlů
+    (node_limit) a časem v sekundách (time_limit). Po skončení obsahuje
+    atribut stats počet uzlů, čas a příznaky:
+    
+    - proven_optimal_within_candidates: prohledávání doběhlo, výsledek je
+      optimální mezi per_slot kandidáty každého slotu
+    - candidates_complete: kandidáti pokryli všechny vhodné potraviny
+      katalogu (žádný slot nebyl oříznut na per_slot)
+    - proven_optimal: obojí, tedy optimum nad celým katalogem
+    """
+    
+    supports_warm_start = True
+    
+    def __init__(self, node_limit: int = 2000, time_limit: float = 0.5, per_slot: int = 8):
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.per_slot = per_slot
+        self.stats: Dict[str, float] = {}
+    
+    def solve(
+        self,
+        foods: Union[FoodCatalog, List[FoodItem]],
+        targets: Dict[str, Optional[float]],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        weights: Dict[str, float],
+        slot_caps: Dict[str, Tuple[int, int]],
+        warm_start: Optional[Dict[str, List[FoodItem]]] = None
+    ) -> Optional[Dict[str, List[FoodItem]]]:
+        """
+        Najde nejlepší rozdělení potravin do slotů.
         
-        # Cíle pro celý den
-        daily_targets = {k: v for k, v in targets.items() if v is not None}
+        Args:
+            warm_start: Známé rozdělení; je-li přípustné, slouží jako
+                počáteční rekordman a zrychluje ořezávání
         
-        all_selected = []
+        Returns:
+            Dict[str, List[FoodItem]]: Potraviny podle slotů nebo None,
+            pokud v rámci rozpočtu nebylo nalezeno přípustné řešení
+        """
+        start = time.perf_counter()
+        catalog = _as_catalog(foods)
+        objective, variables, nutrients_x, A, b, cost, complete = self._model(
+            catalog, targets, limits, weights, slot_caps)
+        n_x = len(variables)
         
-        if daily_targets:
-            # Optimalizace pro každý slot zvlášť
-            slot_distribution = {
-                "breakfast": 0.25,  # 25% denního cíle
-                "lunch": 0.35,      # 35% denního cíle
-                "dinner": 0.30,     # 30% denního cíle
-                "snack": 0.10       # 10% denního cíle
-            }
-            
-            for slot, percentage in slot_distribution.items():
-                slot_items = slot_foods[slot]
-                if not slot_items:
-                    continue
-                
-                # Cíle pro tento slot
-                slot_targets = {}
-                for nutrient, target in daily_targets.items():
-                    slot_targets[nutrient] = target * percentage
-                
-                # Optimalizace pro slot
-                selected = MealOptimizer.knapsack_optimize(
-                    slot_items,
-                    slot_targets,
-                    limits,
-                    weights,
-                    max_items=slot_caps[slot][1]
-                )
-                
-                all_selected.extend(selected[:slot_caps[slot][1]])
-        else:
-            # Bez cílů - jednoduché přiřazení
-            for slot in ["breakfast", "lunch", "dinner", "snack"]:
-                slot_items = slot_foods[slot]
-                if slot_items:
-                    all_selected.extend(slot_items[:slot_caps[slot][1]])
+        warm_value = np.inf
+        if warm_start is not None and _fits_slot_caps(warm_start, slot_caps):
+            totals = _distribution_totals(warm_start)
+            if objective.within_limits(totals):
+                warm_value = float(objective.deviation(totals))
+        
+        pool = self._search(start, A, b, cost, n_x, nutrients_x, objective, variables,
+                            k=1, min_difference=0, incumbent=warm_value)
+        self._set_coverage(complete)
+        if not pool:
+            # Nic lepšího než (přípustný) warm start se nenašlo
+            return warm_start if np.isfinite(warm_value) else None
+        return self._distribution(catalog, slot_caps, variables, pool[0][1])
+    
+    def _model(self, catalog: FoodCatalog, targets, limits, weights, slot_caps) -> tuple:
+        """
+        Sestaví celočíselný program (proměnné, matice omezení a ceny)
+        a zjistí, zda kandidáti pokrývají všechny vhodné potraviny.
+        """
+        objective = PlanObjective(targets, limits, weights)
+        candidates = _slot_candidates(catalog, targets, weights, slot_caps, self.per_slot)
+        complete = all(len(indices) == np.count_nonzero(_slot_mask(catalog, slot))
+                       for slot, indices in candidates.items())
         
-        # Rozdělení do slotů
-        distribution = MealOptimizer.distribute_to_slots(all_selected, slot_caps)
+        # Proměnné: (slot, index potraviny) + odchylky d pro živiny s cílem
+        variables = [(slot, int(i)) for slot, indices in candidates.items() for i in indices]
+        n_x = len(variables)
+        deviation_rows = np.flatnonzero(objective.coef > 0)
+        n_vars = n_x + len(deviation_rows)
+        nutrients_x = catalog.matrix[:, [i for _, i in variables]] if n_x else np.zeros((len(NUTRIENTS), 0))
         
-        # Sestavení jídelníčku pomocí Builder patternu
-        builder = MealPlanBuilder()
+        rows, rhs = [], []
+        
+        def add_row(coefs: np.ndarray, bound: float):
+            rows.append(coefs)
+            rhs.append(bound)
         
-        # Nastavení limitů slotů
+        # Každá potravina nejvýše jednou (zahrnuje i x ≤ 1)
+        for food in sorted({i for _, i in variables}):
+            coefs = np.zeros(n_vars)
+            coefs[[v for v, (_, i) in enumerate(variables) if i == food]] = 1.0
+            add_row(coefs, 1.0)
+        
+        # Počty položek ve slotech
         for slot, (min_cap, max_cap) in slot_caps.items():
-            builder.set_slot_limits(slot, min_cap, max_cap)
+            coefs = np.zeros(n_vars)
+            coefs[[v for v, (s, _) in enumerate(variables) if s == slot]] = 1.0
+            add_row(coefs, max_cap)
+            add_row(-coefs, -min_cap)
         
-        # Přidání potravin
-        for food in distribution.get("breakfast", []):
-            builder.add_breakfast(food)
-        for food in distribution.get("lunch", []):
-            builder.add_lunch(food)
-        for food in distribution.get("dinner", []):
-            builder.add_dinner(food)
-        for food in distribution.get("snack", []):
-            builder.add_snack(food)
+        # Denní limity živin
+        for row in range(len(NUTRIENTS)):
+            coefs = np.zeros(n_vars)
+            coefs[:n_x] = nutrients_x[row]
+            if np.isfinite(objective.upper[row]):
+                add_row(coefs, objective.upper[row])
+            if np.isfinite(objective.lower[row]):
+                add_row(-coefs, -objective.lower[row])
         
-        return builder.build(targets=targets, limits=limits)
+        # Linearizace |součet - cíl| ≤ d
+        for d, row in enumerate(deviation_rows):
+            coefs = np.zeros(n_vars)
+            coefs[:n_x] = nutrients_x[row]
+            coefs[n_x + d] = -1.0
+            add_row(coefs, objective.target[row])
+            coefs = -coefs
+            coefs[n_x + d] = -1.0
+            add_row(coefs, -objective.target[row])
         
-    except Exception as e:
-        print(f"❌ Chyba při hledání optimálního plánu: {e}")
-        return None
+        A = np.array(rows).reshape(len(rows), n_vars)
+        b = np.array(rhs, dtype=np.float64)
+        cost = np.zeros(n_vars)
+        cost[n_x:] = objective.coef[deviation_rows]
+        return objective, variables, nutrients_x, A, b, cost, complete
+    
+    def _set_coverage(self, complete: bool):
+        """Doplní do stats, zda optimalita platí pro celý katalog."""
+        self.stats["candidates_complete"] = complete
+        self.stats["proven_optimal"] = complete and self.stats["proven_optimal_within_candidates"]
+    
+    def solve_top_k(
+        self,
+        foods: Union[FoodCatalog, List[FoodItem]],
+        targets: Dict[str, Optional[float]],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        weights: Dict[str, float],
+        slot_caps: Dict[str, Tuple[int, int]],
+        k: int = 3,
+        min_difference: int = 2
+    ) -> List[Dict[str, List[FoodItem]]]:
+        """
+        Najde až k nejlepších navzájem odlišných rozdělení jedním prohledáním.
+        
+        Dvě řešení se musí lišit alespoň v min_difference potravinách
+        (_swap_distance: počet vyměněných potravin, výměna jedné potraviny
+        = 1). Výsledek se vybírá hladově od nejlepšího z nalezených řešení:
+        řešení se přidá, pokud se dostatečně liší od všech už vybraných.
+        
+        Uzly se ořezávají jen proti mezi, kterou pozdější řešení nezmění:
+        k-té hodnotě mezi nalezenými řešeními, která jsou od sebe vzdálena
+        aspoň 2·min_difference - 1. Nové řešení je podobné nejvýše jednomu
+        z nich (trojúhelníková nerovnost), takže k lepších alternativ
+        ve výsledku zůstane vždy.
+        
+        Returns:
+            List[Dict[str, List[FoodItem]]]: Rozdělení od nejlepšího
+        """
+        start = time.perf_counter()
+        catalog = _as_catalog(foods)
+        objective, variables, nutrients_x, A, b, cost, complete = self._model(
+            catalog, targets, limits, weights, slot_caps)
+        pool = self._search(start, A, b, cost, len(variables), nutrients_x, objective, variables,
+                            k=k, min_difference=min_difference, incumbent=np.inf)
+        self._set_coverage(complete)
+        return [self._distribution(catalog, slot_caps, variables, choice) for _, choice, _ in pool]
+    
+    def _search(self, start: float, A: np.ndarray, b: np.ndarray, cost: np.ndarray, n_x: int,
+                nutrients_x: np.ndarray, objective: PlanObjective, variables: List[Tuple[str, int]],
+                k: int, min_difference: int, incumbent: float) -> List[tuple]:
+        """
+        Prohledávání do hloubky; vrací seznam (hodnota, výběr, potraviny)
+        seřazený od nejlepšího. Uzel = pevně zvolené hodnoty proměnných x.
+        """
+        found: List[tuple] = []
+        nodes = 0
+        incomplete = False
+        lp_limits = 0
+        # Konečná mez pro ořezávání (viz solve_top_k)
+        final_bound = incumbent
+        
+        def select(separation: int) -> List[tuple]:
+            """Hladový výběr nejvýše k řešení vzdálených aspoň separation."""
+            chosen: List[tuple] = []
+            for entry in found:
+                if all(_swap_distance(entry[2], other[2]) >= separation for other in chosen):
+                    chosen.append(entry)
+                    if len(chosen) == k:
+                        break
+            return chosen
+        
+        def offer(value: float, choice: np.ndarray):
+            nonlocal final_bound
+            if any(np.array_equal(choice, other) for _, other, _ in found):
+                return
+            foods = frozenset(i for chosen, (_, i) in zip(choice, variables) if chosen)
+            found.append((value, choice, foods))
+            found.sort(key=lambda entry: entry[0])
+            separated = select(2 * min_difference - 1)
+            if len(separated) == k:
+                final_bound = min(incumbent, separated[-1][0])
+        
+        deadline = start + self.time_limit
+        stack: List[Dict[int, int]] = [{}]
+        while stack:
+            if nodes >= self.node_limit or time.perf_counter() > deadline:
+                incomplete = True
+                break
+            fixed = stack.pop()
+            nodes += 1
+            
+            try:
+                relaxation = self._relax(A, b, cost, n_x, fixed, deadline)
+            except _DeadlineExceeded:
+                # Termín vypršel uvnitř LP; platí dosavadní rekordman
+                incomplete = True
+                break
+            except _LPIterationLimit:
+                # Mez uzlu neznáme: uzel se vynechá, optimalita se neprokáže
+                incomplete = True
+                lp_limits += 1
+                continue
+            if relaxation is None:
+                continue
+            x, bound = relaxation
+            if bound >= final_bound - 1e-9:
+                continue
+            
+            fractional = np.abs(x[:n_x] - np.round(x[:n_x]))
+            branch = int(np.argmax(fractional))
+            if fractional[branch] <= 1e-6:
+                # Celočíselné řešení: přesná kontrola a nový rekordman
+                choice = np.round(x[:n_x]) > 0.5
+                totals = nutrients_x[:, choice].sum(axis=1)
+                if objective.within_limits(totals):
+                    value = float(objective.deviation(totals))
+                    if value < final_bound:
+                        offer(value, choice)
+                if k == 1:
+                    continue
+                # Pro další alternativy se větví na zvolené volné proměnné
+                # (dítě s 0 dané řešení vylučuje)
+                free_ones = [v for v in np.flatnonzero(choice) if v not in fixed]
+                if not free_ones:
+                    continue
+                branch = int(free_ones[0])
+            
+            stack.append({**fixed, branch: 0})
+            stack.append({**fixed, branch: 1})
+        
+        pool = select(min_difference)
+        best_value = pool[0][0] if pool else incumbent
+        self.stats = {
+            "nodes": nodes,
+            "elapsed": time.perf_counter() - start,
+            "objective": best_value,
+            "lp_iteration_limits": lp_limits,
+            "proven_optimal_within_candidates": bool(not incomplete and np.isfinite(best_value)),
+        }
+        return pool
+    
+    @staticmethod
+    def _distribution(catalog: FoodCatalog, slot_caps: Dict[str, Tuple[int, int]],
+                      variables: List[Tuple[str, int]], choice: np.ndarray) -> Dict[str, List[FoodItem]]:
+        distribution = {slot: [] for slot in slot_caps}
+        for chosen, (slot, i) in zip(choice, variables):
+            if chosen:
+                distribution[slot].append(catalog[i])
+        return distribution
+    
+    @staticmethod
+    def _relax(A: np.ndarray, b: np.ndarray, cost: np.ndarray, n_x: int,
+               fixed: Dict[int, int], deadline: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+        """LP relaxace uzlu: pevné proměnné se dosadí do pravých stran."""
+        if not fixed:
+            return _solve_lp(cost, A, b, deadline)
+        
+        fixed_ones = [v for v, value in fixed.items() if value == 1]
+        free = np.array([v for v in range(A.shape[1]) if v not in fixed], dtype=np.intp)
+        reduced_b = b - A[:, fixed_ones].sum(axis=1)
+        reduced_A = A[:, free]
+        
+        # Řádky bez volných proměnných jen kontrolují přípustnost
+        empty = ~np.any(reduced_A != 0, axis=1)
+        if np.any(reduced_b[empty] < -1e-9):
+            return None
+        relaxation = _solve_lp(cost[free], reduced_A[~empty], reduced_b[~empty], deadline)
+        if relaxation is None:
+            return None
+        
+        x = np.zeros(A.shape[1])
+        x[fixed_ones] = 1.0
+        x[free] = relaxation[0]
+        return x, relaxation[1]
+
+# ---------- DYNAMIC PROGRAMMING STRATEGY ----------
+class DynamicProgrammingSolver:
+    """
+    Strategie „dp“: 0/1 batoh (MealOptimizer.knapsack_dp) pro každý slot.
+    
+    Sloty se plní postupně. Každý dostane podíl denních cílů podle
+    SLOT_SHARES a odpovídající podíl zbývajícího denního okna kalorií,
+    takže pozdější sloty vyrovnávají odchylky dřívějších. Pokud se slot
+    do svého okna trefit nedá, zkusí se jen s horní mezí. U ostatních
+    živin dostane slot jen horní mez = zbytek denního limitu po dřívějších
+    slotech; denní minima se týkají součtu všech slotů, a proto je
+    kontroluje až závěrečná validace v MealPlanBuilder.build.
+    
+    S time_limit (sekundy) se termín hlídá po každé potravině batohu;
+    po jeho vypršení solve vrátí None a stats["deadline_hit"] je True.
+    """
+    
+    def __init__(self, time_limit: Optional[float] = None):
+        self.time_limit = time_limit
+        self.stats: Dict[str, object] = {}
+    
+    def solve(
+        self,
+        foods: Union[FoodCatalog, List[FoodItem]],
+        targets: Dict[str, Optional[float]],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        weights: Dict[str, float],
+        slot_caps: Dict[str, Tuple[int, int]]
+    ) -> Optional[Dict[str, List[FoodItem]]]:
+        """
+        Vrátí potraviny podle slotů nebo None, pokud některý slot nelze
+        naplnit nebo vypršel time_limit.
+        """
+        start = time.perf_counter()
+        deadline = None if self.time_limit is None else start + self.time_limit
+        try:
+            distribution = self._solve(foods, targets, limits, weights, slot_caps, deadline)
+            deadline_hit = False
+        except _DeadlineExceeded:
+            distribution, deadline_hit = None, True
+        self.stats = {"elapsed": time.perf_counter() - start, "deadline_hit": deadline_hit}
+        return distribution
+    
+    def _solve(self, foods, targets, limits, weights, slot_caps,
+               deadline: Optional[float]) -> Optional[Dict[str, List[FoodItem]]]:
+        catalog = _as_catalog(foods)
+        daily_targets = {k: v for k, v in targets.items() if v is not None}
+        min_cal, max_cal = limits.get("calories", (None, None))
+        slots = [slot for slot in MEAL_TIMES if slot in slot_caps]
+        remaining_share = sum(SLOT_SHARES.get(slot, 1.0) for slot in slots)
+        used = _sum_totals(())
+        distribution = {slot: [] for slot in slot_caps}
+        
+        for slot in slots:
+            min_cap, max_cap = slot_caps[slot]
+            share = SLOT_SHARES.get(slot, 1.0)
+            fraction = share / remaining_share if remaining_share > 0 else 1.0
+            remaining_share -= share
+            
+            slot_items = catalog.take(np.flatnonzero(_slot_mask(catalog, slot)))
+            slot_targets = {k: v * share for k, v in daily_targets.items()}
+            
+            # Zbytek denních horních mezí a podíl zbývajícího okna kalorií
+            slot_limits = {
+                n: (None, None if hi is None else hi - used.get(n, 0.0))
+                for n, (_, hi) in limits.items() if n != "calories"
+            }
+            window = (
+                None if min_cal is None else (min_cal - used["calories"]) * fraction,
+                None if max_cal is None else (max_cal - used["calories"]) * fraction
+            )
+            selected = []
+            for calorie_window in (window, (None, window[1])):
+                slot_limits["calories"] = calorie_window
+                selected = MealOptimizer.knapsack_optimize(
+                    slot_items, slot_targets, slot_limits, weights,
+                    max_items=max_cap, method="dp", min_items=min_cap, deadline=deadline
+                )
+                if len(selected) >= max(min_cap, 1) or calorie_window[0] is None:
+                    break
+            
+            if len(selected) < min_cap:
+                return None
+            distribution[slot] = selected
+            for nutrient, value in _sum_totals(selected).items():
+                used[nutrient] += value
+        
+        return distribution
+
+def _resolve_solver(strategy):
+    """Vrátí řešič pro zadanou strategii (název nebo objekt s metodou solve)."""
+    if hasattr(strategy, "solve"):
+        return strategy
+    if strategy == "exact":
+        return BranchAndBoundSolver()
+    if strategy == "dp":
+        return DynamicProgrammingSolver()
+    if strategy == "anneal":
+        return AnnealingSolver()
+    raise ValueError(f"Neznámá strategie optimalizace: {strategy}")
+
+# ---------- LOCAL SEARCH ----------
+# Minimální zlepšení, které se považuje za skutečné
+_LS_EPS = 1e-9
+
+class LocalSearch:
+    """
+    Lokální prohledávání, které dolaďuje hotové rozdělení potravin do slotů.
+    
+    V každé iteraci vyhodnotí všechny tahy – výměnu potraviny ve slotu za
+    kandidáta z katalogu, přidání kandidáta a odebrání potraviny – a
+    provede nejlepší zlepšující tah. Stav je jen vektor denních součtů,
+    takže nové součty i hodnota účelové funkce po tahu se spočítají v O(1)
+    bez přepočtu celého jídelníčku. Tahy se porovnávají lexikograficky:
+    chybějící položky do minima slot_caps, překročení limits, PlanObjective.
+    Výměna potravin mezi sloty denní součty nemění, proto se nezkouší.
+    
+    Kandidáty slotu je pool_size nejlépe hodnocených potravin
+    (_slot_candidates, tedy včetně pravidla „maso ne na snídani“).
+    Prohledávání končí, když žádný tah nezlepšuje, nebo po vyčerpání
+    max_iter tahů či time_limit sekund. Atribut stats obsahuje počet
+    iterací, provedených tahů, čas a hodnotu účelové funkce před a po.
+    """
+    
+    def __init__(self, max_iter: int = 200, time_limit: float = 0.05, pool_size: int = 64):
+        self.max_iter = max_iter
+        self.time_limit = time_limit
+        self.pool_size = pool_size
+        self.stats: Dict[str, float] = {}
+    
+    @staticmethod
+    def _vector(item: FoodItem) -> np.ndarray:
+        return np.array([item.get_nutrient_value(nutrient) for nutrient in NUTRIENTS], dtype=float)
+    
+    @staticmethod
+    def _evaluate(objective: PlanObjective, totals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Překročení limitů a odchylka pro sloupce matice součtů (4, k)."""
+        over = (np.maximum(objective.lower[:, None] - totals, 0.0)
+                + np.maximum(totals - objective.upper[:, None], 0.0))
+        return over.sum(axis=0), objective.deviation(totals.T)
+    
+    @staticmethod
+    def _better(key: tuple, other: Optional[tuple]) -> bool:
+        """Lexikografické porovnání (chybějící položky, překročení, odchylka)."""
+        if other is None:
+            return True
+        if key[0] != other[0]:
+            return key[0] < other[0]
+        if abs(key[1] - other[1]) > _LS_EPS:
+            return key[1] < other[1]
+        return key[2] < other[2] - _LS_EPS
+    
+    def improve(
+        self,
+        catalog: FoodCatalog,
+        distribution: Dict[str, List[FoodItem]],
+        targets: Dict[str, Optional[float]],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        weights: Dict[str, float],
+        slot_caps: Dict[str, Tuple[int, int]]
+    ) -> Dict[str, List[FoodItem]]:
+        """
+        Vylepší rozdělení potravin do slotů.
+        
+        Returns:
+            Dict[str, List[FoodItem]]: Nové rozdělení (vstup se nemění)
+        """
+        start = time.perf_counter()
+        objective = PlanObjective(targets, limits, weights)
+        slots = [slot for slot in MEAL_TIMES if slot in slot_caps]
+        chosen = {slot: list(items) for slot, items in distribution.items()}
+        for slot in slots:
+            chosen.setdefault(slot, [])
+        vectors = {slot: [self._vector(item) for item in chosen[slot]] for slot in slots}
+        totals = _distribution_totals(chosen)
+        
+        pools = _slot_candidates(catalog, targets, weights, slot_caps, self.pool_size)
+        pool_foods = {slot: [catalog[int(i)] for i in pools[slot]] for slot in slots}
+        pool_matrix = {slot: catalog.matrix[:, pools[slot]] for slot in slots}
+        
+        def state_key() -> tuple:
+            deficit = sum(max(0, slot_caps[slot][0] - len(chosen[slot])) for slot in slots)
+            violation, deviation = self._evaluate(objective, totals[:, None])
+            return deficit, float(violation[0]), float(deviation[0])
+        
+        current = initial = state_key()
+        iterations = 0
+        while iterations < self.max_iter and time.perf_counter() - start < self.time_limit:
+            iterations += 1
+            in_plan = set(item for slot in chosen for item in chosen[slot])
+            deficit = current[0]
+            best_key, best_move = None, None
+            
+            for slot in slots:
+                min_cap, max_cap = slot_caps[slot]
+                count = len(chosen[slot])
+                free = np.array([food not in in_plan for food in pool_foods[slot]], dtype=bool)
+                free_ids = np.flatnonzero(free)
+                candidates = pool_matrix[slot][:, free_ids]
+                
+                moves = []
+                # Výměna položky za kandidáta: součty - v + p
+                for pos, vector in enumerate(vectors[slot]):
+                    moves.append(("replace", pos, (totals - vector)[:, None] + candidates, deficit))
+                # Přidání kandidáta
+                if count < max_cap:
+                    moves.append(("add", None, totals[:, None] + candidates,
+                                  deficit - (1 if count < min_cap else 0)))
+                # Odebrání položky
+                if count > min_cap:
+                    for pos, vector in enumerate(vectors[slot]):
+                        moves.append(("remove", pos, (totals - vector)[:, None], deficit))
+                
+                for kind, pos, new_totals, new_deficit in moves:
+                    if new_totals.shape[1] == 0:
+                        continue
+                    violation, deviation = self._evaluate(objective, new_totals)
+                    best = np.flatnonzero(violation <= violation.min() + _LS_EPS)
+                    column = int(best[np.argmin(deviation[best])])
+                    key = (new_deficit, float(violation[column]), float(deviation[column]))
+                    if self._better(key, best_key):
+                        pick = None if kind == "remove" else int(free_ids[column])
+                        best_key, best_move = key, (slot, kind, pos, pick)
+            
+            if best_move is None or not self._better(best_key, current):
+                break
+            
+            slot, kind, pos, pick = best_move
+            if kind != "add":
+                totals = totals - vectors[slot][pos]
+                del chosen[slot][pos]
+                del vectors[slot][pos]
+            if kind != "remove":
+                vector = pool_matrix[slot][:, pick].copy()
+                insert_at = len(chosen[slot]) if pos is None else pos
+                chosen[slot].insert(insert_at, pool_foods[slot][pick])
+                vectors[slot].insert(insert_at, vector)
+                totals = totals + vector
+            current = best_key
+        
+        self.stats = {
+            "iterations": iterations,
+            "elapsed": time.perf_counter() - start,
+            "initial": initial[2],
+            "objective": current[2],
+        }
+        return chosen
+    
+    def improve_plan(
+        self,
+        plan: MealPlan,
+        foods: Union[FoodCatalog, List[FoodItem]],
+        targets: Dict[str, Optional[float]],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        weights: Dict[str, float],
+        slot_caps: Dict[str, Tuple[int, int]]
+    ) -> MealPlan:
+        """
+        Vylepší hotový jídelníček; pokud výsledek neprojde validací
+        builderu, vrátí původní jídelníček.
+        """
+        distribution = self.improve(_as_catalog(foods), _plan_distribution(plan),
+                                    targets, limits, weights, slot_caps)
+        improved, _ = _try_build_plan(distribution, slot_caps, targets, limits)
+        return plan if improved is None else improved
+
+# ---------- METAHEURISTIC (SIMULATED ANNEALING + TABU) ----------
+# Váha relativního překročení limitů v energii žíhání
+_SA_PENALTY = 10.0
+# Jak často (v iteracích) se kontroluje časový limit
+_SA_CLOCK_EVERY = 64
+
+class AnnealingSolver:
+    """
+    Strategie „anneal“: simulované žíhání s tabu pamětí pro celý den.
+    
+    Optimalizuje všechny čtyři sloty najednou. Stav tvoří potraviny ve
+    slotech a vektor denních součtů; náhodný tah (výměna položky za
+    kandidáta, přidání, odebrání) se ohodnotí v O(1). Energie je
+    PlanObjective plus penalizace relativního překročení limits; horší
+    tah se přijme s pravděpodobností exp(-Δ/T) a teplota geometricky
+    klesá. Potravina odebraná ze slotu je tabu_tenure iterací tabu, pokud
+    by její návrat nevedl k novému nejlepšímu řešení (aspirace).
+    
+    Tahy dodržují min/max slot_caps; kandidáty slotu vybírá
+    _slot_candidates, takže platí meal_times i pravidlo „maso ne na
+    snídani“. Se stejným seed je výsledek reprodukovatelný (pokud
+    nerozhodne time_limit). Řešič je „anytime“: po vyčerpání max_iter
+    nebo time_limit vrátí nejlepší dosud nalezené přípustné rozdělení.
+    Atribut stats obsahuje počet iterací, přijatých tahů, čas a hodnotu
+    účelové funkce.
+    """
+    
+    supports_warm_start = True
+    
+    def __init__(self, max_iter: int = 20000, time_limit: float = 0.2, pool_size: int = 256,
+                 seed: Optional[int] = None, initial_temperature: float = 0.5,
+                 cooling: float = 0.999, tabu_tenure: int = 20):
+        self.max_iter = max_iter
+        self.time_limit = time_limit
+        self.pool_size = pool_size
+        self.seed = seed
+        self.initial_temperature = initial_temperature
+        self.cooling = cooling
+        self.tabu_tenure = tabu_tenure
+        self.stats: Dict[str, float] = {}
+    
+    def solve(
+        self,
+        catalog: Union[FoodCatalog, List[FoodItem]],
+        targets: Dict[str, Optional[float]],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        weights: Dict[str, float],
+        slot_caps: Dict[str, Tuple[int, int]],
+        warm_start: Optional[Dict[str, List[FoodItem]]] = None
+    ) -> Optional[Dict[str, List[FoodItem]]]:
+        """
+        Najde co nejlepší rozdělení potravin do slotů.
+        
+        Args:
+            warm_start: Počáteční rozdělení (jinak minimum položek
+                nejlépe hodnocených kandidátů každého slotu)
+        
+        Returns:
+            Dict[str, List[FoodItem]]: Nejlepší přípustné rozdělení nebo None
+        """
+        start = time.perf_counter()
+        catalog = _as_catalog(catalog)
+        rng = np.random.default_rng(self.seed)
+        objective = PlanObjective(targets, limits, weights)
+        bounds = np.where(np.isfinite(objective.upper), np.abs(objective.upper),
+                          np.where(np.isfinite(objective.lower), np.abs(objective.lower), 1.0))
+        scale = np.maximum(bounds, 1.0)
+        
+        slots = [slot for slot in MEAL_TIMES if slot in slot_caps]
+        pools = _slot_candidates(catalog, targets, weights, slot_caps, self.pool_size)
+        pool_foods = {slot: [catalog[int(i)] for i in pools[slot]] for slot in slots}
+        pool_matrix = {slot: catalog.matrix[:, pools[slot]] for slot in slots}
+        
+        if warm_start is not None and _fits_slot_caps(warm_start, slot_caps):
+            chosen = {slot: list(warm_start.get(slot, [])) for slot in slots}
+        else:
+            chosen = {}
+            for slot in slots:
+                min_cap = slot_caps[slot][0]
+                if len(pool_foods[slot]) < min_cap:
+                    self.stats = {"iterations": 0, "accepted": 0, "objective": np.inf,
+                                  "elapsed": time.perf_counter() - start, "proven_optimal": False}
+                    return None
+                chosen[slot] = pool_foods[slot][:min_cap]
+        vectors = {slot: [LocalSearch._vector(item) for item in chosen[slot]] for slot in slots}
+        totals = _distribution_totals(chosen)
+        in_plan = defaultdict(int)
+        for slot in slots:
+            for item in chosen[slot]:
+                in_plan[item] += 1
+        
+        def energy(totals: np.ndarray) -> Tuple[float, float]:
+            over = np.maximum(objective.lower - totals, 0.0) + np.maximum(totals - objective.upper, 0.0)
+            violation = float((over / scale).sum())
+            return float(objective.deviation(totals)) + _SA_PENALTY * violation, violation
+        
+        current, violation = energy(totals)
+        best_value = np.inf
+        best: Optional[Dict[str, List[FoodItem]]] = None
+        if violation == 0.0:
+            best_value, best = current, {slot: list(chosen[slot]) for slot in slots}
+        
+        tabu: Dict[FoodItem, int] = {}
+        temperature = self.initial_temperature
+        iterations = accepted = 0
+        while iterations < self.max_iter:
+            if iterations % _SA_CLOCK_EVERY == 0 and time.perf_counter() - start >= self.time_limit:
+                break
+            iterations += 1
+            temperature *= self.cooling
+            
+            slot = slots[int(rng.integers(len(slots)))]
+            min_cap, max_cap = slot_caps[slot]
+            count = len(chosen[slot])
+            moves = []
+            if count and pool_foods[slot]:
+                moves.append("replace")
+            if count < max_cap and pool_foods[slot]:
+                moves.append("add")
+            if count > min_cap:
+                moves.append("remove")
+            if not moves:
+                continue
+            kind = moves[int(rng.integers(len(moves)))]
+            
+            new_totals = totals
+            pos = pick = None
+            if kind != "add":
+                pos = int(rng.integers(count))
+                new_totals = new_totals - vectors[slot][pos]
+            if kind != "remove":
+                pick = int(rng.integers(len(pool_foods[slot])))
+                if in_plan[pool_foods[slot][pick]]:
+                    continue
+                new_totals = new_totals + pool_matrix[slot][:, pick]
+            
+            value, new_violation = energy(new_totals)
+            if kind != "remove" and tabu.get(pool_foods[slot][pick], 0) > iterations:
+                # Aspirace: tabu tah je povolen, jen pokud vede k novému optimu
+                if not (new_violation == 0.0 and value < best_value):
+                    continue
+            delta = value - current
+            if delta > 0 and rng.random() >= np.exp(-delta / max(temperature, 1e-12)):
+                continue
+            
+            accepted += 1
+            if kind != "add":
+                removed = chosen[slot].pop(pos)
+                del vectors[slot][pos]
+                in_plan[removed] -= 1
+                tabu[removed] = iterations + self.tabu_tenure
+            if kind != "remove":
+                food = pool_foods[slot][pick]
+                chosen[slot].append(food)
+                vectors[slot].append(pool_matrix[slot][:, pick].copy())
+                in_plan[food] += 1
+            totals, current = new_totals, value
+            
+            if new_violation == 0.0 and value < best_value:
+                best_value, best = value, {slot: list(chosen[slot]) for slot in slots}
+        
+        self.stats = {
+            "iterations": iterations,
+            "accepted": accepted,
+            "elapsed": time.perf_counter() - start,
+            "objective": best_value,
+            "proven_optimal": False,
+        }
+        return best
+
+# ---------- TRACING ----------
+# Hranice intervalů histogramu doby trvání fáze (v milisekundách)
+_TRACE_BUCKETS_MS = (0.01, 0.1, 1.0, 10.0, 100.0, 1000.0)
+
+@dataclass
+class TraceEvent:
+    """Jedna změřená fáze požadavku."""
+    stage: str
+    seconds: float
+    candidates: Optional[int] = None
+    selected: Optional[int] = None
+
+class PlanTracer:
+    """
+    Sběr časů jednotlivých fází find_optimal_plan.
+    
+    Fáze: "filter" (filtrace slotů), "knapsack.<slot>" (výběr pro slot),
+    "distribute" (rozdělení do slotů), "solver", "local_search", "build"
+    (validace builderem) a "total". U každé fáze se ukládá čas a počty
+    kandidátů a vybraných potravin. Tracer se připojí parametrem tracer
+    nebo globálně přes set_tracer; bez něj se nic neměří.
+    
+    Args:
+        max_requests: Kolik posledních požadavků (i vzorků na fázi) se drží
+    """
+    
+    def __init__(self, max_requests: int = 10000):
+        self.requests: "deque[List[TraceEvent]]" = deque(maxlen=max_requests)
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_requests))
+        self._lock = threading.Lock()
+        self.failures = 0
+    
+    def record_request(self, events: List[TraceEvent], ok: bool = True):
+        """Uloží fáze jednoho požadavku (volá find_optimal_plan)."""
+        with self._lock:
+            self.requests.append(events)
+            for event in events:
+                self._samples[event.stage].append(event)
+            if not ok:
+                self.failures += 1
+    
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        """
+        Agregace po fázích: počet, průměr a p50/p95/p99 v milisekundách,
+        histogram časů a průměrné počty kandidátů a vybraných potravin.
+        """
+        with self._lock:
+            samples = {stage: list(events) for stage, events in self._samples.items()}
+        result = {}
+        for stage, events in samples.items():
+            millis = np.array([event.seconds * 1000 for event in events])
+            p50, p95, p99 = np.percentile(millis, [50, 95, 99])
+            counts = np.histogram(millis, bins=(0.0,) + _TRACE_BUCKETS_MS + (np.inf,))[0]
+            edges = [f"<={edge:g}ms" for edge in _TRACE_BUCKETS_MS] + [f">{_TRACE_BUCKETS_MS[-1]:g}ms"]
+            candidates = [e.candidates for e in events if e.candidates is not None]
+            selected = [e.selected for e in events if e.selected is not None]
+            result[stage] = {
+                "count": len(events),
+                "mean_ms": float(millis.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "histogram": dict(zip(edges, (int(c) for c in counts))),
+                "candidates_mean": float(np.mean(candidates)) if candidates else None,
+                "selected_mean": float(np.mean(selected)) if selected else None,
+            }
+        return result
+    
+    def export(self, path: Optional[str] = None) -> Dict[str, object]:
+        """Vrátí (a volitelně uloží jako JSON) souhrn všech fází."""
+        data = {"requests": len(self.requests), "failures": self.failures, "stages": self.summary()}
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2, ensure_ascii=False)
+        return data
+    
+    def reset(self):
+        """Zahodí všechny vzorky."""
+        with self._lock:
+            self.requests.clear()
+            self._samples.clear()
+            self.failures = 0
+
+# Globálně připojený tracer (None = měření vypnuto)
+_TRACER: Optional[PlanTracer] = None
+
+def set_tracer(tracer: Optional[PlanTracer]) -> Optional[PlanTracer]:
+    """Připojí tracer ke všem voláním find_optimal_plan; vrátí předchozí."""
+    global _TRACER
+    previous, _TRACER = _TRACER, tracer
+    return previous
+
+# ---------- PLAN RESULT ----------
+PLAN_OK = "ok"
+PLAN_INFEASIBLE = "infeasible"
+PLAN_ERROR = "error"
+
+@dataclass
+class PlanResult:
+    """
+    Strukturovaný výsledek find_optimal_plan_result.
+    
+    status je PLAN_OK, PLAN_INFEASIBLE (požadavek nelze splnit; violation
+    popisuje porušené omezení, pokud je známé) nebo PLAN_ERROR (chyba
+    programu nebo vstupu; error_type je název výjimky).
+    """
+    status: str
+    plan: Optional[MealPlan]
+    message: str = ""
+    violation: Optional[ConstraintViolation] = None
+    # Součet časů fází v sekundách (názvy jako u PlanTracer); prázdné,
+    # pokud se fáze neměřily (viz find_optimal_plan_result)
+    timings: Dict[str, float] = field(default_factory=dict)
+    solver_stats: Dict[str, object] = field(default_factory=dict)
+    error_type: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.status == PLAN_OK
+
+class PlanCounters:
+    """Počítadla výsledků všech volání find_optimal_plan(_result)."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def add(self, result: PlanResult, seconds: float = 0.0):
+        with self._lock:
+            self.total += 1
+            self.statuses[result.status] += 1
+            if result.violation is not None:
+                self.violations[result.violation.constraint] += 1
+            if result.error_type is not None:
+                self.errors[result.error_type] += 1
+            self.seconds += seconds
+    
+    def reset(self):
+        self.total = 0
+        self.statuses: Dict[str, int] = defaultdict(int)
+        self.violations: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.seconds = 0.0
+    
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "total": self.total,
+                "statuses": dict(self.statuses),
+                "violations": dict(self.violations),
+                "errors": dict(self.errors),
+                "seconds": self.seconds,
+            }
+
+_PLAN_COUNTERS = PlanCounters()
+
+def plan_counters(reset: bool = False) -> Dict[str, object]:
+    """Souhrnná počítadla výsledků (volitelně je po přečtení vynuluje)."""
+    snapshot = _PLAN_COUNTERS.snapshot()
+    if reset:
+        with _PLAN_COUNTERS._lock:
+            _PLAN_COUNTERS.reset()
+    return snapshot
+
+# ---------- MAIN OPTIMIZATION FUNCTION ----------
+def _greedy_distribution(
+    catalog: FoodCatalog,
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    weights: Dict[str, float],
+    slot_caps: Dict[str, Tuple[int, int]],
+    slot_foods: Optional[Dict[str, FoodCatalog]] = None,
+    slot_scores: Optional[Dict[str, np.ndarray]] = None,
+    events: Optional[List[TraceEvent]] = None
+) -> Dict[str, List[FoodItem]]:
+    """
+    Výchozí strategie: knapsack-like výběr pro každý slot zvlášť.
+    
+    Dávkové zpracování předává předem vyfiltrované sloty (slot_foods)
+    a předem spočítaná skóre potravin slotů (slot_scores). Je-li zadán
+    seznam events, přidají se do něj změřené fáze (PlanTracer).
+    """
+    # Filtrace potravin podle slotů
+    if slot_foods is None:
+        stage_start = time.perf_counter() if events is not None else 0.0
+        slot_foods = {}
+        for slot in slot_caps.keys():
+            slot_foods[slot] = filter_items(catalog, by_meal_time(slot))
+        if events is not None:
+            events.append(TraceEvent("filter", time.perf_counter() - stage_start, len(catalog),
+                                     sum(len(items) for items in slot_foods.values())))
+    
+    # Cíle pro celý den
+    daily_targets = {k: v for k, v in targets.items() if v is not None}
+    
+    all_selected = []
+    
+    if daily_targets:
+        # Optimalizace pro každý slot zvlášť
+        for slot, percentage in SLOT_SHARES.items():
+            slot_items = slot_foods[slot]
+            if not slot_items:
+                continue
+            
+            # Cíle pro tento slot
+            slot_targets = {}
+            for nutrient, target in daily_targets.items():
+                slot_targets[nutrient] = target * percentage
+            
+            # Optimalizace pro slot
+            stage_start = time.perf_counter() if events is not None else 0.0
+            if slot_scores is not None:
+                selected = MealOptimizer.greedy_fill(
+                    slot_items, slot_scores[slot], limits, slot_caps[slot][1]
+                )
+            else:
+                selected = MealOptimizer.knapsack_optimize(
+                    slot_items,
+                    slot_targets,
+                    limits,
+                    weights,
+                    max_items=slot_caps[slot][1]
+                )
+            
+            all_selected.extend(selected[:slot_caps[slot][1]])
+            if events is not None:
+                events.append(TraceEvent(f"knapsack.{slot}", time.perf_counter() - stage_start,
+                                         len(slot_items), len(selected)))
+    else:
+        # Bez cílů - jednoduché přiřazení
+        for slot in ["breakfast", "lunch", "dinner", "snack"]:
+            slot_items = slot_foods[slot]
+            if slot_items:
+                all_selected.extend(slot_items[:slot_caps[slot][1]])
+    
+    # Rozdělení do slotů
+    stage_start = time.perf_counter() if events is not None else 0.0
+    distribution = MealOptimizer.distribute_to_slots(all_selected, slot_caps)
+    if events is not None:
+        events.append(TraceEvent("distribute", time.perf_counter() - stage_start, len(all_selected),
+                                 sum(len(items) for items in distribution.values())))
+    return distribution
+
+def _distribution_size(distribution: Optional[Dict[str, List[FoodItem]]]) -> Optional[int]:
+    """Počet potravin v rozdělení (None, pokud rozdělení neexistuje)."""
+    return None if distribution is None else sum(len(items) for items in distribution.values())
+
+def _build_plan(
+    distribution: Dict[str, List[FoodItem]],
+    slot_caps: Dict[str, Tuple[int, int]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]]
+) -> MealPlan:
+    """Sestaví a zvaliduje jídelníček pomocí Builder patternu."""
+    builder = MealPlanBuilder()
+    
+    # Nastavení limitů slotů
+    for slot, (min_cap, max_cap) in slot_caps.items():
+        builder.set_slot_limits(slot, min_cap, max_cap)
+    
+    # Přidání potravin
+    for food in distribution.get("breakfast", []):
+        builder.add_breakfast(food)
+    for food in distribution.get("lunch", []):
+        builder.add_lunch(food)
+    for food in distribution.get("dinner", []):
+        builder.add_dinner(food)
+    for food in distribution.get("snack", []):
+        builder.add_snack(food)
+    
+    return builder.build(targets=targets, limits=limits)
+
+def _try_build_plan(
+    distribution: Dict[str, List[FoodItem]],
+    slot_caps: Dict[str, Tuple[int, int]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]]
+) -> Tuple[Optional[MealPlan], List[ConstraintViolation]]:
+    """
+    Jako _build_plan, ale porušená omezení vrací jako data.
+    
+    První porušení v seznamu je to, které by vyhodil _build_plan
+    (převede ho na výjimku _violation_error).
+    """
+    builder = MealPlanBuilder()
+    for slot, (min_cap, max_cap) in slot_caps.items():
+        builder.set_slot_limits(slot, min_cap, max_cap)
+    
+    rejected = []
+    for slot in MEAL_TIMES:
+        for food in distribution.get(slot, ()):
+            if slot not in food.meal_times:
+                rejected.append(_meal_time_violation(slot, food))
+            builder._append(slot, food)
+    if rejected:
+        return None, rejected + builder.validate(limits)
+    return builder.try_build(targets, limits)
+
+def _best_plan(
+    distributions: List[Optional[Dict[str, List[FoodItem]]]],
+    slot_caps: Dict[str, Tuple[int, int]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    weights: Dict[str, float]
+) -> MealPlan:
+    """
+    Sestaví všechna rozdělení a vrátí platný jídelníček s nejmenší
+    odchylkou od cílů.
+    
+    Raises:
+        InfeasiblePlanError: Pokud žádné rozdělení neprojde validací
+    """
+    objective = PlanObjective(targets, limits, weights)
+    best, best_value, violation = None, np.inf, None
+    for distribution in distributions:
+        if distribution is None:
+            continue
+        plan, violations = _try_build_plan(distribution, slot_caps, targets, limits)
+        if plan is None:
+            violation = violations[0]
+            continue
+        totals = plan.totals()
+        value = float(objective.deviation(np.array([totals[n] for n in NUTRIENTS])))
+        if value < best_value:
+            best, best_value = plan, value
+    if best is None:
+        if violation is not None:
+            raise _violation_error(violation)
+        raise InfeasiblePlanError("Řešič nenašel jídelníček splňující omezení")
+    return best
+
+def find_optimal_plan(
+    foods: Union[FoodCatalog, List[FoodItem]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    weights: Dict[str, float],
+    slot_caps: Dict[str, Tuple[int, int]],
+    strategy="greedy",
+    warm_start: Optional[MealPlan] = None,
+    local_search: Union[bool, LocalSearch] = False,
+    timeout: Optional[float] = None,
+    tracer: Optional[PlanTracer] = None
+) -> Optional[MealPlan]:
+    """
+    Hlavní funkce pro nalezení optimálního jídelníčku.
+    
+    Postup:
+    1. Filtrace potravin podle slotů
+    2. Optimalizace pro každý slot zvlášť
+    3. Rozdělení výsledků do slotů
+    4. Sestavení jídelníčku pomocí Builder patternu
+    
+    Strategie "exact" místo kroků 1-3 použije BranchAndBoundSolver,
+    který optimalizuje všechny sloty najednou; strategie "dp" řeší pro
+    každý slot 0/1 batoh dynamickým programováním; strategie "anneal"
+    (AnnealingSolver) optimalizuje celý den simulovaným žíháním.
+    
+    Args:
+        foods: Všechny dostupné potraviny (seznam nebo FoodCatalog)
+        targets: Cílové nutriční hodnoty
+        limits: Omezení
+        weights: Váhy důležitosti
+        slot_caps: Kapacity slotů
+        strategy: "greedy", "exact", "dp", "anneal" nebo objekt řešiče
+            s metodou solve
+        warm_start: Známý (např. podobný) jídelníček. Řešiče, které to
+            umí, z něj startují; ve všech případech se vrátí lepší
+            z přípustných plánů podle PlanObjective.
+        local_search: True nebo instance LocalSearch – výsledek strategie
+            se před sestavením doladí lokálním prohledáváním
+        timeout: Časový rozpočet v sekundách; je-li zadán, použije se
+            find_optimal_plan_anytime (hladový výběr + zlepšování zvolenou
+            strategií; "greedy" zůstává jen hladovým výběrem)
+        tracer: PlanTracer pro měření fází (jinak globální z set_tracer)
+        
+    Returns:
+        MealPlan: Optimální jídelníček nebo None (důvod vypíše; strukturovaně
+        ho vrací find_optimal_plan_result)
+    """
+    result = find_optimal_plan_result(foods, targets, limits, weights, slot_caps, strategy,
+                                      warm_start, local_search, timeout, tracer)
+    if not result.ok:
+        print(f"❌ Chyba při hledání optimálního plánu: {result.message}")
+    return result.plan
+
+def find_optimal_plan_result(
+    foods: Union[FoodCatalog, List[FoodItem]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    weights: Dict[str, float],
+    slot_caps: Dict[str, Tuple[int, int]],
+    strategy="greedy",
+    warm_start: Optional[MealPlan] = None,
+    local_search: Union[bool, LocalSearch] = False,
+    timeout: Optional[float] = None,
+    tracer: Optional[PlanTracer] = None,
+    timings: bool = False
+) -> PlanResult:
+    """
+    Varianta find_optimal_plan se strukturovaným výsledkem.
+    
+    Nic nevypisuje a nevyhazuje výjimky: nesplnitelný požadavek vrátí
+    status PLAN_INFEASIBLE s porušeným omezením, neočekávaná chyba status
+    PLAN_ERROR. Výsledek obsahuje statistiky řešiče; souhrnná počítadla
+    všech volání vrací plan_counters().
+    
+    Args:
+        Stejné jako find_optimal_plan, navíc:
+        timings: Vrátit v PlanResult.timings časy fází. Fáze se měří jen
+            s timings=True nebo s připojeným tracerem; jinak se měří jen
+            celkový čas pro plan_counters().
+        
+    Returns:
+        PlanResult: Výsledek optimalizace
+    """
+    tracer = tracer or _TRACER
+    events: Optional[List[TraceEvent]] = [] if timings or tracer is not None else None
+    solver_stats: Dict[str, object] = {}
+    start = time.perf_counter()
+    plan, violation, error_type = None, None, None
+    try:
+        plan = _run_optimal_plan(foods, targets, limits, weights, slot_caps, strategy,
+                                 warm_start, local_search, timeout, events, solver_stats)
+        status, message = PLAN_OK, ""
+    except InfeasiblePlanError as e:
+        status, message = PLAN_INFEASIBLE, str(e)
+        violation = getattr(e, "violation", None)
+    except Exception as e:
+        status, message, error_type = PLAN_ERROR, str(e), type(e).__name__
+    elapsed = time.perf_counter() - start
+    
+    stage_times: Dict[str, float] = defaultdict(float)
+    if events is not None:
+        events.append(TraceEvent("total", elapsed, len(foods),
+                                 None if plan is None else len(plan.item_view())))
+        if tracer is not None:
+            tracer.record_request(events, ok=plan is not None)
+        for event in events:
+            stage_times[event.stage] += event.seconds
+    result = PlanResult(status, plan, message, violation, dict(stage_times), solver_stats, error_type)
+    _PLAN_COUNTERS.add(result, elapsed)
+    return result
+
+def _run_optimal_plan(foods, targets, limits, weights, slot_caps, strategy,
+                      warm_start, local_search, timeout,
+                      events: Optional[List[TraceEvent]],
+                      solver_stats: Dict[str, object]) -> MealPlan:
+    """
+    Tělo find_optimal_plan: zapisuje fáze do events (je-li zadán)
+    a statistiky řešičů do solver_stats, chyby propouští jako výjimky.
+    """
+    if timeout is not None:
+        anytime = find_optimal_plan_anytime(
+            foods, targets, limits, weights, slot_caps, timeout,
+            strategy, local_search, warm_start
+        )
+        if events is not None:
+            events.extend(TraceEvent(stage, seconds) for stage, seconds in anytime.stages.items())
+        solver_stats.update(proven_optimal=anytime.proven_optimal, deadline_hit=anytime.deadline_hit)
+        if anytime.plan is None:
+            raise InfeasiblePlanError("V časovém limitu nebyl nalezen platný jídelníček")
+        return anytime.plan
+    
+    catalog = _as_catalog(foods)
+    warm = None if warm_start is None else _plan_distribution(warm_start)
+    
+    if strategy == "greedy":
+        distribution = _greedy_distribution(catalog, targets, limits, weights, slot_caps,
+                                            events=events)
+    else:
+        stage_start = time.perf_counter() if events is not None else 0.0
+        solver = _resolve_solver(strategy)
+        if warm is not None and getattr(solver, "supports_warm_start", False):
+            distribution = solver.solve(catalog, targets, limits, weights, slot_caps, warm_start=warm)
+        else:
+            distribution = solver.solve(catalog, targets, limits, weights, slot_caps)
+        if events is not None:
+            events.append(TraceEvent("solver", time.perf_counter() - stage_start, len(catalog),
+                                     _distribution_size(distribution)))
+        solver_stats.update(getattr(solver, "stats", {}))
+        if distribution is None and warm is None:
+            raise InfeasiblePlanError("Řešič nenašel jídelníček splňující omezení")
+    
+    if local_search and distribution is not None:
+        stage_start = time.perf_counter() if events is not None else 0.0
+        searcher = local_search if isinstance(local_search, LocalSearch) else LocalSearch()
+        distribution = searcher.improve(catalog, distribution, targets, limits, weights, slot_caps)
+        if events is not None:
+            events.append(TraceEvent("local_search", time.perf_counter() - stage_start,
+                                     None, _distribution_size(distribution)))
+        solver_stats["local_search"] = dict(searcher.stats)
+    
+    stage_start = time.perf_counter() if events is not None else 0.0
+    try:
+        if warm is None:
+            return _build_plan(distribution, slot_caps, targets, limits)
+        return _best_plan([distribution, warm], slot_caps, targets, limits, weights)
+    finally:
+        if events is not None:
+            events.append(TraceEvent("build", time.perf_counter() - stage_start,
+                                     _distribution_size(distribution)))
+
+# ---------- ALTERNATIVE PLANS ----------
+def find_top_k_plans(
+    foods: Union[FoodCatalog, List[FoodItem]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    weights: Dict[str, float],
+    slot_caps: Dict[str, Tuple[int, int]],
+    k: int = 3,
+    min_difference: int = 2,
+    solver: Optional[BranchAndBoundSolver] = None
+) -> List[MealPlan]:
+    """
+    Vrátí až k nejlepších navzájem odlišných jídelníčků („další možnosti“).
+    
+    Všechny alternativy pocházejí z jednoho prohledávání
+    BranchAndBoundSolver.solve_top_k, takže výběr kandidátů, jejich
+    skórování i LP relaxace se sdílí. Alternativy se liší alespoň
+    v min_difference potravinách (počtu vyměněných potravin).
+    
+    Args:
+        k: Počet alternativ
+        min_difference: Minimální počet vyměněných potravin mezi alternativami
+        solver: Nastavený řešič (jinak výchozí BranchAndBoundSolver)
+        
+    Returns:
+        List[MealPlan]: Platné jídelníčky od nejlepšího (může jich být méně než k)
+    """
+    solver = solver or BranchAndBoundSolver()
+    plans = []
+    for distribution in solver.solve_top_k(foods, targets, limits, weights, slot_caps, k, min_difference):
+        try:
+            plans.append(_build_plan(distribution, slot_caps, targets, limits))
+        except ValueError as e:
+            print(f"⚠️  Alternativa přeskočena: {e}")
+    return plans
+
+# ---------- ANYTIME OPTIMIZATION ----------
+# Podíl zbývajícího času pro řešič, pokud následuje lokální prohledávání
+_ANYTIME_SOLVER_SHARE = 0.8
+
+@dataclass
+class AnytimePlan:
+    """Výsledek optimalizace s časovým limitem."""
+    plan: Optional[MealPlan]
+    # Optimum nad celým katalogem (ne jen mezi kandidáty řešiče)
+    proven_optimal: bool
+    elapsed: float
+    deadline_hit: bool
+    # Čas jednotlivých fází v sekundách ("greedy", "solver", "local_search")
+    stages: Dict[str, float] = field(default_factory=dict)
+
+def find_optimal_plan_anytime(
+    foods: Union[FoodCatalog, List[FoodItem]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    weights: Dict[str, float],
+    slot_caps: Dict[str, Tuple[int, int]],
+    timeout: float = 0.05,
+    strategy="exact",
+    local_search: Union[bool, LocalSearch] = False,
+    warm_start: Optional[MealPlan] = None
+) -> AnytimePlan:
+    """
+    Optimalizace s pevným časovým rozpočtem.
+    
+    Nejprve proběhne rychlý hladový výběr, potom zbylý čas do termínu
+    dostane zvolená strategie (s hladovým plánem jako warm startem, umí-li
+    to) a případně lokální prohledávání. Termín běží od začátku volání,
+    tedy včetně převodu na FoodCatalog. Řešičům s atributem time_limit se
+    limit nastaví na zbývající čas (na kopii, předaný objekt se nemění);
+    BranchAndBoundSolver ho hlídá i uvnitř LP relaxací,
+    DynamicProgrammingSolver po každé potravině batohu. Vlastní řešič
+    bez atributu time_limit přerušit nelze a termín může překročit.
+    Když čas dojde, vrátí se nejlepší dosud nalezený plán, v krajním
+    případě hladový.
+    Vrátí se nejlepší platný jídelníček podle PlanObjective.
+    
+    Args:
+        timeout: Časový rozpočet v sekundách
+        strategy: Zlepšující strategie ("exact", "anneal", "dp" nebo řešič;
+            "greedy" = bez zlepšování)
+        local_search: True nebo instance LocalSearch pro závěrečné doladění
+        warm_start: Známý jídelníček; je kandidátem výsledku a řešič z něj
+            startuje místo z hladového plánu
+        
+    Returns:
+        AnytimePlan: Jídelníček (nebo None), příznak prokázané optimality
+        (jen pokud řešič doběhl nad celým katalogem a jeho plán vyhrál)
+        a časové údaje
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    stages: Dict[str, float] = {}
+    catalog = _as_catalog(foods)
+    candidates: List[Optional[Dict[str, List[FoodItem]]]] = []
+    proven_optimal = False
+    
+    # 1. Rychlý hladový výběr
+    greedy = _greedy_distribution(catalog, targets, limits, weights, slot_caps)
+    candidates.append(greedy)
+    initial = greedy
+    if warm_start is not None:
+        initial = _plan_distribution(warm_start)
+        candidates.append(initial)
+    stages["greedy"] = time.perf_counter() - start
+    
+    # 2. Zlepšení zvolenou strategií ve zbývajícím čase
+    remaining = deadline - time.perf_counter()
+    solved = None
+    if remaining > 0 and strategy != "greedy":
+        stage_start = time.perf_counter()
+        solver = copy.copy(_resolve_solver(strategy))
+        if hasattr(solver, "time_limit"):
+            # Část času si nechá lokální prohledávání
+            solver.time_limit = remaining * (_ANYTIME_SOLVER_SHARE if local_search else 1.0)
+        if getattr(solver, "supports_warm_start", False):
+            solved = solver.solve(catalog, targets, limits, weights, slot_caps, warm_start=initial)
+        else:
+            solved = solver.solve(catalog, targets, limits, weights, slot_caps)
+        proven_optimal = bool(getattr(solver, "stats", {}).get("proven_optimal", False))
+        candidates.append(solved)
+        stages["solver"] = time.perf_counter() - stage_start
+    
+    # 3. Lokální prohledávání nejlepšího dosavadního rozdělení
+    remaining = deadline - time.perf_counter()
+    if local_search and remaining > 0:
+        stage_start = time.perf_counter()
+        searcher = copy.copy(local_search if isinstance(local_search, LocalSearch) else LocalSearch())
+        searcher.time_limit = min(searcher.time_limit, remaining)
+        seed = solved if solved is not None else initial
+        candidates.append(searcher.improve(catalog, seed, targets, limits, weights, slot_caps))
+        stages["local_search"] = time.perf_counter() - stage_start
+    
+    try:
+        plan = _best_plan(candidates, slot_caps, targets, limits, weights)
+    except ValueError:
+        plan = None
+    
+    # Optimalita platí jen tehdy, když vyhrál plán prokazatelně optimálního řešiče
+    if proven_optimal and plan is not None:
+        objective = PlanObjective(targets, limits, weights)
+        totals = plan.totals()
+        value = float(objective.deviation(np.array([totals[n] for n in NUTRIENTS])))
+        proven_optimal = solved is not None and value >= float(
+            objective.deviation(_distribution_totals(solved))) - _LS_EPS
+    else:
+        proven_optimal = False
+    
+    elapsed = time.perf_counter() - start
+    return AnytimePlan(plan, proven_optimal, elapsed, elapsed >= timeout, stages)
+
+# ---------- PLAN CACHE ----------
+def _freeze(value):
+    """Převede hodnotu na hashovatelný kanonický tvar (čísla jako float)."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+def _items_fingerprint(foods) -> bytes:
+    """Otisk seznamu potravin podle identit položek (16 bajtů)."""
+    ids = np.fromiter(map(id, foods), dtype=np.uint64, count=len(foods))
+    return hashlib.blake2b(ids.tobytes(), digest_size=16).digest()
+
+class _ListSnapshot:
+    """Položky seznamu potravin sdílené všemi záznamy cache se stejným otiskem."""
+    __slots__ = ("items", "__weakref__")
+    
+    def __init__(self, foods):
+        self.items = tuple(foods)
+
+def _copy_plan(plan: Optional[MealPlan]) -> Optional[MealPlan]:
+    """Mělká kopie jídelníčku, aby volající nemohl změnit obsah cache."""
+    if plan is None:
+        return None
+    copy = MealPlan(list(plan.breakfast), list(plan.lunch), list(plan.dinner), list(plan.snacks))
+    copy._set_totals(plan.totals())
+    return copy
+
+class PlanCache:
+    """
+    LRU/TTL cache před find_optimal_plan.
+    
+    Klíčem je kanonický (hashovatelný) tvar slovníků targets, limits,
+    weights a slot_caps, strategie a verze katalogu. Seznamy potravin se
+    rozlišují otiskem identit jednotlivých položek (_items_fingerprint),
+    takže změna seznamu (i na místě) znamená nový klíč; nově načtená data
+    tak nikdy netrefí staré záznamy. Položky seznamu drží jediný sdílený
+    snímek pro všechny záznamy se stejným otiskem (aby se jejich id()
+    nepoužilo znovu); uvolní se s posledním takovým záznamem. Ukládají se jen nalezené jídelníčky, neúspěch se
+    při dalším dotazu počítá znovu. Počítadla hits, misses, evictions
+    a expirations vrací stats().
+    
+    S parametrem quantize cache pracuje přibližně: cíle se zaokrouhlí na
+    zadanou granularitu (např. {"calories": 50} = koše po 50 kcal) a
+    požadavky ze stejného koše sdílí záznam. Uložený jídelníček se vrátí
+    jen tehdy, když projde MealPlanBuilder.build s přesnými cíli a limity
+    požadavku; jinak (i při úplném minutí) se optimalizace spustí znovu
+    s nejbližším uloženým jídelníčkem jako warm startem.
+    
+    Args:
+        maxsize: Maximální počet uložených jídelníčků
+        ttl: Doba platnosti záznamu v sekundách (None = bez omezení)
+        quantize: Granularita cílů podle živin (None = přesná cache)
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, clock=time.monotonic,
+                 quantize: Optional[Dict[str, float]] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize musí být alespoň 1")
+        if quantize is not None and any(step <= 0 for step in quantize.values()):
+            raise ValueError("Granularita kvantizace musí být kladná")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.quantize = dict(quantize) if quantize else None
+        self._clock = clock
+        self._entries: "OrderedDict[tuple, Tuple[float, MealPlan, object]]" = OrderedDict()
+        # Kvantizovaný režim: skupina (vše kromě cílů) -> uložené koše cílů
+        self._buckets: Dict[tuple, set] = defaultdict(set)
+        # Otisk seznamu potravin -> sdílený snímek (drží ho jen záznamy)
+        self._snapshots: "weakref.WeakValueDictionary[bytes, _ListSnapshot]" = \
+            weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+        self.warm_starts = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def make_key(foods, targets, limits, weights, slot_caps, strategy="greedy") -> tuple:
+        """Kanonický klíč požadavku."""
+        if isinstance(foods, FoodCatalog):
+            catalog_key = ("catalog", foods.version)
+        else:
+            catalog_key = ("list", len(foods), _items_fingerprint(foods))
+        strategy_key = strategy if isinstance(strategy, str) else ("solver", id(strategy))
+        return (catalog_key, _freeze(targets), _freeze(limits), _freeze(weights),
+                _freeze(slot_caps), strategy_key)
+    
+    def make_quantized_key(self, foods, targets, limits, weights, slot_caps,
+                           strategy="greedy") -> Tuple[tuple, tuple]:
+        """
+        Klíč kvantizovaného režimu: (skupina, koš cílů).
+        
+        Koš je seřazená n-tice (živina, hodnota); hodnoty živin
+        s granularitou jsou zaokrouhlené na její násobek.
+        """
+        group = self.make_key(foods, None, limits, weights, slot_caps, strategy)
+        bucket = []
+        for nutrient, value in sorted((targets or {}).items()):
+            step = (self.quantize or {}).get(nutrient)
+            if value is not None and step:
+                value = round(value / step) * step
+            bucket.append((nutrient, _freeze(value)))
+        return group, tuple(bucket)
+    
+    def _discard(self, key: tuple):
+        """Odebere klíč z indexu košů (volá se pod zámkem)."""
+        if self.quantize is None:
+            return
+        group, bucket = key
+        buckets = self._buckets.get(group)
+        if buckets is not None:
+            buckets.discard(bucket)
+            if not buckets:
+                del self._buckets[group]
+    
+    def _lookup(self, key: tuple):
+        """Záznam pro klíč bez počítadel hits/misses (volá se pod zámkem)."""
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None and self._clock() - entry[0] > self.ttl:
+            del self._entries[key]
+            self._discard(key)
+            self.expirations += 1
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def get(self, key: tuple) -> Tuple[bool, Optional[MealPlan]]:
+        """Vrátí (nalezeno, jídelníček) a aktualizuje počítadla."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, _copy_plan(entry[1])
+    
+    def put(self, key: tuple, plan: Optional[MealPlan], foods=None):
+        """Uloží jídelníček; None (neúspěch) se neukládá."""
+        if plan is None:
+            return
+        catalog_key = key[0] if self.quantize is None else key[0][0]
+        snapshot = None
+        with self._lock:
+            if catalog_key[0] == "list":
+                # Odkazy na položky brání opětovnému použití jejich id() v klíči
+                snapshot = self._snapshots.get(catalog_key[2])
+                if snapshot is None and foods is not None:
+                    snapshot = self._snapshots[catalog_key[2]] = _ListSnapshot(foods)
+            self._entries[key] = (self._clock(), _copy_plan(plan), snapshot)
+            self._entries.move_to_end(key)
+            if self.quantize is not None:
+                self._buckets[key[0]].add(key[1])
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._discard(evicted)
+                self.evictions += 1
+    
+    def nearest(self, key: Tuple[tuple, tuple]) -> Optional[MealPlan]:
+        """
+        Nejbližší uložený jídelníček ze stejné skupiny (L1 vzdálenost
+        košů se stejnými živinami), nebo None.
+        """
+        group, bucket = key
+        with self._lock:
+            best_key, best_distance = None, np.inf
+            for other in self._buckets.get(group, ()):
+                if [n for n, _ in other] != [n for n, _ in bucket]:
+                    continue
+                if any((a is None) != (b is None) for (_, a), (_, b) in zip(other, bucket)):
+                    continue
+                distance = sum(abs(a - b) for (_, a), (_, b) in zip(other, bucket)
+                               if a is not None)
+                if distance < best_distance:
+                    best_key, best_distance = (group, other), distance
+            if best_key is None:
+                return None
+            entry = self._lookup(best_key)
+            return None if entry is None else _copy_plan(entry[1])
+    
+    def find_optimal_plan(
+        self,
+        foods: Union[FoodCatalog, List[FoodItem]],
+        targets: Dict[str, Optional[float]],
+        limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+        weights: Dict[str, float],
+        slot_caps: Dict[str, Tuple[int, int]],
+        strategy="greedy"
+    ) -> Optional[MealPlan]:
+        """find_optimal_plan s cache (stejné argumenty i výsledek)."""
+        if self.quantize is not None:
+            return self._find_quantized(foods, targets, limits, weights, slot_caps, strategy)
+        key = self.make_key(foods, targets, limits, weights, slot_caps, strategy)
+        found, plan = self.get(key)
+        if found:
+            return plan
+        plan = find_optimal_plan(foods, targets, limits, weights, slot_caps, strategy)
+        self.put(key, plan, foods)
+        return plan
+    
+    def _find_quantized(self, foods, targets, limits, weights, slot_caps, strategy) -> Optional[MealPlan]:
+        """Přibližné vyhledání přes koše cílů s ověřením a warm startem."""
+        key = self.make_quantized_key(foods, targets, limits, weights, slot_caps, strategy)
+        with self._lock:
+            entry = self._lookup(key)
+        cached = None if entry is None else entry[1]
+        
+        if cached is not None:
+            # Jídelníček jiného požadavku z koše musí splnit přesné zadání
+            plan, _ = _try_build_plan(_plan_distribution(cached), slot_caps, targets, limits)
+            if plan is None:
+                with self._lock:
+                    self.rejected += 1
+            else:
+                with self._lock:
+                    self.hits += 1
+                return plan
+        
+        with self._lock:
+            self.misses += 1
+        warm_start = cached or self.nearest(key)
+        if warm_start is not None:
+            with self._lock:
+                self.warm_starts += 1
+        plan = find_optimal_plan(foods, targets, limits, weights, slot_caps, strategy,
+                                 warm_start=warm_start)
+        self.put(key, plan, foods)
+        return plan
+    
+    def clear(self):
+        """Vyprázdní cache (počítadla zůstávají)."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Počítadla cache."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+            "warm_starts": self.warm_starts,
+        }
+
+# ---------- BATCH PLAN GENERATION ----------
+# Maximální počet prvků mezivýsledku (požadavky × živiny × potraviny)
+# při dávkovém skórování; větší dávky se zpracují po částech
+_BATCH_SCORE_ELEMENTS = 1 << 22
+
+@dataclass
+class PlanRequest:
+    """Jeden požadavek na jídelníček pro dávkové zpracování."""
+    targets: Dict[str, Optional[float]]
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]]
+    weights: Dict[str, float]
+    slot_caps: Dict[str, Tuple[int, int]]
+
+def find_optimal_plans_batch(
+    foods: Union[FoodCatalog, List[FoodItem]],
+    requests: List[PlanRequest]
+) -> List[Optional[MealPlan]]:
+    """
+    Dávková varianta find_optimal_plan pro mnoho uživatelů najednou.
+    
+    Filtrace katalogu podle slotů proběhne jen jednou pro celou dávku
+    a skóre všech požadavků vůči potravinám slotu se spočítají jedním
+    vektorovým výpočtem nad maticí živin (MealOptimizer.score_matrix).
+    Výsledky jsou stejné jako při volání find_optimal_plan pro každý
+    požadavek zvlášť (výchozí strategie "greedy").
+    
+    Args:
+        foods: Všechny dostupné potraviny (seznam nebo FoodCatalog)
+        requests: Seznam požadavků
+        
+    Returns:
+        List[Optional[MealPlan]]: Jídelníčky ve stejném pořadí jako požadavky
+    """
+    catalog = _as_catalog(foods)
+    slots = {slot for request in requests for slot in request.slot_caps}
+    slot_foods = {slot: filter_items(catalog, by_meal_time(slot)) for slot in slots}
+    
+    largest = max([len(items) for items in slot_foods.values()] + [1])
+    chunk = max(1, _BATCH_SCORE_ELEMENTS // (len(NUTRIENTS) * largest))
+    
+    plans: List[Optional[MealPlan]] = []
+    for start in range(0, len(requests), chunk):
+        batch = requests[start:start + chunk]
+        daily = [{k: v for k, v in r.targets.items() if v is not None} for r in batch]
+        
+        # Skóre všech požadavků dávky pro každý slot najednou
+        batch_scores: Dict[str, np.ndarray] = {}
+        for slot, percentage in SLOT_SHARES.items():
+            if slot not in slot_foods or not slot_foods[slot]:
+                continue
+            target_rows, weight_rows = MealOptimizer.target_rows(
+                [{k: v * percentage for k, v in targets.items()} for targets in daily],
+                [r.weights for r in batch]
+            )
+            batch_scores[slot] = MealOptimizer.score_matrix(
+                slot_foods[slot].matrix, target_rows, weight_rows
+            )
+        
+        for row, request in enumerate(batch):
+            try:
+                distribution = _greedy_distribution(
+                    catalog, request.targets, request.limits, request.weights,
+                    request.slot_caps, slot_foods,
+                    {slot: scores[row] for slot, scores in batch_scores.items()}
+                )
+                plans.append(_build_plan(distribution, request.slot_caps,
+                                         request.targets, request.limits))
+            except Exception as e:
+                print(f"❌ Chyba při hledání optimálního plánu: {e}")
+                plans.append(None)
+    
+    return plans
+
+# ---------- WEEKLY PLANNING ----------
+# Pokusy o jeden den (druhý bez potravin z neúspěšného prvního)
+_WEEKLY_DAY_ATTEMPTS = 2
+
+@dataclass
+class WeeklyPlan:
+    """Jídelníčky pro více dní (None = den se nepodařilo naplánovat)."""
+    days: List[Optional[MealPlan]]
+    
+    def totals(self) -> Dict[str, float]:
+        """Součty živin za všechny naplánované dny."""
+        week = _sum_totals(())
+        for plan in self.days:
+            if plan is not None:
+                for nutrient, value in plan.totals().items():
+                    week[nutrient] += value
+        return week
+    
+    def repeats(self) -> Dict[FoodItem, int]:
+        """Kolikrát se každá potravina v týdnu vyskytuje."""
+        counts: Dict[FoodItem, int] = defaultdict(int)
+        for plan in self.days:
+            if plan is not None:
+                for item in plan.item_view():
+                    counts[item] += 1
+        return dict(counts)
+
+def find_weekly_plan(
+    foods: Union[FoodCatalog, List[FoodItem]],
+    targets: Dict[str, Optional[float]],
+    limits: Dict[str, Tuple[Optional[float], Optional[float]]],
+    weights: Dict[str, float],
+    slot_caps: Dict[str, Tuple[int, int]],
+    days: int = 7,
+    max_repeats: int = 2,
+    weekly_targets: Optional[Dict[str, float]] = None
+) -> WeeklyPlan:
+    """
+    Vícedenní jídelníček s omezením opakování potravin.
+    
+    Každý den se plánuje hladovým výběrem jako find_optimal_plan, ale
+    potravina, která se v týdnu už objevila max_repeats krát, se dál
+    nevybírá. Neplatný den se zkusí znovu bez potravin z neúspěšného
+    pokusu; když selže i tak a nejsou zadány weekly_targets, zůstanou
+    prázdné (None) i všechny další dny, protože by se opakoval stejný
+    výpočet. Filtrace slotů a matice živin se připraví jednou pro celý
+    týden a skóre slotů se počítají jen pro nové denní cíle (bez
+    weekly_targets tedy jen jednou).
+    
+    Args:
+        targets: Denní cílové hodnoty
+        limits: Denní limity
+        days: Počet dní
+        max_repeats: Kolikrát se smí jedna potravina v týdnu objevit
+        weekly_targets: Týdenní cíle; denní cíl živiny se pak průběžně
+            určuje jako (týdenní cíl - dosud snědeno) / zbývající dny
+        
+    Returns:
+        WeeklyPlan: Jídelníčky jednotlivých dní
+    """
+    catalog = _as_catalog(foods)
+    slot_ids = {slot: np.flatnonzero(catalog.meal_time_mask(slot)) for slot in slot_caps}
+    slot_foods = {slot: catalog.take(ids) for slot, ids in slot_ids.items()}
+    score_cache: Dict[tuple, Dict[str, np.ndarray]] = {}
+    uses = np.zeros(len(catalog), dtype=np.int64)
+    eaten = _sum_totals(())
+    plans: List[Optional[MealPlan]] = []
+    
+    for day in range(days):
+        day_targets = {k: v for k, v in targets.items() if v is not None}
+        for nutrient, week_target in (weekly_targets or {}).items():
+            day_targets[nutrient] = max(0.0, (week_target - eaten[nutrient]) / (days - day))
+        
+        # Skóre slotů pro tyto cíle (sdílená mezi dny se stejnými cíli)
+        key = _freeze(day_targets)
+        slot_scores = score_cache.get(key)
+        if slot_scores is None:
+            slot_scores = {}
+            for slot, percentage in SLOT_SHARES.items():
+                if slot in slot_foods and len(slot_foods[slot]):
+                    target_rows, weight_rows = MealOptimizer.target_rows(
+                        [{k: v * percentage for k, v in day_targets.items()}], [weights]
+                    )
+                    slot_scores[slot] = MealOptimizer.score_matrix(
+                        slot_foods[slot].matrix, target_rows, weight_rows
+                    )[0]
+            score_cache[key] = slot_scores
+        
+        # Hladový výběr pro sloty bez potravin vyčerpaných v týdnu; neplatný
+        # den se zkusí ještě jednou bez potravin z neúspěšného pokusu
+        excluded = np.zeros(len(catalog), dtype=bool)
+        plan, error = None, None
+        for _ in range(_WEEKLY_DAY_ATTEMPTS):
+            day_uses = uses.copy()
+            selected: List[int] = []
+            for slot in SLOT_SHARES:
+                if slot not in slot_scores:
+                    continue
+                ids = slot_ids[slot]
+                chosen = ids[MealOptimizer.greedy_fill_indices(
+                    slot_foods[slot], slot_scores[slot], limits, slot_caps[slot][1],
+                    allowed=(day_uses[ids] < max_repeats) & ~excluded[ids]
+                )]
+                np.add.at(day_uses, chosen, 1)
+                selected.extend(int(i) for i in chosen)
+            
+            distribution = MealOptimizer.distribute_to_slots([catalog[i] for i in selected], slot_caps)
+            try:
+                plan = _build_plan(distribution, slot_caps, targets, limits)
+                break
+            except ValueError as e:
+                error = e
+                excluded[selected] = True
+        
+        if plan is None:
+            if weekly_targets:
+                print(f"❌ Den {day + 1}: {error}")
+                plans.append(None)
+                continue
+            # Bez týdenních cílů mají další dny stejné vstupy a skončily by
+            # stejně, proto se chyba ohlásí jednou za všechny zbývající dny
+            label = f"Den {day + 1}" if day + 1 == days else f"Dny {day + 1}–{days}"
+            print(f"❌ {label}: {error}")
+            plans.extend([None] * (days - day))
+            break
+        
+        uses = day_uses
+        for nutrient, value in plan.totals().items():
+            eaten[nutrient] += value
+        plans.append(plan)
+    
+    return WeeklyPlan(plans)
+
+# ---------- PARALLEL EXECUTION ----------
+# Katalogy registrované v rodičovském procesu; při startu "fork" je
+# pracovní procesy zdědí bez serializace
+_SHARED_CATALOGS: Dict[int, FoodCatalog] = {}
+_WORKER_CATALOG: Optional[FoodCatalog] = None
+
+def _init_worker(token: int, catalog: Optional[FoodCatalog]):
+    """Inicializace pracovního procesu: katalog se předá jen jednou."""
+    global _WORKER_CATALOG
+    _WORKER_CATALOG = catalog if catalog is not None else _SHARED_CATALOGS[token]
+
+def _run_chunk(requests: List[PlanRequest]) -> Tuple[int, List[Optional[MealPlan]], float]:
+    """Zpracuje jeden blok požadavků v pracovním procesu."""
+    start = time.perf_counter()
+    plans = find_optimal_plans_batch(_WORKER_CATALOG, requests)
+    return os.getpid(), plans, time.perf_counter() - start
+
+class ParallelPlanRunner:
+    """
+    Paralelní generování jídelníčků v procesech (obchází GIL).
+    
+    Katalog se do pracovních procesů dostane jednou: při startu "fork"
+    ho zdědí přes globální proměnnou, jinak se předá inicializátoru
+    procesu. Úlohy pak nesou jen bloky požadavků (chunk_size), které se
+    zpracují funkcí find_optimal_plans_batch.
+    
+    Po každém běhu obsahuje worker_stats výkon jednotlivých procesů
+    (plans, tasks, seconds, plans_per_second) pro dimenzování poolu.
+    
+    Použití:
+        with ParallelPlanRunner(catalog, max_workers=4) as runner:
+            plans = runner.run(requests)
+    """
+    
+    def __init__(self,
+                 foods: Union[FoodCatalog, List[FoodItem]],
+                 max_workers: Optional[int] = None,
+                 chunk_size: int = 64,
+                 mp_context=None):
+        if chunk_size < 1:
+            raise ValueError("chunk_size musí být alespoň 1")
+        self.catalog = _as_catalog(foods)
+        self.chunk_size = chunk_size
+        self.worker_stats: Dict[int, Dict[str, float]] = {}
+        
+        context = mp_context or multiprocessing.get_context()
+        self._token = id(self)
+        if context.get_start_method() == "fork":
+            _SHARED_CATALOGS[self._token] = self.catalog
+            init_catalog = None
+        else:
+            init_catalog = self.catalog
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._token, init_catalog)
+        )
+    
+    def run(self, requests: List[PlanRequest]) -> List[Optional[MealPlan]]:
+        """Vygeneruje jídelníčky pro všechny požadavky (ve stejném pořadí)."""
+        chunks = [requests[i:i + self.chunk_size] for i in range(0, len(requests), self.chunk_size)]
+        futures = [self._executor.submit(_run_chunk, chunk) for chunk in chunks]
+        
+        self.worker_stats = {}
+        plans: List[Optional[MealPlan]] = []
+        for future in futures:
+            pid, chunk_plans, seconds = future.result()
+            stats = self.worker_stats.setdefault(pid, {"plans": 0, "tasks": 0, "seconds": 0.0})
+            stats["plans"] += len(chunk_plans)
+            stats["tasks"] += 1
+            stats["seconds"] += seconds
+            plans.extend(chunk_plans)
+        
+        for stats in self.worker_stats.values():
+            stats["plans_per_second"] = stats["plans"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return plans
+    
+    def close(self):
+        """Ukončí pracovní procesy."""
+        self._executor.shutdown()
+        _SHARED_CATALOGS.pop(self._token, None)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 # ---------- USER INTERFACE ----------
 def interactive_menu():
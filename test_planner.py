@@ -6,6 +6,9 @@ Autor: Adil
 
 import sys
 import os
+import itertools
+import pickle
+import tempfile
 
 from planner_jidelnicku_final import *
 
@@ -161,6 +164,968 @@ def test_nutrition_calculation():
     print("✅ Výpočty nutričních hodnot jsou správné")
     return True
 
+def _sample_foods():
+    """Malý testovací katalog nezávislý na CSV souboru."""
+    return [
+        FoodItem("Kuřecí prsa", 500, 90, 9.6, 0, {"lunch", "dinner"}, {"high_protein", "meat"}),
+        FoodItem("Rýže", 300, 5.7, 0.9, 70, {"lunch", "dinner", "snack"}, {"vegan", "gluten_free"}),
+        FoodItem("Brokolice", 55, 3.7, 0.6, 11, {"lunch", "dinner", "snack"}, {"vegan", "low_cal"}),
+        FoodItem("Jablko", 95, 0.3, 0.2, 25, {"breakfast", "snack"}, {"vegan", "fruit"}),
+        FoodItem("Vejce", 78, 6, 5, 0.6, {"breakfast", "lunch"}, {"vegetarian", "high_protein"}),
+        FoodItem("Ovesná kaše", 220, 8, 4, 38, {"breakfast"}, {"vegetarian", "whole_grain"}),
+        FoodItem("Tvaroh", 150, 20, 4, 6, {"breakfast", "snack"}, {"vegetarian", "high_protein"}),
+        FoodItem("Losos", 415, 40, 27, 0, {"lunch", "dinner"}, {"fish", "omega3"}),
+        FoodItem("Avokádo", 160, 2, 15, 9, {"breakfast", "lunch", "dinner", "snack"}, {"vegan"}),
+        FoodItem("Mandle", 575, 21, 49, 22, {"snack"}, {"vegan", "nuts"}),
+        FoodItem("Banán", 89, 1.1, 0.3, 23, {"breakfast", "snack"}, {"vegan", "fruit"}),
+        FoodItem("Čočka", 116, 9, 0.4, 20, {"lunch", "dinner"}, {"vegan", "legume"}),
+        FoodItem("Batát", 86, 1.6, 0.1, 20, {"lunch", "dinner"}, {"vegan", "vegetable"}),
+        FoodItem("Krůtí prsa", 135, 30, 1, 0, {"lunch", "dinner"}, {"meat", "high_protein"}),
+    ]
+
+def test_food_catalog():
+    """Test sloupcového katalogu FoodCatalog."""
+    print("\n🧪 TEST: Sloupcový katalog")
+    
+    foods = _sample_foods()
+    catalog = FoodCatalog.from_items(foods)
+    
+    assert len(catalog) == len(foods), "Nesprávná velikost katalogu"
+    assert catalog[0] is foods[0], "Katalog musí vracet původní FoodItem"
+    assert catalog.nutrient("protein")[0] == 90, "Špatný sloupec bílkovin"
+    assert catalog.matrix.flags["C_CONTIGUOUS"], "Matice živin není souvislá"
+    
+    # Filtrování katalogu musí odpovídat filtrování seznamu
+    predicates = (by_meal_time("lunch"), not_tag("meat"), max_nutrient("fat", 10))
+    assert list(filter_items(catalog, *predicates)) == filter_items(foods, *predicates)
+    assert list(filter_items(catalog, compose_predicates(by_tag("vegan"), lambda f: f.calories < 100))) == \
+        filter_items(foods, by_tag("vegan"), lambda f: f.calories < 100)
+    
+    # Optimalizace nad katalogem i seznamem dává stejný výsledek
+    targets = {"calories": 600, "protein": 40}
+    limits = {"calories": (None, 700)}
+    assert MealOptimizer.knapsack_optimize(catalog, targets, limits, {}, 3) == \
+        MealOptimizer.knapsack_optimize(foods, targets, limits, {}, 3)
+    
+    print("✅ Katalog funguje správně")
+    return True
+
+def _reference_scores(foods, targets, weights):
+    """Původní skórovací smyčka (referenční implementace)."""
+    nutrients = ["calories", "protein", "fat", "carbs"]
+    scores = []
+    for food in foods:
+        score = 0.0
+        for nutrient in nutrients:
+            if nutrient in targets and targets[nutrient] > 0:
+                ratio = food.get_nutrient_value(nutrient) / max(targets[nutrient], 1)
+                weight = weights.get(nutrient, 1.0)
+                if ratio > 1.5:
+                    score += -weight * (ratio - 1)
+                else:
+                    score += weight * (1 - abs(1 - ratio))
+        scores.append(score / len(nutrients))
+    return scores
+
+def test_batch_scoring():
+    """Test dávkového skórování a top-k výběru."""
+    print("\n🧪 TEST: Dávkové skórování")
+    
+    # Velký katalog s opakujícími se potravinami (shody skóre)
+    foods = _sample_foods() * 40
+    catalog = FoodCatalog.from_items(foods)
+    targets = {"calories": 500, "protein": 35, "fat": 15}
+    weights = {"protein": 2.0}
+    
+    reference = _reference_scores(foods, targets, weights)
+    scores = MealOptimizer.score_items(catalog, targets, weights)
+    assert scores.tolist() == reference, "Skóre se liší od původní smyčky"
+    
+    # Top-k pořadí musí odpovídat úplnému stabilnímu seřazení
+    expected = sorted(range(len(foods)), key=lambda i: reference[i], reverse=True)
+    assert [int(i) for i in MealOptimizer.ranked_indices(scores, 3)] == expected
+    
+    # Více cílů najednou
+    other = {"calories": 300, "carbs": 40}
+    target_rows, weight_rows = MealOptimizer.target_rows([targets, other], [weights, {}])
+    batch = MealOptimizer.score_matrix(catalog.matrix, target_rows, weight_rows)
+    assert batch[1].tolist() == _reference_scores(foods, other, {}), "Dávkové skóre nesouhlasí"
+    
+    print("✅ Dávkové skórování odpovídá původnímu pořadí")
+    return True
+
+def test_greedy_fill():
+    """Test výběru potravin s limity (vektor součtů a předčasné ukončení)."""
+    print("\n🧪 TEST: Hladový výběr s limity")
+    
+    foods = _sample_foods() * 40
+    catalog = FoodCatalog.from_items(foods)
+    scores = MealOptimizer.score_items(catalog, {"calories": 500, "protein": 35}, {})
+    allowed = np.arange(len(foods)) % 3 != 0
+    
+    def reference(limits, max_items, mask=None):
+        # Původní smyčka: projde celé pořadí a zkouší každou potravinu
+        selected, totals = [], {n: 0.0 for n in NUTRIENTS}
+        for index in MealOptimizer.ranked_indices(scores, max_items):
+            if len(selected) >= max_items:
+                break
+            if mask is not None and not mask[index]:
+                continue
+            temp = {n: totals[n] + getattr(foods[index], n) for n in NUTRIENTS}
+            if all(max_val is None or temp[n] <= max_val for n, (_, max_val) in limits.items()):
+                selected.append(int(index))
+                totals = temp
+        return selected
+    
+    cases = [
+        ({"calories": (None, 700)}, 10),
+        ({"calories": (None, 1500), "fat": (None, 20)}, 6),
+        ({"protein": (None, 0)}, 5),
+        ({"calories": (300, None)}, 4),
+    ]
+    for limits, max_items in cases:
+        for mask in (None, allowed):
+            expected = reference(limits, max_items, mask)
+            assert MealOptimizer.greedy_fill_indices(catalog, scores, limits, max_items, mask) == expected, limits
+    
+    # Bloky ranked_blocks dávají stejné pořadí jako ranked_indices
+    blocks = list(MealOptimizer.ranked_blocks(scores, 3))
+    assert blocks[-1][1] and not any(last for _, last in blocks[:-1])
+    assert [int(i) for block, _ in blocks for i in block] == \
+        [int(i) for i in MealOptimizer.ranked_indices(scores, 3)]
+    
+    print(f"✅ Výběr odpovídá původní smyčce ({len(cases)} zadání)")
+    return True
+
+def test_exact_solver():
+    """Test exaktního řešiče (branch and bound)."""
+    print("\n🧪 TEST: Branch and bound")
+    
+    foods = _sample_foods()
+    targets = {"calories": 2000, "protein": 100, "fat": 70, "carbs": 200}
+    limits = {"calories": (1800, 2200)}
+    weights = {"protein": 2.0}
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 2), "dinner": (1, 2), "snack": (0, 1)}
+    
+    solver = BranchAndBoundSolver(node_limit=5000, time_limit=10.0)
+    plan = find_optimal_plan(foods, targets, limits, weights, slot_caps, strategy=solver)
+    
+    assert plan is not None, "Exaktní řešič nenašel plán"
+    assert 1800 <= plan.totals()["calories"] <= 2200, "Plán porušuje limit kalorií"
+    assert solver.stats["proven_optimal_within_candidates"], "Řešení nebylo dokázáno jako optimální"
+    assert not any("meat" in food.tags for food in plan.breakfast), "Maso na snídani"
+    
+    # Výchozích 8 kandidátů nepokryje 9 obědů: optimum jen mezi kandidáty
+    assert not solver.stats["candidates_complete"] and not solver.stats["proven_optimal"]
+    full = BranchAndBoundSolver(node_limit=10**6, time_limit=10.0, per_slot=len(foods))
+    find_optimal_plan(foods, targets, limits, weights, slot_caps, strategy=full)
+    assert full.stats["candidates_complete"] and full.stats["proven_optimal"]
+    
+    # Malý rozpočet uzlů: řešič skončí včas a optimalitu nedokáže
+    limited = BranchAndBoundSolver(node_limit=1)
+    find_optimal_plan(foods, targets, limits, weights, slot_caps, strategy=limited)
+    assert limited.stats["nodes"] == 1 and not limited.stats["proven_optimal_within_candidates"]
+    
+    # Simplex na limitu iterací není nepřípustnost: optimalita se neprokáže
+    import planner_jidelnicku_final as planner
+    max_iter = planner._LP_MAX_ITER
+    planner._LP_MAX_ITER = 1
+    try:
+        capped = BranchAndBoundSolver(node_limit=10**6, time_limit=10.0, per_slot=len(foods))
+        capped.solve(foods, targets, limits, weights, slot_caps,
+                     warm_start={slot: list(items) for slot, items in
+                                 (("breakfast", plan.breakfast), ("lunch", plan.lunch),
+                                  ("dinner", plan.dinner), ("snack", plan.snacks))})
+    finally:
+        planner._LP_MAX_ITER = max_iter
+    assert capped.stats["lp_iteration_limits"] > 0 and not capped.stats["proven_optimal"]
+    
+    print(f"✅ Exaktní plán: {plan.totals()['calories']} kcal ({solver.stats['nodes']} uzlů)")
+    return True
+
+def test_dp_knapsack():
+    """Test 0/1 batohu dynamickým programováním."""
+    print("\n🧪 TEST: DP knapsack")
+    
+    foods = _sample_foods()
+    targets = {"calories": 600, "protein": 40}
+    limits = {"calories": (450, 650), "fat": (None, 20)}
+    
+    selected = MealOptimizer.knapsack_optimize(foods, targets, limits, {}, 3, method="dp", min_items=1)
+    calories = sum(food.calories for food in selected)
+    assert 450 <= calories <= 650, "Výběr je mimo okno kalorií"
+    assert sum(food.fat for food in selected) <= 20, "Výběr porušuje limit tuků"
+    
+    # Porovnání s hrubou silou (v tomto případě limit tuků nejlepší
+    # stavy DP neodřízne, takže DP najde nejlepší součet skóre)
+    scores = MealOptimizer.score_items(FoodCatalog.from_items(foods), targets, {})
+    best = max(
+        sum(scores[i] for i in combo)
+        for k in range(1, 4)
+        for combo in itertools.combinations(range(len(foods)), k)
+        if 450 <= sum(foods[i].calories for i in combo) <= 650
+        and sum(foods[i].fat for i in combo) <= 20
+    )
+    assert abs(sum(scores[foods.index(food)] for food in selected) - best) < 1e-12
+    
+    plan = find_optimal_plan(
+        foods, {"calories": 2000, "protein": 100}, {"calories": (1800, 2200)}, {},
+        {"breakfast": (1, 2), "lunch": (1, 2), "dinner": (1, 2), "snack": (0, 1)},
+        strategy="dp"
+    )
+    assert plan is not None and 1800 <= plan.totals()["calories"] <= 2200
+    
+    # Denní minimum bílkovin splní jen součet více slotů (žádná snídaně ani
+    # svačina sama nemá 100 g), horní limit tuků platí pro celý den
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    limits = {"protein": (100, None), "fat": (None, 120)}
+    assert all(food.protein < 100 for food in foods if "lunch" not in food.meal_times)
+    plan = find_optimal_plan(foods, {"calories": 2000}, limits, {}, slot_caps, strategy="dp")
+    assert plan is not None and plan.totals()["protein"] >= 100 and plan.totals()["fat"] <= 120
+    
+    print(f"✅ DP výběr: {selected} ({calories} kcal)")
+    return True
+
+def test_batch_plans():
+    """Test dávkového generování jídelníčků."""
+    print("\n🧪 TEST: Dávkové plány")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    requests = [
+        PlanRequest({"calories": 1500 + 100 * i, "protein": 80 + 10 * i}, {"calories": (None, 2500)},
+                    {"protein": 1.0 + i / 2}, slot_caps)
+        for i in range(6)
+    ]
+    requests.append(PlanRequest({"calories": None}, {}, {}, slot_caps))
+    
+    batch = find_optimal_plans_batch(catalog, requests)
+    single = [find_optimal_plan(catalog, r.targets, r.limits, r.weights, r.slot_caps) for r in requests]
+    
+    assert len(batch) == len(requests), "Chybí výsledky dávky"
+    assert [repr(p) for p in batch] == [repr(p) for p in single], "Dávka se liší od jednotlivých volání"
+    
+    print(f"✅ Dávka {len(requests)} požadavků odpovídá jednotlivým voláním")
+    return True
+
+def test_parallel_runner():
+    """Test paralelního generování jídelníčků v procesech."""
+    print("\n🧪 TEST: Paralelní běh")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    requests = [
+        PlanRequest({"calories": 1500 + 50 * i, "protein": 100}, {"calories": (None, 2500)}, {}, slot_caps)
+        for i in range(10)
+    ]
+    
+    with ParallelPlanRunner(catalog, max_workers=2, chunk_size=3) as runner:
+        plans = runner.run(requests)
+    
+    expected = find_optimal_plans_batch(catalog, requests)
+    assert [repr(p) for p in plans] == [repr(p) for p in expected], "Paralelní výsledky se liší"
+    assert 1 <= len(runner.worker_stats) <= 2, "Nesprávný počet procesů ve statistikách"
+    assert sum(s["plans"] for s in runner.worker_stats.values()) == len(requests)
+    assert sum(s["tasks"] for s in runner.worker_stats.values()) == 4
+    
+    print(f"✅ Paralelně vytvořeno {len(plans)} plánů")
+    return True
+
+def _write_sample_csv(directory):
+    """Zapíše testovací potraviny do CSV souboru a vrátí jeho cestu."""
+    path = os.path.join(directory, "jidla_test.csv")
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write("name,calories,protein,fat,carbs,meal_times,tags\n")
+        for food in _sample_foods():
+            file.write(f"{food.name},{food.calories},{food.protein},{food.fat},{food.carbs},"
+                       f"{'|'.join(sorted(food.meal_times))},{'|'.join(sorted(food.tags))}\n")
+        file.write("Vadný řádek,abc,1,1,1,,\n")
+    return path
+
+def test_streaming_loader():
+    """Test streamovaného načítání CSV."""
+    print("\n🧪 TEST: Streamované načítání")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write_sample_csv(directory)
+        
+        foods = list(iter_foods(path))
+        assert [f.name for f in foods] == [f.name for f in _sample_foods()], "Vadný řádek nebyl přeskočen"
+        assert foods[3].tags == {"vegan", "fruit"}, "Špatně načtené tagy"
+        assert foods[3].meal_times is foods[10].meal_times, "Opakované množiny nejsou sdílené"
+        
+        chunks = list(iter_food_chunks(path, chunk_size=5))
+        assert [len(chunk) for chunk in chunks] == [5, 5, 4], "Nesprávné velikosti bloků"
+        assert isinstance(chunks[0], FoodCatalog)
+        
+        catalog = load_foods(path, as_catalog=True)
+        assert len(catalog) == len(foods)
+    
+    print(f"✅ Streamováno {len(foods)} potravin")
+    return True
+
+def test_binary_cache():
+    """Test binární cache katalogu (mmap)."""
+    print("\n🧪 TEST: Binární cache katalogu")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = _write_sample_csv(directory)
+        foods = load_foods(path)
+        load_foods(path, as_catalog=True)
+        assert not os.path.exists(path + CATALOG_CACHE_SUFFIX), "Cache se má vytvářet jen na požádání"
+        
+        with load_foods(path, use_cache=True) as catalog:
+            assert os.path.exists(path + CATALOG_CACHE_SUFFIX), "Cache nebyla vytvořena"
+            assert list(catalog) == foods, "Položky z cache se liší od CSV"
+            assert catalog.tag_mask("fruit").sum() == 2, "Špatné bitové masky tagů"
+            buffer = catalog._buffer
+        assert buffer.closed and catalog._buffer is None, "Mapovaný soubor nebyl uvolněn"
+        
+        # Změna CSV: cache se musí automaticky přestavět
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("Hruška,57,0.4,0.1,15,breakfast|snack,vegan|fruit\n")
+        os.utime(path, ns=(0, 0))
+        catalog = load_foods(path, use_cache=True)
+        assert len(catalog) == len(foods) + 1, "Zastaralá cache nebyla přestavěna"
+        assert catalog[-1].name == "Hruška" and "fruit" in catalog[-1].tags
+        
+        # Katalog z cache jde serializovat (procesy "spawn"/"forkserver")
+        copy = pickle.loads(pickle.dumps(catalog))
+        assert list(copy) == list(catalog) and copy._buffer is None
+        assert copy.version != catalog.version
+        catalog.close()
+        catalog.close()
+        
+        # Zkrácená cache se stejnou hlavičkou se přestaví
+        cache_path = path + CATALOG_CACHE_SUFFIX
+        cache_size = os.path.getsize(cache_path)
+        with open(cache_path, "r+b") as file:
+            file.truncate(cache_size - 16)
+        try:
+            open_catalog_binary(cache_path)
+            assert False, "Zkrácená cache se neměla otevřít"
+        except ValueError:
+            pass
+        with load_foods(path, use_cache=True) as catalog:
+            assert len(catalog) == len(foods) + 1
+        assert os.path.getsize(cache_path) == cache_size, "Poškozená cache nebyla přestavěna"
+    
+    print("✅ Binární cache funguje správně")
+    return True
+
+def test_food_index():
+    """Test invertovaného indexu časů jídel a tagů."""
+    print("\n🧪 TEST: Invertovaný index")
+    
+    foods = _sample_foods()
+    catalog = FoodCatalog.from_items(foods)
+    index = catalog.build_index()
+    
+    assert index.meal_time_ids("breakfast").tolist() == \
+        [i for i, f in enumerate(foods) if "breakfast" in f.meal_times]
+    assert catalog.build_index() is index, "Index se má vytvořit jen jednou"
+    
+    queries = [
+        (by_meal_time("lunch"), by_tag("vegan")),
+        (compose_predicates(by_meal_time("dinner"), not_tag("meat"), by_tag("high_protein")),),
+        (by_meal_time("snack"), by_tag("neexistujici")),
+        (compose_predicates(by_meal_time("breakfast"), by_tag("fruit")), max_nutrient("calories", 90)),
+    ]
+    for query in queries:
+        assert list(filter_items(catalog, *query)) == filter_items(foods, *query), "Index vrací jiný výsledek"
+    
+    print("✅ Index funguje správně")
+    return True
+
+def test_nutrient_range_index():
+    """Test rozsahového indexu živin."""
+    print("\n🧪 TEST: Rozsahový index živin")
+    
+    foods = _sample_foods()
+    catalog = FoodCatalog.from_items(foods)
+    index = catalog.build_index()
+    
+    assert index.nutrient_range_ids("protein", low=20, high=40).tolist() == \
+        [i for i, f in enumerate(foods) if 20 <= f.protein <= 40]
+    # Široký rozsah (přes masku) i úzký (řazený výřez) dávají seřazené indexy
+    for low, high in ((None, 1000), (0, None), (5, 500), (30, 31)):
+        assert index.nutrient_range_ids("calories", low, high).tolist() == \
+            [i for i, f in enumerate(foods) if (low is None or f.calories >= low)
+             and (high is None or f.calories <= high)]
+    
+    queries = [
+        (min_nutrient("protein", 20), max_nutrient("fat", 10)),
+        (by_meal_time("lunch"), max_nutrient("calories", 150), not_tag("meat")),
+        (compose_predicates(min_nutrient("carbs", 20), by_tag("vegan")),),
+        (max_nutrient("fiber", 1),),
+    ]
+    for query in queries:
+        assert list(filter_items(catalog, *query)) == filter_items(foods, *query), "Rozsahový index nesouhlasí"
+    
+    print("✅ Rozsahový index funguje správně")
+    return True
+
+def test_query_planner():
+    """Test inspektovatelných predikátů a plánovače dotazů."""
+    print("\n🧪 TEST: Plánovač dotazů")
+    
+    foods = _sample_foods()
+    catalog = FoodCatalog.from_items(foods)
+    catalog.build_index()
+    
+    custom = lambda food: len(food.name) > 4
+    plan = plan_predicates(catalog, [custom, by_meal_time("lunch"), compose_predicates(by_tag("fish"), max_nutrient("fat", 30))])
+    assert [method for method, _ in plan] == ["scan", "index", "index", "index"], "Nesprávné metody plánu"
+    assert plan[0][1] is custom, "Uživatelská funkce musí zůstat na svém místě"
+    assert repr(plan[1][1]) == "by_tag('fish')", "Nejselektivnější predikát nemá být první"
+    
+    # Uživatelská funkce vidí stejné potraviny jako při vyhodnocení v pořadí volajícího
+    seen = []
+    def recording(food):
+        seen.append(food.name)
+        return True
+    query = (by_meal_time("lunch"), recording, by_tag("fish"))
+    expected = [f.name for f in foods if "lunch" in f.meal_times]
+    for source in (foods, catalog):
+        seen.clear()
+        filter_items(source, *query)
+        assert seen == expected, "Predikát za uživatelskou funkcí se vyhodnotil před ní"
+    
+    try:
+        FoodPredicate()
+        assert False, "FoodPredicate je abstraktní"
+    except TypeError:
+        pass
+    
+    predicate = max_nutrient("protein", 10)
+    assert isinstance(predicate, NutrientPredicate) and predicate.high == 10
+    assert predicate(foods[1]) and not predicate(foods[0]), "Predikát musí zůstat volatelný"
+    
+    query = (custom, by_meal_time("dinner"), not_tag("vegan"), min_nutrient("protein", 25))
+    assert list(filter_items(catalog, *query)) == [f for f in foods if all(p(f) for p in query)]
+    assert len(filter_items(catalog, by_tag("neexistujici"), custom)) == 0
+    
+    print("✅ Plánovač dotazů funguje správně")
+    return True
+
+def test_plan_cache():
+    """Test LRU/TTL cache jídelníčků."""
+    print("\n🧪 TEST: Cache jídelníčků")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    now = [0.0]
+    cache = PlanCache(maxsize=2, ttl=60, clock=lambda: now[0])
+    
+    first = cache.find_optimal_plan(catalog, {"calories": 2000}, {}, {}, slot_caps)
+    # Stejný požadavek v jiném pořadí klíčů a s int/float hodnotami
+    again = cache.find_optimal_plan(catalog, {"calories": 2000.0}, {}, {}, dict(reversed(slot_caps.items())))
+    assert repr(first) == repr(again) and cache.hits == 1 and cache.misses == 1
+    
+    cache.find_optimal_plan(catalog, {"calories": 1800}, {}, {}, slot_caps)
+    cache.find_optimal_plan(catalog, {"calories": 1600}, {}, {}, slot_caps)
+    assert cache.evictions == 1 and len(cache) == 2, "LRU nevyřadilo nejstarší záznam"
+    
+    now[0] = 100.0
+    cache.find_optimal_plan(catalog, {"calories": 1600}, {}, {}, slot_caps)
+    assert cache.expirations == 1, "Záznam měl po TTL vypršet"
+    
+    # Načtení jiného souboru cache nevyprázdní
+    size = len(cache)
+    load_foods("neexistujici.csv")
+    assert len(cache) == size, "Načtení nesouvisejících dat nemá cache vyprázdnit"
+    
+    # Seznam změněný na místě (stejná délka) je nový klíč
+    foods = _sample_foods()
+    cache = PlanCache()
+    first = cache.find_optimal_plan(foods, {"calories": 2000}, {}, {}, slot_caps)
+    foods[0] = FoodItem(foods[0].name, foods[0].calories + 1, foods[0].protein,
+                        foods[0].fat, foods[0].carbs, foods[0].meal_times, foods[0].tags)
+    cache.find_optimal_plan(foods, {"calories": 2000}, {}, {}, slot_caps)
+    assert cache.misses == 2 and cache.hits == 0, "Změněný seznam vrátil zastaralý jídelníček"
+    
+    # Neúspěch se neukládá
+    infeasible = {"calories": (None, 100)}
+    assert cache.find_optimal_plan(foods, {"calories": 2000}, infeasible, {}, slot_caps) is None
+    assert cache.find_optimal_plan(foods, {"calories": 2000}, infeasible, {}, slot_caps) is None
+    assert cache.hits == 0 and len(cache) == 2, "Neúspěšný výsledek se nemá ukládat"
+    
+    # Záznamy se stejným seznamem sdílí jediný snímek položek
+    cache.find_optimal_plan(foods, {"calories": 1800}, {}, {}, slot_caps)
+    snapshots = {id(entry[2]) for entry in cache._entries.values()}
+    assert len(snapshots) == 2 and len(cache._snapshots) == 2
+    cache.clear()
+    assert len(cache._snapshots) == 0, "Snímek seznamu přežil své záznamy"
+    
+    print(f"✅ Cache: {cache.stats()}")
+    return True
+
+def test_quantized_cache():
+    """Test přibližné cache s kvantizovanými cíli a warm startem."""
+    print("\n🧪 TEST: Kvantizovaná cache jídelníčků")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    limits = {"calories": (1000, 4000)}
+    cache = PlanCache(quantize={"calories": 100})
+    
+    assert cache.make_quantized_key(catalog, {"calories": 2010}, limits, {}, slot_caps)[1] == \
+        cache.make_quantized_key(catalog, {"calories": 1990}, limits, {}, slot_caps)[1]
+    
+    first = cache.find_optimal_plan(catalog, {"calories": 2010}, limits, {}, slot_caps)
+    assert first is not None
+    # Stejný koš: uložený jídelníček projde přesnými limity a vrátí se
+    near = cache.find_optimal_plan(catalog, {"calories": 1990}, limits, {}, slot_caps)
+    assert repr(near) == repr(first) and cache.hits == 1
+    
+    # Jiný koš: spustí se optimalizace s nejbližším jídelníčkem jako warm startem
+    cache.find_optimal_plan(catalog, {"calories": 1800}, limits, {}, slot_caps)
+    assert cache.warm_starts == 1 and cache.misses == 2
+    
+    # Uložený jídelníček, který nesplní přesné limity, se nevrátí
+    strict = {"calories": (0, first.totals()["calories"] - 1)}
+    cache.put(cache.make_quantized_key(catalog, {"calories": 2000}, strict, {}, slot_caps), first)
+    plan = cache.find_optimal_plan(catalog, {"calories": 2000}, strict, {}, slot_caps)
+    assert cache.rejected == 1
+    assert plan is None or plan.totals()["calories"] <= strict["calories"][1]
+    
+    # Warm start řešiče: výsledek není horší než výchozí jídelníček
+    targets = {"calories": 1800, "protein": 100}
+    warm = find_optimal_plan(catalog, targets, limits, {}, slot_caps)
+    exact = find_optimal_plan(catalog, targets, limits, {}, slot_caps, strategy="exact", warm_start=warm)
+    objective = PlanObjective(targets, limits, {})
+    deviation = lambda plan: objective.deviation(np.array([plan.totals()[n] for n in NUTRIENTS]))
+    assert deviation(exact) <= deviation(warm) + 1e-9
+    
+    print(f"✅ Kvantizovaná cache: {cache.stats()}")
+    return True
+
+def test_food_item_hashable():
+    """Test neměnné, hashovatelné a kompaktní potraviny."""
+    print("\n🧪 TEST: Hashovatelná potravina")
+    
+    a = FoodItem("Jogurt", 120, 8.0, 3.0, 12.0, {"breakfast", "snack"}, {"vegetarian"})
+    b = FoodItem("Jogurt", 120, 8.0, 3.0, 12.0, ["snack", "breakfast"], {"vegetarian"})
+    
+    assert a == b and hash(a) == hash(b), "Stejné potraviny musí mít stejný hash"
+    assert len({a: 1, b: 2}) == 1, "Potravina musí fungovat jako klíč slovníku"
+    assert isinstance(a.meal_times, frozenset) and a.meal_times is b.meal_times, "Štítky nejsou internované"
+    assert FoodItem("Voda", 0, 0, 0, 0).meal_times == set(MEAL_TIMES)
+    assert not hasattr(a, "__dict__"), "FoodItem má mít __slots__"
+    
+    try:
+        a.calories = 1
+        assert False, "FoodItem musí být neměnný"
+    except AttributeError:
+        pass
+    
+    # Po unpicklingu (procesy ParallelPlanRunner) jsou štítky znovu internované
+    copy = pickle.loads(pickle.dumps(a))
+    assert copy == a and copy.meal_times is a.meal_times and copy.tags is a.tags
+    
+    # Tabulka internovaných množin je omezená
+    import planner_jidelnicku_final as planner
+    limit = planner._LABEL_SETS_MAX
+    planner._LABEL_SETS_MAX = len(planner._LABEL_SETS)
+    try:
+        FoodItem("Nová", 1, 0, 0, 0, tags={"jedinecny_tag_testu"})
+        assert frozenset({"jedinecny_tag_testu"}) not in planner._LABEL_SETS
+    finally:
+        planner._LABEL_SETS_MAX = limit
+    
+    print("✅ FoodItem je hashovatelný a bez __dict__")
+    return True
+
+def test_running_totals():
+    """Test průběžných součtů v builderu a uložených součtů jídelníčku."""
+    print("\n🧪 TEST: Průběžné součty živin")
+    
+    foods = {f.name: f for f in _sample_foods()}
+    builder = MealPlanBuilder().set_slot_limits("snack", 0, 2)
+    breakfast = [f for f in foods.values() if "breakfast" in f.meal_times][:2]
+    lunch = [f for f in foods.values() if "lunch" in f.meal_times][:2]
+    dinner = [f for f in foods.values() if "dinner" in f.meal_times][:1]
+    for item in breakfast:
+        builder.add_breakfast(item)
+    for item in lunch:
+        builder.add_lunch(item)
+    for item in dinner:
+        builder.add_dinner(item)
+    plan = builder.build()
+    
+    expected = MealPlan(list(plan.breakfast), list(plan.lunch), list(plan.dinner), []).totals()
+    assert plan.totals() == expected, "Průběžné součty se liší od přepočtu"
+    assert isinstance(plan.totals()["calories"], int)
+    
+    # all_items vrací seznam, item_view líný pohled
+    assert plan.all_items() + [dinner[0]] == breakfast + lunch + dinner + [dinner[0]]
+    items = plan.item_view()
+    assert len(items) == 5 and list(items) == breakfast + lunch + dinner
+    assert items[2] is lunch[0] and items[-1] is dinner[0]
+    
+    # Každá změna slotu zneplatní uložené součty
+    fresh = lambda p: MealPlan(list(p.breakfast), list(p.lunch), list(p.dinner), list(p.snacks)).totals()
+    plan.snacks.append(breakfast[0])
+    assert plan.totals()["calories"] == expected["calories"] + breakfast[0].calories
+    plan.lunch[0] = dinner[0]
+    assert plan.totals() == fresh(plan), "Součty po změně prvku jsou zastaralé"
+    plan.dinner = []
+    assert plan.totals() == fresh(plan)
+    
+    # Po unpicklingu sloty opět hlídají změny
+    copy = pickle.loads(pickle.dumps(plan))
+    copy.lunch.pop()
+    assert copy.totals() == fresh(copy)
+    
+    print(f"✅ Součty: {plan.totals()}")
+    return True
+
+def test_local_search():
+    """Test lokálního prohledávání po hladovém výběru."""
+    print("\n🧪 TEST: Lokální prohledávání")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    targets = {"calories": 2000, "protein": 120}
+    limits = {"calories": (1800, 2200)}
+    objective = PlanObjective(targets, {}, {})
+    deviation = lambda plan: objective.deviation(np.array([plan.totals()[n] for n in NUTRIENTS]))
+    
+    greedy = find_optimal_plan(catalog, targets, {}, {}, slot_caps)
+    search = LocalSearch(max_iter=50)
+    improved = find_optimal_plan(catalog, targets, {}, {}, slot_caps, local_search=search)
+    assert deviation(improved) <= deviation(greedy), "Lokální prohledávání zhoršilo plán"
+    assert search.stats["iterations"] <= 50
+    
+    # Hladový plán limit kalorií porušuje, lokální prohledávání ho opraví
+    repaired = find_optimal_plan(catalog, targets, limits, {}, slot_caps, local_search=True)
+    assert repaired is not None and 1800 <= repaired.totals()["calories"] <= 2200
+    assert not any("meat" in item.tags for item in repaired.breakfast)
+    for slot, items in zip(MEAL_TIMES, (repaired.breakfast, repaired.lunch, repaired.dinner, repaired.snacks)):
+        assert slot_caps[slot][0] <= len(items) <= slot_caps[slot][1]
+        assert all(slot in item.meal_times for item in items)
+    
+    # Nulový rozpočet iterací ponechá plán beze změny
+    same = LocalSearch(max_iter=0).improve_plan(greedy, catalog, targets, {}, {}, slot_caps)
+    assert repr(same) == repr(greedy)
+    
+    print(f"✅ Odchylka {deviation(greedy):.3f} -> {deviation(improved):.3f}")
+    return True
+
+def test_annealing_solver():
+    """Test simulovaného žíhání s tabu pamětí."""
+    print("\n🧪 TEST: Simulované žíhání")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    targets = {"calories": 2000, "protein": 120}
+    limits = {"calories": (1800, 2200)}
+    
+    # Reprodukovatelnost: stejný seed a rozpočet iterací dá stejný plán
+    plans = [
+        find_optimal_plan(catalog, targets, limits, {}, slot_caps,
+                          strategy=AnnealingSolver(max_iter=3000, time_limit=10, seed=7))
+        for _ in range(2)
+    ]
+    assert plans[0] is not None and repr(plans[0]) == repr(plans[1]), "Výsledek není reprodukovatelný"
+    
+    plan = plans[0]
+    assert 1800 <= plan.totals()["calories"] <= 2200
+    assert not any("meat" in item.tags for item in plan.breakfast), "Maso ve snídani"
+    for slot, items in zip(MEAL_TIMES, (plan.breakfast, plan.lunch, plan.dinner, plan.snacks)):
+        assert slot_caps[slot][0] <= len(items) <= slot_caps[slot][1]
+        assert all(slot in item.meal_times for item in items)
+    
+    # Srovnatelné s exaktním řešičem
+    objective = PlanObjective(targets, limits, {})
+    deviation = lambda p: objective.deviation(np.array([p.totals()[n] for n in NUTRIENTS]))
+    exact = find_optimal_plan(catalog, targets, limits, {}, slot_caps, strategy="exact")
+    assert deviation(plan) <= deviation(exact) + 0.05
+    
+    # Anytime: s nulovým časem vrátí přípustný warm start
+    solver = AnnealingSolver(time_limit=0, seed=7)
+    quick = find_optimal_plan(catalog, targets, limits, {}, slot_caps, strategy=solver, warm_start=exact)
+    assert repr(quick) == repr(exact) and solver.stats["iterations"] == 0
+    
+    print(f"✅ Žíhání: odchylka {deviation(plan):.3f}, exaktní {deviation(exact):.3f}")
+    return True
+
+def test_anytime_plan():
+    """Test optimalizace s časovým limitem."""
+    print("\n🧪 TEST: Anytime optimalizace s termínem")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    targets = {"calories": 2000}
+    
+    # Nulový rozpočet: jen hladový výběr
+    quick = find_optimal_plan_anytime(catalog, targets, {}, {}, slot_caps, timeout=0)
+    greedy = find_optimal_plan(catalog, targets, {}, {}, slot_caps)
+    assert repr(quick.plan) == repr(greedy) and quick.deadline_hit
+    assert list(quick.stages) == ["greedy"] and not quick.proven_optimal
+    
+    # Dostatek času: exaktní řešič nad celým (malým) katalogem doběhne
+    # a prokáže optimalitu
+    small = FoodCatalog.from_items(_sample_foods()[:10])
+    solver = BranchAndBoundSolver(per_slot=len(small), node_limit=10**6, time_limit=10)
+    result = find_optimal_plan_anytime(small, targets, {"calories": (1500, 2500)}, {}, slot_caps,
+                                       timeout=10, strategy=solver)
+    assert result.plan is not None and result.proven_optimal and not result.deadline_hit
+    assert solver.time_limit == 10, "Předaný řešič se nesmí měnit"
+    
+    # Termín se dodrží i s pomalým řešičem (s malou rezervou na režii)
+    limited = find_optimal_plan_anytime(catalog, {"calories": 2000, "protein": 120}, {}, {}, slot_caps,
+                                        timeout=0.05, strategy="anneal", local_search=True)
+    assert limited.plan is not None and limited.elapsed < 0.5
+    assert find_optimal_plan(catalog, targets, {}, {}, slot_caps, timeout=0.05) is not None
+    
+    # Termín se hlídá i uvnitř LP relaxace; strategie "greedy" se nemění
+    tight = BranchAndBoundSolver(per_slot=len(catalog), node_limit=10**6, time_limit=0.001)
+    tight.solve(catalog, {"calories": 2000, "protein": 120}, {}, {}, slot_caps)
+    assert tight.stats["elapsed"] < 0.05 and not tight.stats["proven_optimal"]
+    dp = DynamicProgrammingSolver(time_limit=0)
+    assert dp.solve(catalog, targets, {}, {}, slot_caps) is None and dp.stats["deadline_hit"]
+    quick_dp = find_optimal_plan_anytime(catalog, targets, {}, {}, slot_caps, timeout=0.05, strategy="dp")
+    assert quick_dp.plan is not None
+    greedy_only = find_optimal_plan_result(catalog, targets, {}, {}, slot_caps, timeout=0.05,
+                                           timings=True)
+    assert greedy_only.ok and "solver" not in greedy_only.timings
+    
+    print(f"✅ Anytime: {result.elapsed * 1000:.1f} ms, prokázáno optimální: {result.proven_optimal}")
+    return True
+
+def test_weekly_plan():
+    """Test týdenního plánu s omezením opakování."""
+    print("\n🧪 TEST: Týdenní plán")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 2), "dinner": (1, 2), "snack": (0, 1)}
+    targets = {"calories": 2000}
+    
+    week = find_weekly_plan(catalog, targets, {}, {}, slot_caps, days=4, max_repeats=2)
+    assert len(week.days) == 4 and all(plan is not None for plan in week.days)
+    assert max(week.repeats().values()) <= 2, "Potravina se opakuje víc, než je povoleno"
+    assert len({tuple(plan.breakfast) for plan in week.days}) > 1, "Každý den stejná snídaně"
+    
+    # První den je stejný jako samostatně hledaný plán
+    assert repr(week.days[0]) == repr(find_optimal_plan(catalog, targets, {}, {}, slot_caps))
+    assert week.totals()["calories"] == sum(plan.totals()["calories"] for plan in week.days)
+    
+    # Týdenní cíl průběžně upravuje denní cíle
+    adaptive = find_weekly_plan(catalog, targets, {}, {}, slot_caps, days=2, max_repeats=2,
+                                weekly_targets={"calories": 3000})
+    assert adaptive.days[0] is not None
+    
+    # Nesplnitelný den bez týdenních cílů se ohlásí jen jednou
+    import contextlib, io
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        failed = find_weekly_plan(catalog, targets, {"calories": (9000, 10000)}, {}, slot_caps, days=4)
+    assert failed.days == [None] * 4
+    assert output.getvalue().count("❌") == 1, "Stejná chyba se opakuje pro každý den"
+    
+    print(f"✅ Týden: {week.totals()['calories']} kcal, max. opakování {max(week.repeats().values())}")
+    return True
+
+def test_top_k_plans():
+    """Test více odlišných alternativ z jednoho prohledávání."""
+    print("\n🧪 TEST: Top-K alternativní jídelníčky")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    targets = {"calories": 2000, "protein": 120}
+    limits = {"calories": (1800, 2200)}
+    objective = PlanObjective(targets, limits, {})
+    deviation = lambda plan: objective.deviation(np.array([plan.totals()[n] for n in NUTRIENTS]))
+    
+    # Rozpočet daný počtem uzlů, aby výsledek nezávisel na rychlosti stroje
+    solver = lambda: BranchAndBoundSolver(node_limit=300, time_limit=60)
+    plans = find_top_k_plans(catalog, targets, limits, {}, slot_caps, k=3, min_difference=3,
+                             solver=solver())
+    assert len(plans) == 3, "Nenalezeny tři alternativy"
+    values = [deviation(plan) for plan in plans]
+    assert values == sorted(values), "Alternativy nejsou seřazené od nejlepší"
+    for a, b in itertools.combinations(plans, 2):
+        a, b = set(a.all_items()), set(b.all_items())
+        assert max(len(a - b), len(b - a)) >= 3, "Alternativy se liší málo"
+    for plan in plans:
+        assert 1800 <= plan.totals()["calories"] <= 2200
+    
+    # Nejlepší alternativa odpovídá samostatnému exaktnímu řešení
+    exact = find_optimal_plan(catalog, targets, limits, {}, slot_caps, strategy=solver())
+    assert abs(values[0] - deviation(exact)) < 1e-9
+    
+    # Úplné prohledávání malého katalogu = hladový výběr z hrubé síly
+    small = FoodCatalog.from_items(_sample_foods()[:9])
+    small_caps = {"breakfast": (1, 1), "lunch": (1, 2), "dinner": (1, 1)}
+    full = BranchAndBoundSolver(per_slot=len(small), node_limit=10**6, time_limit=60)
+    small_targets, small_limits = {"calories": 1300, "protein": 80}, {"calories": (1000, 1600)}
+    model_objective, variables, nutrients_x = full._model(small, small_targets, small_limits, {},
+                                                          small_caps)[:3]
+    feasible = []
+    for mask in itertools.product([False, True], repeat=len(variables)):
+        picked = [v for v, chosen in zip(variables, mask) if chosen]
+        foods_used = [i for _, i in picked]
+        counts = [sum(1 for slot, _ in picked if slot == s) for s in small_caps]
+        if len(set(foods_used)) < len(foods_used):
+            continue
+        if not all(lo <= c <= hi for c, (lo, hi) in zip(counts, small_caps.values())):
+            continue
+        totals = nutrients_x[:, list(mask)].sum(axis=1)
+        if model_objective.within_limits(totals):
+            feasible.append((float(model_objective.deviation(totals)), frozenset(foods_used)))
+    expected = []
+    for value, foods_used in sorted(feasible, key=lambda entry: entry[0]):
+        if all(max(len(foods_used - other), len(other - foods_used)) >= 2 for _, other in expected):
+            expected.append((value, foods_used))
+    top = full.solve_top_k(small, small_targets, small_limits, {}, small_caps, k=3, min_difference=2)
+    top_values = [float(model_objective.deviation(np.array(
+        [sum(item.get_nutrient_value(n) for items in d.values() for item in items) for n in NUTRIENTS])))
+        for d in top]
+    assert len(top) == 3 and len(expected) >= 3
+    assert np.allclose(top_values, [value for value, _ in expected[:3]]), "Ořezávání ztratilo alternativu"
+    
+    print(f"✅ Alternativy: {[round(v, 4) for v in values]}")
+    return True
+
+def test_plan_tracer():
+    """Test měření fází find_optimal_plan."""
+    print("\n🧪 TEST: Tracer fází optimalizace")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    tracer = PlanTracer()
+    
+    for calories in (1600, 1800, 2000):
+        find_optimal_plan(catalog, {"calories": calories}, {}, {}, slot_caps, tracer=tracer)
+    assert len(tracer.requests) == 3
+    stages = [event.stage for event in tracer.requests[0]]
+    assert stages == ["filter", "knapsack.breakfast", "knapsack.lunch", "knapsack.dinner",
+                      "knapsack.snack", "distribute", "build", "total"], stages
+    
+    summary = tracer.summary()
+    assert summary["total"]["count"] == 3
+    assert summary["filter"]["candidates_mean"] == len(catalog)
+    assert summary["total"]["p50_ms"] <= summary["total"]["p99_ms"]
+    assert sum(summary["build"]["histogram"].values()) == 3
+    
+    # Globální tracer a jiné strategie
+    previous = set_tracer(tracer)
+    try:
+        find_optimal_plan(catalog, {"calories": 2000}, {}, {}, slot_caps, strategy="dp")
+    finally:
+        set_tracer(previous)
+    assert "solver" in tracer.summary() and len(tracer.requests) == 4
+    
+    # Bez traceru se nic nezaznamená
+    find_optimal_plan(catalog, {"calories": 2000}, {}, {}, slot_caps)
+    assert len(tracer.requests) == 4
+    
+    with tempfile.TemporaryDirectory() as directory:
+        data = tracer.export(os.path.join(directory, "trace.json"))
+        assert os.path.exists(os.path.join(directory, "trace.json")) and data["requests"] == 4
+    
+    print(f"✅ Tracer: p95 celku {summary['total']['p95_ms']:.3f} ms")
+    return True
+
+def test_plan_result():
+    """Test strukturovaného výsledku find_optimal_plan_result."""
+    print("\n🧪 TEST: Strukturovaný výsledek optimalizace")
+    
+    catalog = FoodCatalog.from_items(_sample_foods())
+    slot_caps = {"breakfast": (1, 2), "lunch": (1, 3), "dinner": (1, 3), "snack": (0, 2)}
+    before = plan_counters()
+    
+    result = find_optimal_plan_result(catalog, {"calories": 2000}, {}, {}, slot_caps, timings=True)
+    assert result.ok and result.status == PLAN_OK and result.plan is not None
+    assert result.violation is None and "total" in result.timings and "build" in result.timings
+    
+    # Bez traceru a bez timings=True se fáze neměří (celkový čas ano)
+    previous = set_tracer(None)
+    try:
+        seconds = plan_counters()["seconds"]
+        assert find_optimal_plan_result(catalog, {"calories": 2000}, {}, {}, slot_caps).timings == {}
+        assert plan_counters()["seconds"] > seconds
+    finally:
+        set_tracer(previous)
+    
+    # Nesplnitelný limit kalorií – status infeasible s porušeným omezením
+    result = find_optimal_plan_result(catalog, {"calories": 2000}, {"calories": (None, 900)}, {}, slot_caps)
+    assert result.status == PLAN_INFEASIBLE and result.plan is None
+    assert result.violation.constraint == "calories" and result.violation.kind == "max"
+    assert result.violation.actual > result.violation.bound == 900
+    
+    # Neznámá strategie je chyba, ne nesplnitelnost
+    result = find_optimal_plan_result(catalog, {"calories": 2000}, {}, {}, slot_caps, strategy="neznama")
+    assert result.status == PLAN_ERROR and result.error_type == "ValueError"
+    
+    # Statistiky řešiče
+    result = find_optimal_plan_result(catalog, {"calories": 2000}, {}, {}, slot_caps,
+                                      strategy=AnnealingSolver(seed=1, max_iter=500), local_search=True)
+    assert result.ok and "local_search" in result.solver_stats
+    
+    # Výjimky z builderu nesou violation a zůstávají ValueError
+    builder = MealPlanBuilder()
+    for slot in ("breakfast", "dinner"):
+        builder.set_slot_limits(slot, 0, 3)
+    for food in _sample_foods():
+        if "lunch" in food.meal_times and food.calories > 100:
+            builder.add_lunch(food)
+            break
+    try:
+        builder.build(limits={"calories": (None, 100)})
+        assert False, "build měl selhat"
+    except ValueError as e:
+        assert isinstance(e, PlanValidationError) and e.violation.constraint == "calories"
+    
+    after = plan_counters()
+    assert after["total"] - before["total"] == 5
+    assert after["statuses"].get(PLAN_INFEASIBLE, 0) - before["statuses"].get(PLAN_INFEASIBLE, 0) == 1
+    assert after["violations"].get("calories", 0) - before["violations"].get("calories", 0) == 1
+    
+    print(f"✅ Výsledky: {after['statuses']}")
+    return True
+
+def test_builder_validate():
+    """Test validace builderu bez výjimek."""
+    print("\n🧪 TEST: Validace builderu bez výjimek")
+    
+    foods = _sample_foods()
+    lunch = [food for food in foods if "lunch" in food.meal_times]
+    builder = MealPlanBuilder()
+    builder.set_slot_limits("breakfast", 0, 2)
+    for food in lunch[:4]:
+        builder.add_lunch(food)
+    limits = {"calories": (None, 100), "protein": (1000, None)}
+    
+    # Všechna porušení najednou: příliš mnoho obědů, chybí večeře, dvě živiny
+    violations = builder.validate(limits)
+    constraints = [(v.constraint, v.kind) for v in violations]
+    assert constraints == [("slot:lunch", "max"), ("slot:dinner", "min"),
+                           ("calories", "max"), ("protein", "min")], constraints
+    plan, found = builder.try_build(limits=limits)
+    assert plan is None and found == violations
+    
+    # build() vyhodí první porušení se stejnou zprávou jako dřív
+    try:
+        builder.build(limits=limits)
+        assert False, "build měl selhat"
+    except PlanValidationError as e:
+        assert e.violation == violations[0]
+        assert str(e) == f"Chyba při vytváření jídelníčku: {violations[0].message}"
+    
+    # Platný jídelníček: try_build vrátí plán a prázdný seznam
+    builder = MealPlanBuilder()
+    builder.set_slot_limits("breakfast", 0, 2)
+    builder.set_slot_limits("dinner", 0, 3)
+    builder.add_lunch(lunch[0])
+    plan, found = builder.try_build(limits={"calories": (None, 10000)})
+    assert found == [] and plan.lunch == [lunch[0]]
+    assert builder.validate() == []
+    
+    print(f"✅ Nalezeno {len(violations)} porušení bez výjimek")
+    return True
+
 def run_all_tests():
     """Spustí všechny testy."""
     print("="*60)
@@ -173,7 +1138,31 @@ def run_all_tests():
         test_filtering,
         test_optimization,
         test_error_handling,
-        test_nutrition_calculation
+        test_nutrition_calculation,
+        test_food_catalog,
+        test_batch_scoring,
+        test_exact_solver,
+        test_dp_knapsack,
+        test_batch_plans,
+        test_parallel_runner,
+        test_streaming_loader,
+        test_binary_cache,
+        test_food_index,
+        test_nutrient_range_index,
+        test_query_planner,
+        test_plan_cache,
+        test_quantized_cache,
+        test_food_item_hashable,
+        test_running_totals,
+        test_local_search,
+        test_annealing_solver,
+        test_anytime_plan,
+        test_weekly_plan,
+        test_top_k_plans,
+        test_plan_tracer,
+        test_plan_result,
+        test_builder_validate,
+        test_greedy_fill
     ]
     
     passed = 0